@@ -5,6 +5,8 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
+
+Запуск: gunicorn config.asgi:application -k uvicorn.workers.UvicornWorker
 """
 
 import os
@@ -12,5 +14,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+# Под ASGI чтение поставщиков обслуживают async-представления (electronics_network.async_views).
+os.environ.setdefault("ASYNC_READ_VIEWS", "True")
 
 application = get_asgi_application()
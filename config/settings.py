@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -48,6 +49,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Первым, чтобы total охватывал весь запрос; без REQUEST_TIMING не подключается.
+    "electronics_network.timing.RequestTimingMiddleware",
+    # Метрики для /metrics; без METRICS_ENABLED не подключается.
+    "electronics_network.metrics.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -110,16 +115,103 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Аутентификация по claims токена без чтения пользователя из БД. Токены, выданные до
+# включения, не содержат версии авторизации и перестанут приниматься. Нужен общий для
+# воркеров кэш (CACHE_BACKEND=file или db), иначе отзыв токенов виден с задержкой.
+JWT_STATELESS_AUTH = os.getenv("JWT_STATELESS_AUTH", "False").lower() == "true"
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        (
+            "users.authentication.ClaimsJWTAuthentication"
+            if JWT_STATELESS_AUTH
+            else "rest_framework_simplejwt.authentication.JWTAuthentication"
+        ),
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_PAGINATION_CLASS": "electronics_network.pagination.CreatedAtCursorPagination",
+    "PAGE_SIZE": int(os.getenv("API_PAGE_SIZE", "50")),
+}
+
+API_MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", "500"))
+
+# Замеры запросов: заголовок Server-Timing и лог electronics_network.timing (JSON).
+# Запросы дольше SLOW_QUERY_MS миллисекунд логируются вместе с EXPLAIN.
+REQUEST_TIMING = os.getenv("REQUEST_TIMING", "False").lower() == "true"
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+
+# Метрики в формате Prometheus на /metrics. Счётчики всех воркеров складываются в общем
+# файле SQLite METRICS_FILE; если задан METRICS_TOKEN, /metrics требует Authorization: Bearer.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "False").lower() == "true"
+METRICS_FILE = os.getenv("METRICS_FILE", os.path.join(tempfile.gettempdir(), "electronics_network_metrics.sqlite3"))
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "electronics_network.timing": {
+            "handlers": ["console"],
+            "level": os.getenv("REQUEST_TIMING_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+    },
+}
+
+# Async-представления для чтения поставщиков (список, карточка, descendants, search).
+# Включаются в config.asgi; под WSGI каждое async-представление заняло бы синхронный воркер целиком.
+ASYNC_READ_VIEWS = os.getenv("ASYNC_READ_VIEWS", "False").lower() == "true"
+
+# Максимальный уровень звена в иерархии поставщиков (у завода уровень 0).
+SUPPLIER_MAX_DEPTH = int(os.getenv("SUPPLIER_MAX_DEPTH", "10"))
+
+SIMPLE_JWT = {
+    "TOKEN_OBTAIN_SERIALIZER": "users.tokens.ClaimsTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "users.tokens.VersionedTokenRefreshSerializer",
+    "TOKEN_USER_CLASS": "users.authentication.ClaimsUser",
+}
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# locmem живёт внутри одного процесса: при нескольких воркерах gunicorn
+# используйте file или db (для db нужен `python manage.py createcachetable`).
+CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "db": "django.core.cache.backends.db.DatabaseCache",
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKENDS[os.getenv("CACHE_BACKEND", "locmem")],
+        "LOCATION": os.getenv("CACHE_LOCATION", "electronics-network-cache"),
+    }
 }
 
+SUPPLIER_CACHE_ALIAS = "default"
+SUPPLIER_CACHE_TIMEOUT = int(os.getenv("SUPPLIER_CACHE_TIMEOUT", "300"))
+
+# Версии авторизации пользователей для JWT_STATELESS_AUTH. В общем кэше (file, db) новая
+# версия видна сразу; с locmem другие процессы увидят её не позже чем через этот таймаут.
+USER_AUTH_CACHE_ALIAS = "default"
+USER_AUTH_VERSION_TIMEOUT = int(os.getenv("USER_AUTH_VERSION_TIMEOUT", "30"))
+
+# Таблица итогов задолженности по поддеревьям. Перед включением заполните её
+# командой `python manage.py rebuild_debt_rollup`.
+SUPPLIER_DEBT_ROLLUP = os.getenv("SUPPLIER_DEBT_ROLLUP", "False").lower() == "true"
+
+# Очистка задолженности в админке: больший выбор уходит в фоновое задание.
+CLEAR_DEBT_SYNC_LIMIT = int(os.getenv("CLEAR_DEBT_SYNC_LIMIT", "1000"))
+
+# Массовые PATCH и DELETE /api/suppliers/bulk/: больше поставщиков за один запрос не выбирается.
+SUPPLIER_BULK_LIMIT = int(os.getenv("SUPPLIER_BULK_LIMIT", "10000"))
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Electronics Network API",
     "DESCRIPTION": "API для управления сетью по продаже электроники",
@@ -20,6 +20,8 @@ from django.urls import include, path
 from drf_spectacular.views import (SpectacularAPIView, SpectacularRedocView,
                                    SpectacularSwaggerView)
 
+from electronics_network.metrics import metrics_view
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("electronics_network.urls")),
@@ -27,4 +29,5 @@ urlpatterns = [
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),  # Генерация схемы OpenAPI
     path("api/schema/swagger-ui/", SpectacularSwaggerView.as_view(url_name="schema"), name="swagger-ui"),  # Swagger UI
     path("api/schema/redoc/", SpectacularRedocView.as_view(url_name="schema"), name="redoc"),  # Redoc
+    path("metrics", metrics_view, name="metrics"),  # Метрики Prometheus
 ]
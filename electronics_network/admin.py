@@ -1,27 +1,177 @@
+from django.conf import settings
 from django.contrib import admin, messages
+from django.contrib.admin.widgets import AutocompleteSelect
 from django.core.exceptions import ValidationError
-from django.forms import ModelForm
+from django.core.paginator import Paginator
+from django.db.models import Count
+from django.forms import BaseInlineFormSet, ModelForm
+from django.http import QueryDict
+from django.urls import reverse
+from django.utils.html import format_html
+from django.utils.http import urlencode
 
-from .models import Product, Supplier
+from .cache import get_cache
+from .jobs import clear_debt, start_debt_job
+from .models import DebtClearingJob, Product, Supplier
+from .pagination import EstimatedCountPaginator
+from .search import (PRODUCT_SEARCH_FIELDS, SUPPLIER_SEARCH_FIELDS,
+                     search_queryset)
+
+
+class RankedSearchMixin:
+    """Поиск в админке через search_queryset вместо ILIKE '%q%' по каждому полю."""
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        return search_queryset(queryset, search_term, self.search_fields), False
+
+
+class ParentAutocompleteSelect(AutocompleteSelect):
+    """Автокомплит поставщика; само редактируемое звено и его потомки исключаются из выдачи."""
+
+    exclude_subtree = None
+
+    def get_url(self):
+        url = super().get_url()
+        if self.exclude_subtree is None:
+            return url
+        return f"{url}?{urlencode({'exclude_subtree': self.exclude_subtree})}"
+
+
+CITY_FILTER_KEY = "suppliers:admin:cities"
+
+
+class CityListFilter(admin.SimpleListFilter):
+    """Самые частые города вместо SELECT DISTINCT city по всей таблице; список кэшируется."""
+
+    title = "Город"
+    parameter_name = "city"
+    limit = 50
+    cache_timeout = 600
+
+    def lookups(self, request, model_admin):
+        cache = get_cache()
+        cities = cache.get(CITY_FILTER_KEY)
+        if cities is None:
+            cities = list(
+                Supplier.objects.values_list("city", flat=True)
+                .annotate(suppliers=Count("id"))
+                .order_by("-suppliers", "city")[: self.limit]
+            )
+            cache.set(CITY_FILTER_KEY, cities, self.cache_timeout)
+        # Выбранный город остаётся в списке, даже если он не из самых частых.
+        if self.value() and self.value() not in cities:
+            cities = [self.value(), *cities]
+        return [(city, city) for city in cities]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(city=self.value())
+        return queryset
+
+
+class PaginatedInlineFormSet(BaseInlineFormSet):
+    """
+    Формы только для одной страницы связанных строк (?<page_param>=N): остальные строки
+    не загружаются, не рендерятся и не валидируются при сохранении.
+    """
+
+    per_page = 20
+    page_param = "page"
+    page_number = 1
+    query = None
+
+    def get_queryset(self):
+        if not hasattr(self, "page"):
+            self.page = Paginator(super().get_queryset(), self.per_page).get_page(self.page_number)
+        return self.page.object_list
+
+    def page_url(self, number):
+        # Остальные параметры страницы (_changelist_filters, _popup) сохраняются.
+        query = self.query.copy() if self.query is not None else QueryDict(mutable=True)
+        query[self.page_param] = number
+        return f"?{query.urlencode()}"
+
+    @property
+    def previous_page_url(self):
+        return self.page_url(self.page.previous_page_number())
+
+    @property
+    def next_page_url(self):
+        return self.page_url(self.page.next_page_number())
 
 
 class ProductInline(admin.TabularInline):
     model = Product
     extra = 1
+    formset = PaginatedInlineFormSet
+    template = "admin/electronics_network/paginated_tabular.html"
+    per_page = 20
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        formset.per_page = self.per_page
+        formset.page_param = "products_page"
+        formset.page_number = request.GET.get(formset.page_param, 1)
+        formset.query = request.GET
+        formset.changelist_url = None
+        if obj is not None:
+            url = reverse("admin:electronics_network_product_changelist")
+            formset.changelist_url = f"{url}?{urlencode({'supplier__id__exact': obj.pk})}"
+        return formset
 
 
 @admin.register(Supplier)
-class SupplierAdmin(admin.ModelAdmin):
-    list_display = ("name", "supplier_type", "city", "country", "debt", "created_at", "level")
-    list_filter = ("city",)
-    search_fields = ("name", "city")
+class SupplierAdmin(RankedSearchMixin, admin.ModelAdmin):
+    list_display = ("name", "supplier_type", "city", "country", "debt", "created_at", "level", "supplier")
+    list_filter = (CityListFilter,)
+    list_select_related = ("supplier",)
+    search_fields = SUPPLIER_SEARCH_FIELDS
+    # Уровень хранится в поле level, поэтому строки списка не требуют запросов по иерархии.
+    # Общее число строк берётся из оценки планировщика и не пересчитывается второй раз без фильтров.
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     inlines = [ProductInline]
 
     actions = ["clear_debt"]
 
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == "supplier":
+            kwargs["widget"] = ParentAutocompleteSelect(db_field, self.admin_site, using=kwargs.get("using"))
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_form(self, request, obj=None, change=False, **kwargs):
+        form = super().get_form(request, obj, change, **kwargs)
+        if obj is not None and "supplier" in form.base_fields:
+            # Виджет обёрнут в RelatedFieldWidgetWrapper; класс формы создаётся заново на каждый запрос.
+            form.base_fields["supplier"].widget.widget.exclude_subtree = obj.pk
+        return form
+
+    def get_search_results(self, request, queryset, search_term):
+        queryset, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if getattr(request.resolver_match, "url_name", None) != "autocomplete":
+            return queryset, may_have_duplicates
+        # Поставщиком не может быть само звено или его потомок (иначе получится цикл).
+        exclude = request.GET.get("exclude_subtree", "")
+        path = Supplier.objects.filter(pk=exclude).values_list("path", flat=True).first() if exclude.isdigit() else None
+        if path is not None:
+            queryset = queryset.exclude(pk=exclude).exclude(path__startswith=f"{path}{exclude}/")
+        if not queryset.ordered:
+            queryset = queryset.order_by("pk")
+        return queryset, may_have_duplicates
+
     def clear_debt(self, request, queryset):
-        queryset.update(debt=0.00)
+        # Пачками по id в коротких транзакциях; большой выбор — в фоне, чтобы не упереться в таймаут воркера.
+        ids = list(queryset.order_by("pk").values_list("pk", flat=True))
+        if len(ids) <= settings.CLEAR_DEBT_SYNC_LIMIT:
+            clear_debt(ids)
+            return
+        job = DebtClearingJob.objects.create(supplier_ids=ids, total=len(ids), created_by=request.user)
+        start_debt_job(job)
+        url = reverse("admin:electronics_network_debtclearingjob_change", args=[job.pk])
+        self.message_user(request, format_html('Очистка задолженности запущена в фоне: <a href="{}">{}</a>.', url, job))
 
     clear_debt.short_description = "Очистить задолженность перед поставщиком"
 
@@ -34,9 +184,11 @@ class SupplierAdmin(admin.ModelAdmin):
 
 
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
+class ProductAdmin(RankedSearchMixin, admin.ModelAdmin):
     list_display = ("name", "model", "release_date", "supplier")
-    search_fields = ("name", "model")
+    list_select_related = ("supplier",)
+    search_fields = PRODUCT_SEARCH_FIELDS
+    autocomplete_fields = ("supplier",)
 
 
 class SupplierAdminForm(ModelForm):
@@ -46,3 +198,23 @@ class SupplierAdminForm(ModelForm):
 
     class Media:
         js = ("admin/js/supplier_admin.js",)
+
+
+@admin.register(DebtClearingJob)
+class DebtClearingJobAdmin(admin.ModelAdmin):
+    list_display = ("__str__", "status", "progress", "created_by", "created_at", "finished_at")
+    list_filter = ("status",)
+    list_select_related = ("created_by",)
+    fields = ("status", "progress", "total", "processed", "last_id", "error", "created_by", "created_at", "finished_at")
+    readonly_fields = fields
+
+    @admin.display(description="Прогресс")
+    def progress(self, obj):
+        percent = 100 * obj.processed // obj.total if obj.total else 100
+        return f"{obj.processed} из {obj.total} ({percent}%)"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
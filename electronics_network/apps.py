@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ElectronicsNetworkConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "electronics_network"
+
+    def ready(self):
+        from . import signals  # noqa: F401
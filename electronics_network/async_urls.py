@@ -0,0 +1,26 @@
+from django.urls import path
+
+from .async_views import AsyncSupplierView
+
+# Те же адреса и имена, что у маршрутов SupplierViewSet из router; подключаются перед ними
+# при ASYNC_READ_VIEWS. pk — только число: иначе карточка перехватит действия над списком
+# (export/, debt/, import/, bulk/ ...), которые обслуживает router.
+urlpatterns = [
+    path(
+        "suppliers/",
+        AsyncSupplierView.as_view(action="list", actions={"get": "list", "post": "create"}),
+        name="supplier-list",
+    ),
+    path("suppliers/search/", AsyncSupplierView.as_view(action="search"), name="supplier-search"),
+    path(
+        "suppliers/<int:pk>/",
+        AsyncSupplierView.as_view(
+            action="retrieve",
+            actions={"get": "retrieve", "put": "update", "patch": "partial_update", "delete": "destroy"},
+        ),
+        name="supplier-detail",
+    ),
+    path(
+        "suppliers/<int:pk>/descendants/", AsyncSupplierView.as_view(action="descendants"), name="supplier-descendants"
+    ),
+]
@@ -0,0 +1,126 @@
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import Http404
+from django.shortcuts import aget_object_or_404 as _aget_object_or_404
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from .cache import LIST_VALIDATOR_KEYS, LIST_VERSION_KEY, aget_versions
+from .views import SupplierViewSet
+
+
+async def aget_object_or_404(queryset, **filters):
+    # Как rest_framework.generics.get_object_or_404: некорректный pk — тоже 404.
+    try:
+        return await _aget_object_or_404(queryset, **filters)
+    except (TypeError, ValueError, DjangoValidationError):
+        raise Http404
+
+
+class AsyncSupplierView(View):
+    """
+    Async-чтение поставщиков для ASGI-развёртывания (`config.asgi`).
+
+    GET обслуживается через async ORM (`aiterator`, `aget`, `aaggregate`) и async-кэш,
+    а фильтры, поля, план чтения, курсоры, кэш ответов и ETag берутся у SupplierViewSet,
+    поэтому ответы совпадают с синхронными. Синхронно (в потоке запроса) выполняются
+    только аутентификация и проверка прав. Остальные методы передаются обычному вьюсету.
+    """
+
+    action = None
+    sync_view = None
+
+    @classonlymethod
+    def as_view(cls, actions=None, **initkwargs):
+        # actions — методы обычного вьюсета для этого адреса, как у ViewSet.as_view.
+        sync_view = SupplierViewSet.as_view(actions or {"get": initkwargs["action"]})
+        return csrf_exempt(super().as_view(sync_view=sync_view, **initkwargs))
+
+    def get_viewset(self, request, **kwargs):
+        action_map = {"get": self.action, "head": self.action}
+        viewset = SupplierViewSet(action_map=action_map, args=(), kwargs=kwargs, format_kwarg=None)
+        # Browsable API рендерит формы через синхронный ORM, поэтому здесь только JSON.
+        viewset.renderer_classes = [JSONRenderer]
+        viewset.request = viewset.initialize_request(request, **kwargs)
+        viewset.headers = viewset.default_response_headers
+        return viewset
+
+    async def get(self, request, **kwargs):
+        viewset = self.get_viewset(request, **kwargs)
+        try:
+            await sync_to_async(viewset.initial)(viewset.request, **kwargs)
+            response = await getattr(self, self.action)(viewset, viewset.request, **kwargs)
+        except Exception as exc:
+            response = viewset.handle_exception(exc)
+        return viewset.finalize_response(viewset.request, response, **kwargs)
+
+    async def delegate(self, request, *args, **kwargs):
+        return await sync_to_async(self.sync_view)(request, *args, **kwargs)
+
+    post = put = patch = delete = options = delegate
+
+    async def read_data(self, viewset, rows, many=True):
+        plan = viewset.get_read_plan()
+        if plan is None:
+            return await sync_to_async(viewset.read_data)(rows, many)
+        data = await plan.arender(rows if many else [rows])
+        return data if many else data[0]
+
+    async def read_list_response(self, viewset, queryset):
+        ordering = [name.lstrip("-") for name in getattr(viewset.paginator, "ordering", ())]
+        queryset = viewset.read_queryset(queryset, *ordering)
+        if viewset.paginator is not None:
+            page = await viewset.paginator.apaginate_queryset(queryset, viewset.request, view=viewset)
+            if page is not None:
+                return viewset.get_paginated_response(await self.read_data(viewset, page))
+        return Response(await self.read_data(viewset, [row async for row in queryset.aiterator()]))
+
+    async def get_tree_root(self, viewset, pk):
+        root = await aget_object_or_404(viewset.tree_roots(), pk=pk)
+        viewset.check_object_permissions(viewset.request, root)
+        return root
+
+    async def list(self, viewset, request):
+        queryset = viewset.filter_queryset(viewset.get_queryset())
+        build_response = partial(self.read_list_response, viewset, queryset)
+        versions = await aget_versions(LIST_VALIDATOR_KEYS)
+        conditional = partial(viewset.aversioned_response, request, versions, build_response)
+        return await viewset.acached_response(request, [LIST_VERSION_KEY], conditional)
+
+    async def retrieve_response(self, viewset, pk):
+        if viewset.get_read_plan() is None:
+            return await sync_to_async(viewset.retrieve_response)(viewset.request, pk=pk)
+        queryset = viewset.read_queryset(viewset.filter_queryset(viewset.get_queryset()))
+        row = await aget_object_or_404(queryset, pk=pk)
+        viewset.check_object_permissions(viewset.request, row)
+        return Response(await self.read_data(viewset, row, many=False))
+
+    async def retrieve(self, viewset, request, pk):
+        build_response = partial(self.retrieve_response, viewset, pk)
+        conditional = partial(viewset.aconditional_response, request, viewset.object_state(pk), build_response)
+        return await viewset.acached_response(request, viewset.object_version_keys(pk), conditional)
+
+    async def descendants_response(self, viewset, pk):
+        root = await self.get_tree_root(viewset, pk)
+        return await self.read_list_response(viewset, viewset.descendants_queryset(root))
+
+    async def descendants(self, viewset, request, pk):
+        build_response = partial(self.descendants_response, viewset, pk)
+        return await viewset.acached_response(request, viewset.object_version_keys(pk), build_response)
+
+    async def search_response(self, viewset, query):
+        rows, products = viewset.search_querysets(query)
+        rows = [row async for row in rows]
+        products = [product async for product in products]
+        return Response(viewset.search_data(rows, await self.read_data(viewset, rows), products))
+
+    async def search(self, viewset, request):
+        query = viewset.get_search_query()
+        return await viewset.acached_response(
+            request, [LIST_VERSION_KEY], partial(self.search_response, viewset, query)
+        )
@@ -0,0 +1,219 @@
+import platform
+import statistics
+import subprocess
+import time
+from dataclasses import dataclass
+from urllib.parse import urlencode
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Max
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from users.tokens import ClaimsTokenObtainPairSerializer
+
+from .models import Product, Supplier
+from .timing import start_measuring, stop_measuring
+
+BENCHMARK_USERNAME = "benchmark"
+DEFAULT_MAX_SLOWDOWN = 0.2
+# Запрос пользователя при JWTAuthentication; ClaimsJWTAuthentication обходится без него.
+AUTH_QUERIES = 1
+
+
+@dataclass(frozen=True)
+class BenchmarkCase:
+    """Замер одной страницы: max_queries — потолок SQL-запросов, не зависящий от размера сети."""
+
+    name: str
+    url: str
+    max_queries: int
+    admin: bool = False
+
+
+def with_query(url, **params):
+    return f"{url}?{urlencode(params)}"
+
+
+def benchmark_cases(factory, deepest, next_page):
+    """
+    Ключевые маршруты API и админки на звеньях сгенерированной сети: factory — завод (самое
+    большое поддерево), deepest — звено нижнего уровня (самая длинная цепочка), next_page —
+    адрес второй страницы списка.
+    """
+    changelist = reverse("admin:electronics_network_supplier_changelist")
+    cases = [
+        BenchmarkCase("supplier_list", reverse("supplier-list"), 1 + AUTH_QUERIES),
+        BenchmarkCase(
+            "supplier_list_expand_products", with_query(reverse("supplier-list"), expand="products"), 2 + AUTH_QUERIES
+        ),
+        BenchmarkCase("supplier_detail", reverse("supplier-detail", args=[deepest.pk]), 2 + AUTH_QUERIES),
+        BenchmarkCase("supplier_descendants", reverse("supplier-descendants", args=[factory.pk]), 2 + AUTH_QUERIES),
+        BenchmarkCase("supplier_ancestors", reverse("supplier-ancestors", args=[deepest.pk]), 2 + AUTH_QUERIES),
+        BenchmarkCase("supplier_search", with_query(reverse("supplier-search"), q="Сеть"), 2 + AUTH_QUERIES),
+        BenchmarkCase("supplier_debt", reverse("supplier-debt"), 1 + AUTH_QUERIES),
+        BenchmarkCase(
+            "supplier_debt_by_factory", with_query(reverse("supplier-debt"), group_by="factory"), 1 + AUTH_QUERIES
+        ),
+        BenchmarkCase("supplier_subtree_debt", reverse("supplier-subtree-debt", args=[factory.pk]), 2 + AUTH_QUERIES),
+        BenchmarkCase("admin_supplier_changelist", changelist, 4, admin=True),
+        BenchmarkCase("admin_supplier_search", with_query(changelist, q=deepest.name), 4, admin=True),
+        BenchmarkCase(
+            "admin_supplier_change",
+            reverse("admin:electronics_network_supplier_change", args=[deepest.pk]),
+            7,
+            admin=True,
+        ),
+    ]
+    if next_page:
+        cases.insert(1, BenchmarkCase("supplier_list_next_page", next_page, 1 + AUTH_QUERIES))
+    return cases
+
+
+def benchmark_user():
+    user = get_user_model().objects.filter(username=BENCHMARK_USERNAME).first()
+    if user is None:
+        user = get_user_model().objects.create_superuser(BENCHMARK_USERNAME, f"{BENCHMARK_USERNAME}@example.com")
+        user.set_unusable_password()
+        user.save(update_fields=["password"])
+    return user
+
+
+def git_commit():
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def dataset_info():
+    return {
+        "suppliers": Supplier.objects.count(),
+        "products": Product.objects.count(),
+        "max_level": Supplier.objects.aggregate(level=Max("level"))["level"],
+    }
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+def measure(client, case, repeat, warmup):
+    for _ in range(warmup):
+        client.get(case.url)
+    # SQL-запросы считаются после прогрева (без разовых запросов вроде кэша ContentType),
+    # замеры времени идут без счётчика.
+    timings, token = start_measuring()
+    try:
+        response = client.get(case.url)
+    finally:
+        stop_measuring(token)
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        client.get(case.url)
+        durations.append((time.perf_counter() - started) * 1000)
+    return {
+        "url": case.url,
+        "status": response.status_code,
+        "queries": timings.queries,
+        "max_queries": case.max_queries,
+        "median_ms": round(statistics.median(durations), 2),
+        "p95_ms": round(percentile(durations, 0.95), 2),
+        "min_ms": round(min(durations), 2),
+        "max_ms": round(max(durations), 2),
+    }
+
+
+def run_benchmarks(repeat=10, warmup=2, with_cache=False, on_result=None):
+    """
+    Замеряет ключевые страницы тестовым клиентом Django в этом же процессе и возвращает отчёт:
+    meta (коммит, СУБД, версии, размер сети) и results по имени замера. Сеть — из generate_network.
+    Кэш ответов по умолчанию выключен: замеряется сама выборка и сериализация.
+    """
+    if repeat < 1 or warmup < 0:
+        raise ValueError("repeat должен быть не меньше 1, warmup — не меньше 0.")
+    factory = Supplier.objects.filter(level=0).order_by("id").first()
+    if factory is None:
+        raise ValueError("Нет поставщиков: сначала заполните базу командой generate_network.")
+    deepest = Supplier.objects.order_by("-level", "id").first()
+
+    overrides = {"ALLOWED_HOSTS": [*settings.ALLOWED_HOSTS, "testserver"]}
+    if not with_cache:
+        overrides["SUPPLIER_CACHE_TIMEOUT"] = 0
+    with override_settings(**overrides):
+        user = benchmark_user()
+        access = ClaimsTokenObtainPairSerializer.get_token(user).access_token
+        api = Client(HTTP_AUTHORIZATION=f"Bearer {access}", HTTP_ACCEPT="application/json")
+        admin = Client()
+        admin.force_login(user)
+
+        next_page = api.get(reverse("supplier-list")).json().get("next")
+        results = {}
+        for case in benchmark_cases(factory, deepest, next_page):
+            results[case.name] = measure(admin if case.admin else api, case, repeat, warmup)
+            if on_result is not None:
+                on_result(case.name, results[case.name])
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "created_at": timezone.now().isoformat(),
+            "vendor": connection.vendor,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "repeat": repeat,
+            "warmup": warmup,
+            "with_cache": with_cache,
+            "dataset": dataset_info(),
+        },
+        "results": results,
+    }
+
+
+def budget_failures(report):
+    """Замеры с ответом не 200 или с числом SQL-запросов сверх потолка."""
+    failures = []
+    for name, result in report["results"].items():
+        if result["status"] != 200:
+            failures.append(f"{name}: ответ {result['status']}")
+        elif result["queries"] > result["max_queries"]:
+            failures.append(f"{name}: {result['queries']} SQL-запросов при потолке {result['max_queries']}")
+    return failures
+
+
+def compare_reports(old, new, max_slowdown=DEFAULT_MAX_SLOWDOWN):
+    """
+    Сравнивает отчёты двух коммитов; возвращает (строки сравнения, регрессии). Регрессия — медиана
+    выросла больше чем на max_slowdown (доля) или SQL-запросов стало больше.
+    """
+    rows, regressions = [], []
+    for name, result in new["results"].items():
+        previous = old["results"].get(name)
+        if previous is None:
+            continue
+        change = result["median_ms"] / previous["median_ms"] - 1 if previous["median_ms"] else 0.0
+        rows.append(
+            {
+                "name": name,
+                "old_ms": previous["median_ms"],
+                "new_ms": result["median_ms"],
+                "change": round(change, 3),
+                "old_queries": previous["queries"],
+                "new_queries": result["queries"],
+            }
+        )
+        if change > max_slowdown:
+            regressions.append(f"{name}: медиана {previous['median_ms']} → {result['median_ms']} мс (+{change:.0%})")
+        if result["queries"] > previous["queries"]:
+            regressions.append(f"{name}: SQL-запросов {previous['queries']} → {result['queries']}")
+    return rows, regressions
@@ -0,0 +1,183 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import Exists, OuterRef, TextField, Value
+from django.db.models.functions import Cast, Concat
+from django.utils import timezone
+
+from .bulk_import import error_messages
+from .cache import invalidate_all
+from .debt import refresh_debt_rollups, rollup_enabled
+from .models import Product, Supplier, SupplierDebtRollup
+
+BULK_CHUNK_SIZE = 500
+# Связи на Supplier и что delete_chunk делает с ними вместо коллектора Django. Тест сверяет
+# их с моделью: новая связь или другой on_delete не должны молча потеряться при массовом удалении.
+DELETE_RELATIONS = {
+    (Supplier, "supplier"): models.SET_NULL,
+    (Product, "supplier"): models.CASCADE,
+    (SupplierDebtRollup, "supplier"): models.CASCADE,
+}
+
+
+def too_deep(rows, new_level):
+    """
+    id строк, чьи потомки после переноса на уровень new_level окажутся глубже SUPPLIER_MAX_DEPTH.
+
+    Проверяются только звенья с клиентами, которые опускаются ниже: у листьев и при подъёме
+    глубина не растёт. Для них — один запрос: есть ли потомок глубже порога строки.
+    """
+    ids = [pk for pk, _, level, *_ in rows if level < new_level]
+    candidates = set(Supplier.objects.filter(supplier_id__in=ids).values_list("supplier_id", flat=True)) if ids else ()
+    if not candidates:
+        return set()
+    prefix = Concat(OuterRef("path"), Cast(OuterRef("pk"), TextField()), Value("/"), output_field=TextField())
+    deeper = Supplier.objects.filter(
+        path__startswith=prefix, level__gt=OuterRef("level") + (settings.SUPPLIER_MAX_DEPTH - new_level)
+    )
+    return set(Supplier.objects.filter(pk__in=candidates).filter(Exists(deeper)).values_list("id", flat=True))
+
+
+def chunks(ids, chunk_size):
+    for start in range(0, len(ids), chunk_size):
+        end = start + chunk_size
+        yield ids[start:end]
+
+
+class SupplierBulkUpdate:
+    """
+    Массовое изменение поставщиков из queryset (выбор по ids и/или фильтрам списка).
+
+    Правила `Supplier.clean()` проверяются для всего набора сразу: строки читаются одним
+    запросом, глубина поддеревьев — ещё не больше чем двумя (`too_deep`), цикл ловится по
+    цепочке нового поставщика, `validate_rules` — по каждой строке в памяти. Корректные строки
+    меняются пачками по chunk_size: UPDATE по id, а при смене поставщика —
+    `SupplierQuerySet.reparent`. Для каждого id возвращается исход: updated, invalid (с
+    ошибками), not_found или skipped (strict и в наборе есть ошибки).
+    """
+
+    def __init__(self, queryset, ids, changes, strict=False, chunk_size=BULK_CHUNK_SIZE):
+        self.queryset = queryset
+        self.ids = ids
+        self.changes = changes
+        self.strict = strict
+        self.chunk_size = chunk_size
+
+    def target(self):
+        """(путь, уровень, цепочка id) нового поставщика; None, если поставщик не меняется."""
+        if "supplier" not in self.changes:
+            return None
+        parent = self.changes["supplier"]
+        if parent is None:
+            return "", 0, set()
+        return parent.subtree_prefix, parent.level + 1, {*parent.ancestor_ids, parent.pk}
+
+    def row_errors(self, row, target, deep):
+        pk, path, level, supplier_type, debt = row
+        supplier_type = self.changes.get("supplier_type", supplier_type)
+        has_supplier = bool(path)
+        messages = []
+        if target is not None:
+            new_path, new_level, chain = target
+            if pk == getattr(self.changes["supplier"], "pk", None):
+                messages.append("Поставщик не может ссылаться сам на себя.")
+            elif pk in chain:
+                messages.append("Цепочка поставщиков образует цикл.")
+            if pk in deep:
+                messages.append(
+                    "После переноса потомки звена окажутся глубже максимального уровня "
+                    f"({settings.SUPPLIER_MAX_DEPTH})."
+                )
+            level, has_supplier = new_level, bool(new_path)
+        try:
+            Supplier.validate_rules(supplier_type, debt, level, has_supplier)
+        except ValidationError as e:
+            messages.extend(error_messages(e))
+        return messages
+
+    def validate(self):
+        """{id: ошибки} для каждой выбранной строки; пустой список — строку можно менять."""
+        target = self.target()
+        rows = list(self.queryset.order_by("pk").values_list("id", "path", "level", "supplier_type", "debt"))
+        deep = too_deep(rows, target[1]) if target is not None else set()
+        return {row[0]: self.row_errors(row, target, deep) for row in rows}
+
+    def apply(self, ids):
+        changes = dict(self.changes)
+        with transaction.atomic():
+            for chunk in chunks(ids, self.chunk_size):
+                queryset = Supplier.objects.filter(pk__in=chunk)
+                if "supplier" in changes:
+                    queryset.reparent(changes["supplier"], **{k: v for k, v in changes.items() if k != "supplier"})
+                else:
+                    queryset.update(**changes, updated_at=timezone.now())
+        # UPDATE не отправляет сигналы, поэтому кэш ответов сбрасывается целиком.
+        invalidate_all()
+
+    def run(self):
+        errors = self.validate()
+        valid = [pk for pk, messages in errors.items() if not messages]
+        invalid = len(errors) - len(valid)
+        # В строгом режиме одна ошибка отменяет всё изменение: корректные строки — skipped.
+        applied = not (invalid and self.strict)
+        if applied and valid:
+            self.apply(valid)
+        result = {"updated": len(valid) if applied else 0, "errors": invalid, "results": []}
+
+        for pk in errors if self.ids is None else self.ids:
+            if pk not in errors:
+                result["results"].append({"id": pk, "status": "not_found"})
+            elif errors[pk]:
+                result["results"].append({"id": pk, "status": "invalid", "errors": errors[pk]})
+            else:
+                result["results"].append({"id": pk, "status": "updated" if applied else "skipped"})
+        return result
+
+
+def delete_chunk(ids):
+    """
+    Удаляет пачку поставщиков с их товарами и итогами задолженности.
+
+    Публичный QuerySet.delete() здесь не подходит: из-за сигналов коллектор удалял бы строки
+    по одной и на каждую выполнял бы перенос поддерева, сброс кэша и обновление поставщика
+    каждого товара. Поэтому связи из DELETE_RELATIONS обрабатываются здесь для всей пачки:
+    клиенты удаляемых звеньев становятся корнями (как on_delete=SET_NULL), их поддеревья
+    переносятся по одному UPDATE на звено с клиентами, а товары, итоги и сами поставщики
+    удаляются одним DELETE на таблицу. _raw_delete — внутренний метод Django (им же пользуется
+    коллектор для быстрого удаления); его поведение и связи закреплены тестами
+    SupplierBulkActionsTest. Работу сигналов (итоги предков, кэш ответов) выполняют
+    delete_chunk и bulk_delete.
+    """
+    rows = list(Supplier.objects.filter(pk__in=ids).values_list("id", "path", "level"))
+    ids = [pk for pk, _, _ in rows]
+    with_clients = set(Supplier.objects.filter(supplier_id__in=ids).values_list("supplier_id", flat=True))
+    # Сначала глубокие: перенос предка не должен опередить перенос потомков внутри пачки.
+    for pk, path, level in sorted(rows, key=lambda row: -row[2]):
+        if pk in with_clients:
+            Supplier.rebase_subtree(f"{path}{pk}/", "", -(level + 1))
+    # Пути уже перенесены, поэтому в обход SupplierQuerySet.update() с его reparent().
+    models.QuerySet.update(Supplier.objects.filter(supplier_id__in=ids), supplier=None, updated_at=timezone.now())
+    for model, field in ((Product, "supplier_id"), (SupplierDebtRollup, "supplier_id"), (Supplier, "pk")):
+        queryset = model.objects.filter(**{f"{field}__in": ids})
+        queryset._raw_delete(queryset.db)
+    if rollup_enabled():
+        ancestors = {int(pk) for _, path, _ in rows for pk in path.split("/") if pk}
+        refresh_debt_rollups(ancestors - set(ids))
+    return ids
+
+
+def bulk_delete(queryset, ids, chunk_size=BULK_CHUNK_SIZE):
+    """Удаляет выбранных поставщиков пачками; для каждого id — исход deleted или not_found."""
+    with transaction.atomic():
+        found = list(queryset.order_by("pk").values_list("id", flat=True))
+        for chunk in chunks(found, chunk_size):
+            delete_chunk(chunk)
+    invalidate_all()
+    found = set(found)
+    return {
+        "deleted": len(found),
+        "results": [
+            {"id": pk, "status": "deleted" if pk in found else "not_found"}
+            for pk in (sorted(found) if ids is None else ids)
+        ],
+    }
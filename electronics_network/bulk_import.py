@@ -0,0 +1,274 @@
+import csv
+import io
+import json
+import os
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import invalidate_all
+from .debt import refresh_debt_rollups, rollup_enabled
+from .models import Product, Supplier
+
+IMPORT_CHUNK_SIZE = 1000
+
+SUPPLIER_IMPORT_FIELDS = ["name", "email", "country", "city", "street", "house_number", "supplier_type", "debt"]
+PRODUCT_IMPORT_FIELDS = ["name", "model", "release_date"]
+
+
+def read_rows(file, name):
+    """Читает список строк из CSV- или JSON-файла (по расширению имени)."""
+    content = file.read()
+    if isinstance(content, bytes):
+        content = content.decode("utf-8-sig")
+    if os.path.splitext(name)[1].lower() == ".json":
+        rows = json.loads(content)
+        if not isinstance(rows, list):
+            raise ValueError(f"{name}: ожидается JSON-массив строк.")
+        return rows
+    return list(csv.DictReader(io.StringIO(content)))
+
+
+def error_messages(error):
+    if hasattr(error, "message_dict"):
+        return [f"{field}: {message}" for field, messages in error.message_dict.items() for message in messages]
+    return list(error.messages)
+
+
+def _value(row, field):
+    value = row.get(field)
+    if isinstance(value, str):
+        value = value.strip()
+    return None if value in (None, "") else value
+
+
+def _key(row, field):
+    value = _value(row, field)
+    return None if value is None else str(value)
+
+
+def _id(row, field):
+    value = _value(row, field)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValidationError({field: f"Некорректный id: {value}."})
+
+
+class NetworkImport:
+    """
+    Массовый импорт поставщиков и товаров.
+
+    Поставщики ссылаются на родителя либо по внешнему ключу строки того же файла (`supplier`),
+    либо по id уже существующего поставщика (`supplier_id`); товары — так же. Правила
+    `Supplier.clean()` проверяются для всей пачки сразу: существующие родители читаются одним
+    запросом, уровни вычисляются в памяти. Запись идёт через `bulk_create` по уровням иерархии.
+    """
+
+    def __init__(self, supplier_rows, product_rows, strict=False, allow_debt=True, chunk_size=IMPORT_CHUNK_SIZE):
+        self.supplier_rows = supplier_rows
+        self.product_rows = product_rows
+        self.strict = strict
+        self.allow_debt = allow_debt
+        self.chunk_size = chunk_size
+        self.errors = []
+        self.suppliers = {}
+        self.products = []
+
+    def add_error(self, section, row, messages, key=None):
+        error = {"section": section, "row": row, "errors": messages}
+        if key is not None:
+            error["key"] = key
+        self.errors.append(error)
+
+    def run(self):
+        self.validate_suppliers()
+        self.validate_products()
+        result = {"suppliers_created": 0, "products_created": 0, "errors": self.errors}
+        if self.errors and self.strict:
+            return result
+        with transaction.atomic():
+            result["suppliers_created"] = self.write_suppliers()
+            result["products_created"] = self.write_products()
+            if rollup_enabled():
+                refresh_debt_rollups([candidate["supplier"].pk for candidate in self.suppliers.values()])
+        # bulk_create не отправляет сигналы, поэтому кэш ответов сбрасывается целиком.
+        invalidate_all()
+        return result
+
+    def validate_suppliers(self):
+        candidates = {}
+        for index, row in enumerate(self.supplier_rows, start=1):
+            key = _key(row, "key")
+            fields = {field: _value(row, field) for field in SUPPLIER_IMPORT_FIELDS if _value(row, field) is not None}
+            if not self.allow_debt:
+                fields.pop("debt", None)
+            supplier = Supplier(**fields)
+            messages = []
+            try:
+                supplier.clean_fields(exclude=["supplier"])
+            except ValidationError as e:
+                messages.extend(error_messages(e))
+            parent_id = None
+            try:
+                parent_id = _id(row, "supplier_id")
+            except ValidationError as e:
+                messages.extend(error_messages(e))
+            if key is None:
+                messages.append("key: Не указан внешний ключ строки.")
+            elif key in candidates:
+                messages.append(f"key: Ключ {key} уже встречался в строке {candidates[key]['row']}.")
+            if messages:
+                self.add_error("suppliers", index, messages, key)
+                continue
+            candidates[key] = {
+                "row": index,
+                "supplier": supplier,
+                "parent_key": _key(row, "supplier"),
+                "parent_id": parent_id,
+            }
+
+        parent_ids = {candidate["parent_id"] for candidate in candidates.values()} - {None}
+        existing = dict(Supplier.objects.filter(pk__in=parent_ids).values_list("pk", "path"))
+
+        # Уровни считаются без рекурсии: от каждой строки поднимаемся по ключам файла до звена
+        # с известным уровнем или без родителя в файле, затем проходим цепочку сверху вниз.
+        # Больше SUPPLIER_MAX_DEPTH шагов вверх — строка заведомо глубже допустимого;
+        # ключ, уже встреченный в цепочке, — цикл.
+        levels = {}
+
+        def resolve(key):
+            candidate = candidates[key]
+            parent_key, parent_id = candidate["parent_key"], candidate["parent_id"]
+            level, message = None, None
+            if parent_key is not None and parent_id is not None:
+                message = "supplier: Укажите либо ключ поставщика из файла, либо id существующего поставщика."
+            elif parent_key is not None:
+                if parent_key == key:
+                    message = "Поставщик не может ссылаться сам на себя."
+                elif parent_key not in candidates:
+                    message = f"supplier: Поставщик с ключом {parent_key} отсутствует или содержит ошибки."
+                elif parent_key not in levels:
+                    # Родитель ещё не вычислен только у верхнего звена цепочки, замкнутой в цикл.
+                    message = "Цепочка поставщиков образует цикл."
+                elif levels[parent_key] is None:
+                    message = f"supplier: Поставщик с ключом {parent_key} содержит ошибки."
+                else:
+                    level = levels[parent_key] + 1
+            elif parent_id is not None:
+                if parent_id not in existing:
+                    message = f"supplier_id: Поставщик с id {parent_id} не найден."
+                else:
+                    level = existing[parent_id].count("/") + 1
+            else:
+                level = 0
+
+            if message is None:
+                supplier = candidate["supplier"]
+                try:
+                    Supplier.validate_rules(supplier.supplier_type, supplier.debt, level, level > 0)
+                except ValidationError as e:
+                    message = "; ".join(e.messages)
+            if message is not None:
+                self.add_error("suppliers", candidate["row"], [message], key)
+                level = None
+            levels[key] = level
+
+        for start in candidates:
+            chain, seen, key = [], set(), start
+            while (
+                key in candidates
+                and key not in levels
+                and key not in seen
+                and len(chain) <= settings.SUPPLIER_MAX_DEPTH
+            ):
+                chain.append(key)
+                seen.add(key)
+                key = candidates[key]["parent_key"]
+            if key in candidates and key not in levels and key not in seen:
+                levels[start] = None
+                self.add_error(
+                    "suppliers",
+                    candidates[start]["row"],
+                    [f"Превышена максимальная глубина иерархии ({settings.SUPPLIER_MAX_DEPTH})."],
+                    start,
+                )
+                continue
+            for key in reversed(chain):
+                resolve(key)
+
+        for key, candidate in candidates.items():
+            if levels[key] is not None:
+                candidate["level"] = levels[key]
+                if candidate["parent_id"] is not None:
+                    candidate["path"] = f"{existing[candidate['parent_id']]}{candidate['parent_id']}/"
+                self.suppliers[key] = candidate
+
+    def validate_products(self):
+        rows = []
+        for index, row in enumerate(self.product_rows, start=1):
+            product = Product(**{field: _value(row, field) for field in PRODUCT_IMPORT_FIELDS})
+            messages = []
+            try:
+                product.clean_fields(exclude=["supplier"])
+            except ValidationError as e:
+                messages.extend(error_messages(e))
+            parent_key, parent_id = _key(row, "supplier"), None
+            try:
+                parent_id = _id(row, "supplier_id")
+            except ValidationError as e:
+                messages.extend(error_messages(e))
+            rows.append((index, product, parent_key, parent_id, messages))
+
+        parent_ids = {parent_id for _, _, _, parent_id, _ in rows} - {None}
+        existing = set(Supplier.objects.filter(pk__in=parent_ids).values_list("pk", flat=True))
+
+        for index, product, parent_key, parent_id, messages in rows:
+            if (parent_key is None) == (parent_id is None):
+                messages.append("supplier: Укажите либо ключ поставщика из файла, либо id существующего поставщика.")
+            elif parent_key is not None and parent_key not in self.suppliers:
+                messages.append(f"supplier: Поставщик с ключом {parent_key} отсутствует или содержит ошибки.")
+            elif parent_id is not None and parent_id not in existing:
+                messages.append(f"supplier_id: Поставщик с id {parent_id} не найден.")
+            if messages:
+                self.add_error("products", index, messages)
+                continue
+            product.supplier_id = parent_id
+            self.products.append((product, parent_key))
+
+    def write_suppliers(self):
+        # Родитель из файла получает pk только после вставки, поэтому пишем уровень за уровнем.
+        by_level = {}
+        for candidate in self.suppliers.values():
+            by_level.setdefault(candidate["level"], []).append(candidate)
+
+        for level in sorted(by_level):
+            batch = []
+            for candidate in by_level[level]:
+                supplier = candidate["supplier"]
+                if candidate["parent_key"] is not None:
+                    parent = self.suppliers[candidate["parent_key"]]["supplier"]
+                    supplier.supplier_id = parent.pk
+                    supplier.path = parent.subtree_prefix
+                elif candidate["parent_id"] is not None:
+                    supplier.supplier_id = candidate["parent_id"]
+                    supplier.path = candidate["path"]
+                supplier.level = level
+                batch.append(supplier)
+            Supplier.objects.bulk_create(batch, batch_size=self.chunk_size)
+        return len(self.suppliers)
+
+    def write_products(self):
+        batch = []
+        for product, parent_key in self.products:
+            if parent_key is not None:
+                product.supplier_id = self.suppliers[parent_key]["supplier"].pk
+            batch.append(product)
+        Product.objects.bulk_create(batch, batch_size=self.chunk_size)
+        existing_ids = {product.supplier_id for product, parent_key in self.products if parent_key is None}
+        Supplier.objects.filter(pk__in=existing_ids).update(updated_at=timezone.now())
+        return len(batch)
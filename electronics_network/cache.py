@@ -0,0 +1,130 @@
+import hashlib
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from .conditional import not_modified_response
+
+# Ключи ответов не удаляются, а становятся недостижимыми: в каждый ключ входят
+# токены версий. Версия поставщика меняется при изменении его самого или любого
+# звена ниже по цепочке, версия списков — при любом изменении, поколение — при
+# массовых операциях в обход сигналов (queryset.update, bulk_create).
+GENERATION_KEY = "suppliers:generation"
+LIST_VERSION_KEY = "suppliers:list"
+CACHED_HEADERS = ("ETag", "Last-Modified")
+# По этим версиям строится ETag списка (ConditionalGetMixin.versioned_response).
+LIST_VALIDATOR_KEYS = [GENERATION_KEY, LIST_VERSION_KEY]
+
+
+def get_cache():
+    return caches[settings.SUPPLIER_CACHE_ALIAS]
+
+
+def object_version_key(pk):
+    return f"suppliers:object:{pk}"
+
+
+def chain_ids(supplier_id, path):
+    """id поставщика и всех его предков по материализованному пути."""
+    return {supplier_id} | {int(pk) for pk in path.split("/") if pk}
+
+
+def get_versions(keys):
+    cache = get_cache()
+    versions = cache.get_many(keys)
+    missing = {key: uuid4().hex for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+async def aget_versions(keys):
+    cache = get_cache()
+    versions = await cache.aget_many(keys)
+    missing = {key: uuid4().hex for key in keys if key not in versions}
+    if missing:
+        await cache.aset_many(missing, timeout=None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def bump_versions(keys):
+    # Версии меняются сразу и ещё раз после коммита: иначе параллельный запрос,
+    # прочитавший старые данные до коммита, сохранил бы их под новой версией.
+    def bump():
+        get_cache().set_many({key: uuid4().hex for key in keys}, timeout=None)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def invalidate_suppliers(ids):
+    bump_versions([LIST_VERSION_KEY, *(object_version_key(pk) for pk in ids)])
+
+
+def invalidate_all():
+    bump_versions([GENERATION_KEY, LIST_VERSION_KEY])
+
+
+def _response_cache_key(request, version_keys, versions):
+    material = "|".join([request.build_absolute_uri(), request.accepted_media_type or "", *version_keys, *versions])
+    return f"suppliers:response:{hashlib.sha256(material.encode()).hexdigest()}"
+
+
+def response_cache_key(request, version_keys):
+    return _response_cache_key(request, version_keys, get_versions([GENERATION_KEY, *version_keys]))
+
+
+async def aresponse_cache_key(request, version_keys):
+    return _response_cache_key(request, version_keys, await aget_versions([GENERATION_KEY, *version_keys]))
+
+
+def cached_entry(response):
+    return response.data, {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers}
+
+
+def cached_entry_response(request, entry):
+    data, headers = entry
+    response = Response(data, headers=headers)
+    return not_modified_response(request, response) or response
+
+
+class CachedResponseMixin:
+    """Кэширует успешные GET-ответы вьюсета в кэше SUPPLIER_CACHE_ALIAS."""
+
+    cache_responses = True
+
+    def use_response_cache(self):
+        return self.cache_responses and settings.SUPPLIER_CACHE_TIMEOUT > 0
+
+    def cached_response(self, request, version_keys, build_response):
+        if not self.use_response_cache():
+            return build_response()
+        cache = get_cache()
+        key = response_cache_key(request, version_keys)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached_entry_response(request, cached)
+        response = build_response()
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, cached_entry(response), settings.SUPPLIER_CACHE_TIMEOUT)
+        return response
+
+    async def acached_response(self, request, version_keys, build_response):
+        """То же для async-представлений: build_response — корутинная функция."""
+        if not self.use_response_cache():
+            return await build_response()
+        cache = get_cache()
+        key = await aresponse_cache_key(request, version_keys)
+        cached = await cache.aget(key)
+        if cached is not None:
+            return cached_entry_response(request, cached)
+        response = await build_response()
+        if response.status_code == status.HTTP_200_OK:
+            await cache.aset(key, cached_entry(response), settings.SUPPLIER_CACHE_TIMEOUT)
+        return response
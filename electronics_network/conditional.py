@@ -0,0 +1,106 @@
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import status
+
+
+def conditional_state():
+    return {"last_modified": Max("updated_at"), "count": Count("id")}
+
+
+def not_modified_response(request, response):
+    """304, если валидаторы ответа совпадают с If-None-Match/If-Modified-Since запроса."""
+    last_modified = response.headers.get("Last-Modified")
+    return get_conditional_response(
+        request,
+        etag=response.headers.get("ETag"),
+        last_modified=parse_http_date_safe(last_modified) if last_modified else None,
+    )
+
+
+def versions_etag(request, versions):
+    material = "|".join([request.build_absolute_uri(), request.accepted_media_type or "", *versions])
+    return quote_etag(hashlib.sha256(material.encode()).hexdigest())
+
+
+class ConditionalGetMixin:
+    """
+    Условные GET. Карточка — по `updated_at`: если у клиента актуальная версия, вьюсет
+    отвечает 304 после одного агрегирующего запроса, ничего не сериализуя. Список — по
+    токенам версий кэша ответов (`versioned_response`): агрегат по всей выборке на каждую
+    страницу стоил бы больше самой страницы.
+    """
+
+    def conditional_validators(self, request, state):
+        """ETag и Last-Modified по состоянию выборки; None, если выборка пуста."""
+        if not state["count"]:
+            return None
+        # Количество строк входит в ETag, чтобы удаление тоже меняло версию.
+        last_modified = int(state["last_modified"].timestamp())
+        material = f"{request.build_absolute_uri()}|{request.accepted_media_type}|{state['count']}|"
+        etag = quote_etag(hashlib.sha256(f"{material}{state['last_modified'].isoformat()}".encode()).hexdigest())
+        return etag, last_modified
+
+    def set_validators(self, response, validators):
+        if response.status_code == status.HTTP_200_OK:
+            etag, last_modified = validators
+            response.headers["ETag"] = etag
+            response.headers["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def conditional_response(self, request, queryset, build_response):
+        try:
+            state = queryset.order_by().aggregate(**conditional_state())
+        except (TypeError, ValueError, ValidationError):
+            return build_response()
+        validators = self.conditional_validators(request, state)
+        if validators is None:
+            return build_response()
+        etag, last_modified = validators
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+        return self.set_validators(build_response(), validators)
+
+    async def aconditional_response(self, request, queryset, build_response):
+        """То же для async-представлений: build_response — корутинная функция."""
+        try:
+            state = await queryset.order_by().aaggregate(**conditional_state())
+        except (TypeError, ValueError, ValidationError):
+            return await build_response()
+        validators = self.conditional_validators(request, state)
+        if validators is None:
+            return await build_response()
+        etag, last_modified = validators
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+        return self.set_validators(await build_response(), validators)
+
+    def versioned_response(self, request, versions, build_response):
+        """
+        ETag из токенов версий (cache.get_versions): они меняются при любом изменении
+        поставщиков и товаров, поэтому 304 отдаётся без запросов к БД. Last-Modified нет.
+        """
+        etag = versions_etag(request, versions)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+        response = build_response()
+        if response.status_code == status.HTTP_200_OK:
+            response.headers["ETag"] = etag
+        return response
+
+    async def aversioned_response(self, request, versions, build_response):
+        """То же для async-представлений: build_response — корутинная функция."""
+        etag = versions_etag(request, versions)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+        response = await build_response()
+        if response.status_code == status.HTTP_200_OK:
+            response.headers["ETag"] = etag
+        return response
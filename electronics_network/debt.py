@@ -0,0 +1,125 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (Case, Count, DecimalField, F, IntegerField, Max,
+                              Q, Sum, Value, When)
+from django.db.models.functions import Cast, Coalesce, StrIndex, Substr
+
+from .cache import chain_ids
+from .models import Supplier, SupplierDebtRollup
+
+DEBT_GROUPINGS = ("country", "supplier_type", "factory")
+ROLLUP_CHUNK_SIZE = 1000
+
+
+def factory_id():
+    """id корня цепочки (завода): первый id в пути, у самого корня — собственный id."""
+    return Case(
+        When(level=0, then=F("id")),
+        default=Cast(Substr("path", 1, StrIndex("path", Value("/")) - 1), IntegerField()),
+    )
+
+
+def debt_aggregates():
+    return {
+        "count": Count("id"),
+        "total_debt": Coalesce(Sum("debt"), Value(Decimal("0.00")), output_field=DecimalField()),
+        "max_debt": Max("debt"),
+    }
+
+
+def subtree(queryset, root):
+    """Звено root вместе со всеми его потомками."""
+    return queryset.filter(Q(pk=root.pk) | Q(path__startswith=root.subtree_prefix))
+
+
+def debt_summary(queryset):
+    return queryset.order_by().aggregate(**debt_aggregates())
+
+
+def debt_groups(queryset, group_by):
+    if group_by == "factory":
+        queryset = queryset.annotate(factory=factory_id())
+    return queryset.order_by().values(group_by).annotate(**debt_aggregates()).order_by(group_by)
+
+
+def rollup_enabled():
+    return settings.SUPPLIER_DEBT_ROLLUP
+
+
+def rollup_summary(supplier_id):
+    """Итоги поддерева из таблицы итогов; None, если строки ещё нет."""
+    row = SupplierDebtRollup.objects.filter(pk=supplier_id).values("supplier_count", "debt_total", "max_debt").first()
+    if row is None:
+        return None
+    return {"count": row["supplier_count"], "total_debt": row["debt_total"], "max_debt": row["max_debt"]}
+
+
+def rollup_factory_groups():
+    return (
+        SupplierDebtRollup.objects.filter(supplier__level=0)
+        .annotate(factory=F("supplier_id"), count=F("supplier_count"), total_debt=F("debt_total"))
+        .values("factory", "count", "total_debt", "max_debt")
+        .order_by("factory")
+    )
+
+
+def _merge(stats, total, count, max_debt):
+    stats[0] += total
+    stats[1] += count
+    stats[2] = max(stats[2], max_debt)
+
+
+def _save_rollups(stats, chunk_size=ROLLUP_CHUNK_SIZE):
+    SupplierDebtRollup.objects.bulk_create(
+        [
+            SupplierDebtRollup(supplier_id=pk, debt_total=total, supplier_count=count, max_debt=max_debt)
+            for pk, (total, count, max_debt) in stats.items()
+        ],
+        batch_size=chunk_size,
+        update_conflicts=True,
+        unique_fields=["supplier"],
+        update_fields=["debt_total", "supplier_count", "max_debt"],
+    )
+
+
+def refresh_debt_rollups(supplier_ids):
+    """
+    Пересчитывает итоги для звеньев supplier_ids и всех их предков.
+
+    Итоги звена — его собственная задолженность плюс итоги клиентов. Клиенты вне набора
+    не менялись, поэтому их итоги читаются из таблицы одним запросом, а сам набор
+    сворачивается снизу вверх в памяти: три запроса независимо от глубины цепочки.
+    """
+    ids = set()
+    for pk, path in Supplier.objects.filter(pk__in=supplier_ids).values_list("id", "path"):
+        ids |= chain_ids(pk, path)
+    nodes = list(Supplier.objects.filter(pk__in=ids).values_list("id", "supplier_id", "debt", "level"))
+    stats = {pk: [debt, 1, debt] for pk, _, debt, _ in nodes}
+
+    outside = (
+        SupplierDebtRollup.objects.filter(supplier__supplier_id__in=stats)
+        .exclude(supplier_id__in=stats)
+        .values("supplier__supplier_id")
+        .annotate(total=Sum("debt_total"), count=Sum("supplier_count"), max_debt=Max("max_debt"))
+        .order_by()
+    )
+    for row in outside:
+        _merge(stats[row["supplier__supplier_id"]], row["total"], row["count"], row["max_debt"])
+    for pk, parent_id, _, _ in sorted(nodes, key=lambda node: -node[3]):
+        if parent_id in stats:
+            _merge(stats[parent_id], *stats[pk])
+    _save_rollups(stats)
+
+
+def rebuild_debt_rollups(chunk_size=ROLLUP_CHUNK_SIZE):
+    """Полностью пересобирает таблицу итогов за один проход по поставщикам."""
+    stats = {}
+    for pk, path, debt in Supplier.objects.values_list("id", "path", "debt").iterator(chunk_size=chunk_size):
+        for supplier_id in chain_ids(pk, path):
+            _merge(stats.setdefault(supplier_id, [Decimal("0.00"), 0, debt]), debt, 1, debt)
+    with transaction.atomic():
+        SupplierDebtRollup.objects.all().delete()
+        _save_rollups(stats, chunk_size)
+    return len(stats)
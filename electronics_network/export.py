@@ -0,0 +1,71 @@
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+
+from .models import Product
+
+EXPORT_FORMATS = ("ndjson", "csv")
+EXPORT_CONTENT_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+EXPORT_CHUNK_SIZE = 2000
+
+SUPPLIER_FIELDS = [
+    "id",
+    "name",
+    "email",
+    "country",
+    "city",
+    "street",
+    "house_number",
+    "supplier_id",
+    "supplier_type",
+    "debt",
+    "created_at",
+    "level",
+]
+PRODUCT_FIELDS = ["id", "name", "model", "release_date"]
+CSV_HEADER = SUPPLIER_FIELDS + [f"product_{field}" for field in PRODUCT_FIELDS]
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def iter_suppliers(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    # iterator() с chunk_size читает серверным курсором и подгружает товары
+    # пачками по chunk_size поставщиков, поэтому память не растёт с размером таблицы.
+    queryset = (
+        queryset.prefetch_related(None)
+        .prefetch_related(Prefetch("products", queryset=Product.objects.order_by("id")))
+        .order_by("id")
+    )
+    yield from queryset.iterator(chunk_size=chunk_size)
+
+
+def ndjson_lines(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for supplier in iter_suppliers(queryset, chunk_size):
+        row = {field: getattr(supplier, field) for field in SUPPLIER_FIELDS}
+        row["products"] = [
+            {field: getattr(product, field) for field in PRODUCT_FIELDS} for product in supplier.products.all()
+        ]
+        yield encoder.encode(row) + "\n"
+
+
+def csv_lines(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_HEADER)
+    for supplier in iter_suppliers(queryset, chunk_size):
+        supplier_row = [getattr(supplier, field) for field in SUPPLIER_FIELDS]
+        products = supplier.products.all()
+        if not products:
+            yield writer.writerow(supplier_row + [""] * len(PRODUCT_FIELDS))
+        for product in products:
+            yield writer.writerow(supplier_row + [getattr(product, field) for field in PRODUCT_FIELDS])
+
+
+def export_lines(queryset, export_format, chunk_size=EXPORT_CHUNK_SIZE):
+    if export_format == "csv":
+        return csv_lines(queryset, chunk_size)
+    return ndjson_lines(queryset, chunk_size)
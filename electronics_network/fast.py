@@ -0,0 +1,99 @@
+from functools import lru_cache
+
+from rest_framework import serializers
+
+from .timing import timed
+
+# Для этих полей to_representation на значениях из БД ничего не меняет.
+IDENTITY_FIELDS = (serializers.CharField, serializers.IntegerField, serializers.ChoiceField)
+
+
+class ReadPlan:
+    """
+    Заранее собранный план чтения для read-only представления сериализатора.
+
+    Строки берутся через `values()`, вложенные списки — одним запросом на страницу,
+    а поля преобразуются теми же DRF-полями, что и в сериализаторе, но без создания
+    экземпляров моделей и сериализаторов на каждую строку. Вывод совпадает с
+    `serializer.data` побайтно.
+    """
+
+    def __init__(self, serializer):
+        model = serializer.Meta.model
+        self.fields = []
+        for name, field in serializer.fields.items():
+            if isinstance(field, serializers.ListSerializer):
+                relation = model._meta.get_field(field.source)
+                nested = (ReadPlan(field.child), relation.related_model, relation.field.attname)
+                self.fields.append((name, None, None, nested))
+                continue
+            if isinstance(field, serializers.PrimaryKeyRelatedField):
+                # В values() уже лежит сам id, а не связанный объект.
+                column = model._meta.get_field(field.source).attname
+                convert = field.pk_field.to_representation if field.pk_field is not None else None
+            else:
+                column = field.source
+                convert = None if isinstance(field, IDENTITY_FIELDS) else field.to_representation
+            self.fields.append((name, column, convert, None))
+        columns = [column for _, column, _, nested in self.fields if nested is None]
+        self.columns = list(dict.fromkeys(columns + ["id"]))
+
+    def values(self, queryset, *extra):
+        return queryset.prefetch_related(None).values(*dict.fromkeys([*self.columns, *extra]))
+
+    def nested_querysets(self, rows):
+        """Запросы вложенных списков для страницы: имя поля -> (queryset, имя внешнего ключа)."""
+        ids = [row["id"] for row in rows]
+        for name, _, _, nested in self.fields:
+            if nested is None:
+                continue
+            plan, related_model, fk = nested
+            related = related_model._default_manager.filter(**{f"{fk}__in": ids})
+            yield name, plan.values(related, fk).order_by("id"), fk
+
+    def fetch_nested(self, rows):
+        grouped = {}
+        for name, queryset, fk in self.nested_querysets(rows):
+            grouped[name] = {}
+            for related_row in queryset:
+                grouped[name].setdefault(related_row[fk], []).append(related_row)
+        return grouped
+
+    async def afetch_nested(self, rows):
+        grouped = {}
+        for name, queryset, fk in self.nested_querysets(rows):
+            grouped[name] = {}
+            async for related_row in queryset.aiterator():
+                grouped[name].setdefault(related_row[fk], []).append(related_row)
+        return grouped
+
+    def render_rows(self, rows, grouped):
+        data = []
+        for row in rows:
+            item = {}
+            for name, column, convert, nested in self.fields:
+                if nested is not None:
+                    # Вложенность одного уровня: у товаров своих вложенных списков нет.
+                    item[name] = nested[0].render_rows(grouped[name].get(row["id"], []), {})
+                    continue
+                value = row[column]
+                item[name] = value if convert is None or value is None else convert(value)
+            data.append(item)
+        return data
+
+    def render(self, rows):
+        rows = list(rows)
+        grouped = self.fetch_nested(rows) if rows else {}
+        with timed("serialize"):
+            return self.render_rows(rows, grouped)
+
+    async def arender(self, rows):
+        rows = list(rows)
+        grouped = await self.afetch_nested(rows) if rows else {}
+        with timed("serialize"):
+            return self.render_rows(rows, grouped)
+
+
+@lru_cache(maxsize=128)
+def get_read_plan(serializer_class, fields=None):
+    return ReadPlan(serializer_class(context={"fields": None if fields is None else list(fields)}))
@@ -0,0 +1,106 @@
+from datetime import datetime, time
+from decimal import Decimal, InvalidOperation
+
+from django.db.models.functions import Lower
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .models import Supplier
+
+
+def split_values(value):
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+def filter_countries(queryset, value):
+    """Поставщики из стран value (через запятую) без учёта регистра, по индексу LOWER(country)."""
+    countries = split_values(value)
+    if not countries:
+        return queryset
+    return queryset.alias(country_ci=Lower("country")).filter(country_ci__in=[country.lower() for country in countries])
+
+
+def parse_decimal(name, value):
+    try:
+        number = Decimal(value)
+    except InvalidOperation:
+        number = None
+    if number is None or not number.is_finite():
+        raise ValidationError({name: "Ожидается число."})
+    return number
+
+
+def parse_moment(name, value):
+    try:
+        moment = parse_datetime(value)
+        day = parse_date(value) if moment is None else None
+    except ValueError:
+        moment = day = None
+    if moment is None and day is None:
+        raise ValidationError({name: "Ожидается дата или дата и время в формате ISO 8601."})
+    if moment is None:
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+class SupplierFilterBackend(BaseFilterBackend):
+    """
+    Фильтры списка поставщиков. Значения через запятую объединяются по ИЛИ.
+
+    - `country` — без учёта регистра (индекс по LOWER(country));
+    - `supplier_type`, `city`, `level` — точное совпадение;
+    - `debt_min`, `debt_max` — задолженность в диапазоне, включительно;
+    - `created_after`, `created_before` — created_at >= created_after и < created_before.
+    """
+
+    query_params = (
+        "country",
+        "supplier_type",
+        "city",
+        "level",
+        "debt_min",
+        "debt_max",
+        "created_after",
+        "created_before",
+    )
+
+    def is_filtering(self, request):
+        return any(request.query_params.get(name) for name in self.query_params)
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+
+        queryset = filter_countries(queryset, params.get("country"))
+
+        supplier_types = split_values(params.get("supplier_type"))
+        if supplier_types:
+            unknown = set(supplier_types) - {choice for choice, _ in Supplier.SUPPLIER_TYPE_CHOICES}
+            if unknown:
+                raise ValidationError({"supplier_type": f"Неизвестные типы: {', '.join(sorted(unknown))}."})
+            queryset = queryset.filter(supplier_type__in=supplier_types)
+
+        cities = split_values(params.get("city"))
+        if cities:
+            queryset = queryset.filter(city__in=cities)
+
+        levels = split_values(params.get("level"))
+        if levels:
+            if not all(level.isdigit() for level in levels):
+                raise ValidationError({"level": "Уровень должен быть неотрицательным целым числом."})
+            queryset = queryset.filter(level__in=[int(level) for level in levels])
+
+        if params.get("debt_min"):
+            queryset = queryset.filter(debt__gte=parse_decimal("debt_min", params["debt_min"]))
+        if params.get("debt_max"):
+            queryset = queryset.filter(debt__lte=parse_decimal("debt_max", params["debt_max"]))
+
+        if params.get("created_after"):
+            queryset = queryset.filter(created_at__gte=parse_moment("created_after", params["created_after"]))
+        if params.get("created_before"):
+            queryset = queryset.filter(created_at__lt=parse_moment("created_before", params["created_before"]))
+
+        return queryset
@@ -0,0 +1,229 @@
+import csv
+import io
+import random
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .cache import invalidate_all
+from .debt import rebuild_debt_rollups, rollup_enabled
+from .models import Product, Supplier, SupplierDebtRollup
+
+GENERATOR_BATCH_SIZE = 5000
+GENERATOR_METHODS = ("auto", "bulk", "copy")
+GENERATOR_TIMESTAMP_STEP = timedelta(milliseconds=1)
+
+COUNTRIES = {
+    "Россия": ("Москва", "Санкт-Петербург", "Новосибирск", "Екатеринбург", "Казань"),
+    "Казахстан": ("Алматы", "Астана", "Шымкент"),
+    "Беларусь": ("Минск", "Гомель", "Брест"),
+    "Китай": ("Шэньчжэнь", "Шанхай", "Гуанчжоу"),
+}
+STREETS = ("Ленина", "Мира", "Садовая", "Центральная", "Заводская", "Новая")
+PRODUCT_NAMES = ("Смартфон", "Ноутбук", "Планшет", "Телевизор", "Наушники", "Монитор", "Роутер")
+SUPPLIER_FIELDS = (
+    "id",
+    "name",
+    "email",
+    "country",
+    "city",
+    "street",
+    "house_number",
+    "supplier_id",
+    "supplier_type",
+    "debt",
+    "path",
+    "level",
+)
+PRODUCT_FIELDS = ("name", "model", "release_date", "supplier_id")
+
+
+@dataclass(frozen=True)
+class NetworkSpec:
+    """Форма сети: factories заводов, у каждого звена fan_out клиентов на depth уровней ниже."""
+
+    factories: int
+    depth: int
+    fan_out: int
+    products: int
+    seed: int = 0
+
+    @property
+    def supplier_count(self):
+        return self.factories * sum(self.fan_out**level for level in range(self.depth + 1))
+
+    @property
+    def product_count(self):
+        return self.supplier_count * self.products
+
+
+class BulkWriter:
+    def write(self, model, fields, rows):
+        model.objects.bulk_create([model(**dict(zip(fields, row))) for row in rows])
+
+    def finish(self):
+        pass
+
+
+class CopyWriter:
+    """
+    COPY ... FROM STDIN для PostgreSQL: в разы быстрее INSERT на миллионах строк.
+
+    created_at и updated_at задаются явно: у строк каждой модели время растёт на
+    GENERATOR_TIMESTAMP_STEP в порядке записи и заканчивается не позже момента запуска.
+    Одно время на все строки не похоже на реальные данные.
+    """
+
+    def __init__(self, rows=0):
+        self.start = timezone.now() - GENERATOR_TIMESTAMP_STEP * rows
+        self.written = {}
+
+    def timestamps(self, model, count):
+        written = self.written.get(model, 0)
+        self.written[model] = written + count
+        return [self.start + GENERATOR_TIMESTAMP_STEP * number for number in range(written, written + count)]
+
+    def write(self, model, fields, rows):
+        timestamps = [name for name in ("created_at", "updated_at") if any(f.name == name for f in model._meta.fields)]
+        columns = [model._meta.get_field(name).column for name in fields] + timestamps
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row, moment in zip(rows, self.timestamps(model, len(rows))):
+            writer.writerow([r"\N" if value is None else value for value in row] + [moment] * len(timestamps))
+        sql = f"COPY {model._meta.db_table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+        with connection.cursor() as cursor:
+            raw = cursor.cursor
+            if hasattr(raw, "copy_expert"):
+                buffer.seek(0)
+                raw.copy_expert(sql, buffer)
+            else:
+                with raw.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+
+    def finish(self):
+        # id поставщиков заданы явно, поэтому последовательность нужно догнать.
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [Supplier, Product]):
+                cursor.execute(sql)
+
+
+def get_writer(method, rows=0):
+    """rows — сколько строк самой большой таблицы будет записано (для времени создания при COPY)."""
+    if method == "auto":
+        method = "copy" if connection.vendor == "postgresql" else "bulk"
+    if method == "copy" and connection.vendor != "postgresql":
+        raise ValueError("COPY доступен только на PostgreSQL.")
+    return CopyWriter(rows) if method == "copy" else BulkWriter()
+
+
+def clear_network():
+    """Удаляет товары, итоги и поставщиков (TRUNCATE на PostgreSQL) без обхода связей в Python."""
+    tables = [Product._meta.db_table, SupplierDebtRollup._meta.db_table, Supplier._meta.db_table]
+    connection.ops.execute_sql_flush(connection.ops.sql_flush(no_style(), tables, allow_cascade=True))
+
+
+class NetworkGenerator:
+    """
+    Генератор сети для нагрузочных проверок.
+
+    id поставщиков назначаются заранее (после текущего максимума), поэтому путь и уровень
+    каждого звена известны без чтения из БД, и сеть пишется потоком, уровень за уровнем,
+    пачками по batch_size: через bulk_create или COPY на PostgreSQL. В памяти держится
+    только (id, путь) предыдущего уровня. Данные детерминированы при одинаковом seed.
+    Генератор рассчитан на отдельную базу для замеров: параллельные вставки в ту же таблицу
+    могут занять те же id.
+    """
+
+    def __init__(self, spec, batch_size=GENERATOR_BATCH_SIZE, method="auto", on_progress=None):
+        if spec.depth > settings.SUPPLIER_MAX_DEPTH:
+            raise ValueError(f"Глубина больше SUPPLIER_MAX_DEPTH ({settings.SUPPLIER_MAX_DEPTH}).")
+        self.spec = spec
+        self.batch_size = batch_size
+        self.writer = get_writer(method, max(spec.supplier_count, spec.product_count))
+        self.on_progress = on_progress
+        self.random = random.Random(spec.seed)
+        self.locations = [(country, city) for country, cities in COUNTRIES.items() for city in cities]
+
+    def supplier_row(self, pk, parent, path, level):
+        country, city = self.random.choice(self.locations)
+        if level == 0:
+            supplier_type, name, debt = "factory", f"Завод {pk}", Decimal("0.00")
+        else:
+            supplier_type = self.random.choice(("retail", "entrepreneur"))
+            prefix = "Сеть" if supplier_type == "retail" else "ИП"
+            name = f"{prefix} {pk}"
+            debt = Decimal(self.random.randrange(0, 10_000_000)) / 100
+        street = self.random.choice(STREETS)
+        house = str(self.random.randint(1, 200))
+        return (
+            pk,
+            name,
+            f"supplier{pk}@example.com",
+            country,
+            city,
+            street,
+            house,
+            parent,
+            supplier_type,
+            debt,
+            path,
+            level,
+        )
+
+    def product_rows(self, supplier_ids):
+        for supplier_id in supplier_ids:
+            for _ in range(self.spec.products):
+                name = self.random.choice(PRODUCT_NAMES)
+                model = f"{name[:2].upper()}-{self.random.randint(100, 9999)}"
+                released = date(2015, 1, 1) + timedelta(days=self.random.randrange(3650))
+                yield (name, model, released, supplier_id)
+
+    def write_batch(self, rows):
+        self.writer.write(Supplier, SUPPLIER_FIELDS, rows)
+        products = list(self.product_rows([row[0] for row in rows]))
+        for start in range(0, len(products), self.batch_size):
+            end = start + self.batch_size
+            self.writer.write(Product, PRODUCT_FIELDS, products[start:end])
+        self.written += len(rows)
+        if self.on_progress is not None:
+            self.on_progress(self.written, self.spec.supplier_count)
+
+    def level_rows(self, parents, level, next_id):
+        """Строки уровня: для каждого родителя (id, путь) — fan_out клиентов, по порядку id."""
+        for parent_id, parent_path in parents:
+            path = "" if parent_id is None else f"{parent_path}{parent_id}/"
+            for _ in range(1 if parent_id is None else self.spec.fan_out):
+                yield self.supplier_row(next_id, parent_id, path, level)
+                next_id += 1
+
+    def run(self):
+        self.written = 0
+        next_id = (Supplier.objects.aggregate(last=Max("id"))["last"] or 0) + 1
+        parents = [(None, "")] * self.spec.factories
+        with transaction.atomic():
+            for level in range(self.spec.depth + 1):
+                children, batch = [], []
+                for row in self.level_rows(parents, level, next_id):
+                    batch.append(row)
+                    if level < self.spec.depth:
+                        children.append((row[0], row[10]))
+                    if len(batch) >= self.batch_size:
+                        self.write_batch(batch)
+                        batch = []
+                if batch:
+                    self.write_batch(batch)
+                next_id += len(parents) * (1 if level == 0 else self.spec.fan_out)
+                parents = children
+            self.writer.finish()
+
+        # Запись шла в обход сигналов: кэш ответов и итоги задолженности обновляются целиком.
+        invalidate_all()
+        if rollup_enabled():
+            rebuild_debt_rollups()
+        return {"suppliers": self.written, "products": self.written * self.spec.products}
@@ -0,0 +1,95 @@
+import logging
+import threading
+from datetime import timedelta
+
+from django.db import connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import DebtClearingJob, Supplier
+
+logger = logging.getLogger(__name__)
+
+CLEAR_DEBT_CHUNK_SIZE = 500
+# Задание в статусе "Выполняется" без движения дольше этого считается брошенным.
+STALE_JOB_TIMEOUT = timedelta(minutes=10)
+
+
+def clear_debt_chunk(ids):
+    """Обнуляет задолженность одной пачки в короткой транзакции; итоги и кэш обновляет update()."""
+    Supplier.objects.filter(pk__in=ids).update(debt=0.00, updated_at=timezone.now())
+
+
+def clear_debt(ids, chunk_size=CLEAR_DEBT_CHUNK_SIZE, on_chunk=None):
+    """Обнуляет задолженность пачками по возрастанию id; on_chunk(chunk) вызывается после каждой."""
+    ids = sorted(ids)
+    for start in range(0, len(ids), chunk_size):
+        end = start + chunk_size
+        chunk = ids[start:end]
+        clear_debt_chunk(chunk)
+        if on_chunk is not None:
+            on_chunk(chunk)
+
+
+def claim_job(job_id, stale=False):
+    """Атомарно переводит задание в "Выполняется"; False, если его уже взял другой процесс."""
+    claimable = Q(status=DebtClearingJob.PENDING)
+    if stale:
+        claimable |= Q(status=DebtClearingJob.RUNNING, updated_at__lt=timezone.now() - STALE_JOB_TIMEOUT)
+    return bool(
+        DebtClearingJob.objects.filter(claimable, pk=job_id).update(
+            status=DebtClearingJob.RUNNING, updated_at=timezone.now()
+        )
+    )
+
+
+def run_debt_job(job_id, stale=False, chunk_size=CLEAR_DEBT_CHUNK_SIZE):
+    if not claim_job(job_id, stale):
+        return False
+    job = DebtClearingJob.objects.get(pk=job_id)
+
+    def save_progress(chunk):
+        DebtClearingJob.objects.filter(pk=job_id).update(
+            processed=F("processed") + len(chunk), last_id=chunk[-1], updated_at=timezone.now()
+        )
+
+    try:
+        clear_debt([pk for pk in job.supplier_ids if pk > job.last_id], chunk_size, save_progress)
+    except Exception as e:
+        logger.exception("Задание очистки задолженности #%s завершилось с ошибкой", job_id)
+        DebtClearingJob.objects.filter(pk=job_id).update(
+            status=DebtClearingJob.FAILED, error=str(e), finished_at=timezone.now()
+        )
+    else:
+        DebtClearingJob.objects.filter(pk=job_id).update(status=DebtClearingJob.DONE, finished_at=timezone.now())
+    return True
+
+
+def run_pending_jobs(chunk_size=CLEAR_DEBT_CHUNK_SIZE):
+    """Выполняет задания из очереди и брошенные; возвращает число выполненных."""
+    stale_before = timezone.now() - STALE_JOB_TIMEOUT
+    job_ids = list(
+        DebtClearingJob.objects.filter(
+            Q(status=DebtClearingJob.PENDING) | Q(status=DebtClearingJob.RUNNING, updated_at__lt=stale_before)
+        )
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+    return sum(run_debt_job(job_id, stale=True, chunk_size=chunk_size) for job_id in job_ids)
+
+
+def _run_in_thread(job_id):
+    try:
+        run_debt_job(job_id)
+    finally:
+        connections.close_all()
+
+
+def start_debt_job(job):
+    """
+    Запускает задание в фоновом потоке того же процесса после коммита.
+
+    Брокер не нужен: состояние и прогресс лежат в таблице заданий. Если процесс
+    перезапустится, задание доберёт команда `run_debt_jobs`.
+    """
+    transaction.on_commit(lambda: threading.Thread(target=_run_in_thread, args=(job.pk,), daemon=True).start())
@@ -0,0 +1,120 @@
+import asyncio
+import ssl
+import statistics
+import time
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+
+@dataclass
+class LoadResult:
+    """Итог одного уровня конкурентности."""
+
+    url: str
+    concurrency: int
+    elapsed: float = 0.0
+    latencies: list = field(default_factory=list)
+    statuses: dict = field(default_factory=dict)
+    errors: int = 0
+
+    @property
+    def ok(self):
+        return sum(count for status, count in self.statuses.items() if 200 <= status < 400)
+
+    @property
+    def rps(self):
+        return self.ok / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, share):
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+    def as_dict(self):
+        return {
+            "url": self.url,
+            "concurrency": self.concurrency,
+            "requests": len(self.latencies) + self.errors,
+            "ok": self.ok,
+            "errors": self.errors,
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+            "rps": round(self.rps, 1),
+            "p50_ms": _ms(self.percentile(0.5)),
+            "p95_ms": _ms(self.percentile(0.95)),
+            "mean_ms": _ms(statistics.fmean(self.latencies) if self.latencies else None),
+        }
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+async def fetch(url, headers, slow_client=0.0, timeout=30.0):
+    """
+    Один GET по HTTP/1.1 без keep-alive; возвращает код ответа.
+
+    slow_client — пауза между строкой запроса и заголовками: так медленный клиент держит
+    соединение, и синхронный воркер gunicorn всё это время не обслуживает других.
+    """
+    parts = urlsplit(url)
+    secure = parts.scheme == "https"
+    port = parts.port or (443 if secure else 80)
+    path = parts.path or "/"
+    if parts.query:
+        path = f"{path}?{parts.query}"
+
+    async def exchange():
+        reader, writer = await asyncio.open_connection(
+            parts.hostname, port, ssl=ssl.create_default_context() if secure else None
+        )
+        try:
+            writer.write(f"GET {path} HTTP/1.1\r\n".encode())
+            await writer.drain()
+            if slow_client:
+                await asyncio.sleep(slow_client)
+            lines = [f"Host: {parts.netloc}", "Connection: close", *(f"{k}: {v}" for k, v in headers.items())]
+            writer.write(("\r\n".join(lines) + "\r\n\r\n").encode())
+            await writer.drain()
+            status_line = await reader.readline()
+            await reader.read()
+            return int(status_line.split()[1])
+        finally:
+            writer.close()
+
+    return await asyncio.wait_for(exchange(), timeout)
+
+
+async def run_level(url, concurrency, requests, headers, slow_client=0.0, timeout=30.0):
+    """requests запросов, из которых одновременно выполняется не больше concurrency."""
+    result = LoadResult(url=url, concurrency=concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                status = await fetch(url, headers, slow_client, timeout)
+            except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+                result.errors += 1
+                return
+            result.latencies.append(time.perf_counter() - started)
+            result.statuses[status] = result.statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def run_load(urls, levels, requests, headers, slow_client=0.0, timeout=30.0):
+    """Прогоняет каждый адрес на каждом уровне конкурентности по очереди."""
+
+    async def run_all():
+        return [
+            await run_level(url, level, max(requests, level), headers, slow_client, timeout)
+            for url in urls
+            for level in levels
+        ]
+
+    return asyncio.run(run_all())
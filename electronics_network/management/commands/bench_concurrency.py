@@ -0,0 +1,52 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from electronics_network.loadtest import run_load
+
+
+class Command(BaseCommand):
+    help = (
+        "Нагрузочное сравнение развёртываний: одни и те же GET-запросы на нескольких уровнях "
+        "конкурентности, например к gunicorn WSGI (web) и ASGI (web-asgi)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("urls", nargs="+", help="Полные адреса, например http://localhost:8000/api/suppliers/")
+        parser.add_argument("--token", help="JWT access-токен для заголовка Authorization")
+        parser.add_argument("--concurrency", default="10,50,200", help="Уровни конкурентности через запятую")
+        parser.add_argument("--requests", type=int, default=500, help="Запросов на каждый уровень")
+        parser.add_argument(
+            "--slow-client", type=float, default=0.0, help="Пауза клиента между строкой запроса и заголовками, секунд"
+        )
+        parser.add_argument("--timeout", type=float, default=30.0, help="Таймаут одного запроса, секунд")
+        parser.add_argument("--json", action="store_true", help="Вывести результаты в JSON")
+
+    def handle(self, *args, **options):
+        try:
+            levels = [int(level) for level in options["concurrency"].split(",") if level]
+        except ValueError:
+            raise CommandError("--concurrency: ожидаются целые числа через запятую.")
+        if not levels or min(levels) < 1:
+            raise CommandError("--concurrency: уровни должны быть не меньше 1.")
+        headers = {"Accept": "application/json"}
+        if options["token"]:
+            headers["Authorization"] = f"Bearer {options['token']}"
+
+        results = [
+            result.as_dict()
+            for result in run_load(
+                options["urls"], levels, options["requests"], headers, options["slow_client"], options["timeout"]
+            )
+        ]
+        if options["json"]:
+            self.stdout.write(json.dumps(results, ensure_ascii=False, indent=2))
+            return
+        self.stdout.write(
+            f"{'адрес':<50} {'конк.':>6} {'ok':>6} {'ошибки':>7} {'rps':>8} {'p50, мс':>9} {'p95, мс':>9}"
+        )
+        for row in results:
+            self.stdout.write(
+                f"{row['url'][:50]:<50} {row['concurrency']:>6} {row['ok']:>6} {row['errors']:>7} "
+                f"{row['rps']:>8} {row['p50_ms'] or '-':>9} {row['p95_ms'] or '-':>9}"
+            )
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from electronics_network.export import (EXPORT_CHUNK_SIZE, EXPORT_FORMATS,
+                                        export_lines)
+from electronics_network.filters import filter_countries
+from electronics_network.models import Supplier
+
+
+class Command(BaseCommand):
+    help = "Потоковая выгрузка всей сети поставщиков с товарами в NDJSON или CSV"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+        parser.add_argument("--output", help="Файл для выгрузки (по умолчанию stdout)")
+        parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+        parser.add_argument(
+            "--country", help="Выгрузить только поставщиков из указанных стран (через запятую, без учёта регистра)"
+        )
+
+    def handle(self, *args, **options):
+        queryset = filter_countries(Supplier.objects.all(), options["country"])
+        lines = export_lines(queryset, options["format"], options["chunk_size"])
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8", newline="") as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending="")
@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from electronics_network.generator import (GENERATOR_BATCH_SIZE,
+                                           GENERATOR_METHODS, NetworkGenerator,
+                                           NetworkSpec, clear_network)
+
+
+class Command(BaseCommand):
+    help = (
+        "Генерирует сеть поставщиков с товарами для замеров производительности: "
+        "--factories заводов, у каждого звена --fan-out клиентов на --depth уровней ниже"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--factories", type=int, default=10)
+        parser.add_argument("--depth", type=int, default=3, help="Уровней ниже завода")
+        parser.add_argument("--fan-out", type=int, default=10, help="Клиентов у каждого звена")
+        parser.add_argument("--products", type=int, default=3, help="Товаров у каждого звена")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=GENERATOR_BATCH_SIZE)
+        parser.add_argument(
+            "--method", choices=GENERATOR_METHODS, default="auto", help="auto — COPY на PostgreSQL, иначе bulk_create"
+        )
+        parser.add_argument("--clear", action="store_true", help="Сначала удалить всех поставщиков и товары")
+
+    def handle(self, *args, **options):
+        if min(options["factories"], options["fan_out"], options["batch_size"]) < 1 or options["depth"] < 0:
+            raise CommandError("--factories, --fan-out и --batch-size должны быть не меньше 1, --depth — не меньше 0.")
+        if options["products"] < 0:
+            raise CommandError("--products не может быть отрицательным.")
+        spec = NetworkSpec(
+            options["factories"], options["depth"], options["fan_out"], options["products"], options["seed"]
+        )
+        self.stdout.write(f"Поставщиков: {spec.supplier_count}, товаров: {spec.product_count}")
+
+        def progress(written, total):
+            if options["verbosity"] > 1:
+                self.stdout.write(f"  {written} из {total}")
+
+        started = time.perf_counter()
+        try:
+            generator = NetworkGenerator(spec, options["batch_size"], options["method"], progress)
+            if options["clear"]:
+                clear_network()
+            counts = generator.run()
+        except ValueError as e:
+            raise CommandError(str(e))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Создано поставщиков: {counts['suppliers']}, товаров: {counts['products']} за {elapsed:.1f} с"
+            )
+        )
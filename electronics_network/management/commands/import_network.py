@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from electronics_network.bulk_import import (IMPORT_CHUNK_SIZE, NetworkImport,
+                                             read_rows)
+
+
+class Command(BaseCommand):
+    help = "Массовый импорт поставщиков и товаров из CSV- или JSON-файлов"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--suppliers", help="Файл с поставщиками (.csv или .json)")
+        parser.add_argument("--products", help="Файл с товарами (.csv или .json)")
+        parser.add_argument("--strict", action="store_true", help="Не записывать ничего, если есть ошибки")
+        parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+
+    def read(self, path):
+        if not path:
+            return []
+        try:
+            with open(path, "rb") as file:
+                return read_rows(file, path)
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+    def handle(self, *args, **options):
+        if not options["suppliers"] and not options["products"]:
+            raise CommandError("Укажите --suppliers и/или --products.")
+        result = NetworkImport(
+            self.read(options["suppliers"]),
+            self.read(options["products"]),
+            strict=options["strict"],
+            chunk_size=options["chunk_size"],
+        ).run()
+
+        for error in result["errors"]:
+            key = f" ({error['key']})" if "key" in error else ""
+            self.stderr.write(f"{error['section']}, строка {error['row']}{key}: {'; '.join(error['errors'])}")
+        self.stdout.write(
+            f"Создано поставщиков: {result['suppliers_created']}, товаров: {result['products_created']}, "
+            f"ошибок: {len(result['errors'])}"
+        )
+        if options["strict"] and result["errors"]:
+            raise CommandError("Импорт отменён из-за ошибок.")
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from electronics_network.cache import invalidate_all
+from electronics_network.debt import ROLLUP_CHUNK_SIZE, rebuild_debt_rollups
+
+
+class Command(BaseCommand):
+    help = "Пересобирает таблицу итогов задолженности по поддеревьям поставщиков"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=ROLLUP_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        count = rebuild_debt_rollups(options["chunk_size"])
+        invalidate_all()
+        self.stdout.write(f"Пересчитано итогов: {count}")
@@ -0,0 +1,68 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from electronics_network.benchmarks import (DEFAULT_MAX_SLOWDOWN,
+                                            budget_failures, compare_reports,
+                                            run_benchmarks)
+
+
+class Command(BaseCommand):
+    help = (
+        "Замеряет ключевые маршруты API и админки на текущей базе (см. generate_network), проверяет "
+        "потолки SQL-запросов и сохраняет отчёт JSON для сравнения между коммитами"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=10, help="Замеров на каждый маршрут")
+        parser.add_argument("--warmup", type=int, default=2, help="Прогревочных запросов перед замерами")
+        parser.add_argument("--output", help="Файл для отчёта JSON")
+        parser.add_argument("--compare", help="Отчёт JSON прошлого коммита для сравнения")
+        parser.add_argument(
+            "--max-slowdown",
+            type=float,
+            default=DEFAULT_MAX_SLOWDOWN,
+            help="Допустимый рост медианы при --compare, доля (0.2 — на 20%%)",
+        )
+        parser.add_argument("--with-cache", action="store_true", help="Не выключать кэш ответов")
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["compare"]:
+            try:
+                with open(options["compare"], encoding="utf-8") as file:
+                    baseline = json.load(file)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Не удалось прочитать отчёт {options['compare']}: {e}")
+
+        self.stdout.write(f"{'замер':<32} {'код':>4} {'SQL':>7} {'медиана':>9} {'p95':>9}")
+
+        def show(name, result):
+            queries = f"{result['queries']}/{result['max_queries']}"
+            self.stdout.write(
+                f"{name:<32} {result['status']:>4} {queries:>7} {result['median_ms']:>9} {result['p95_ms']:>9}"
+            )
+
+        try:
+            report = run_benchmarks(options["repeat"], options["warmup"], options["with_cache"], show)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+            self.stdout.write(f"Отчёт сохранён в {options['output']}")
+
+        problems = budget_failures(report)
+        if baseline is not None:
+            rows, regressions = compare_reports(baseline, report, options["max_slowdown"])
+            self.stdout.write(f"Сравнение с {baseline['meta'].get('commit') or options['compare']}:")
+            for row in rows:
+                self.stdout.write(
+                    f"  {row['name']:<32} {row['old_ms']:>9} → {row['new_ms']:<9} {row['change']:+.0%} "
+                    f"SQL {row['old_queries']} → {row['new_queries']}"
+                )
+            problems += regressions
+        if problems:
+            raise CommandError("Замеры не прошли:\n" + "\n".join(problems))
+        self.stdout.write(self.style.SUCCESS("Потолки SQL-запросов соблюдены"))
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from electronics_network.jobs import CLEAR_DEBT_CHUNK_SIZE, run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = "Выполняет задания очистки задолженности из очереди (в том числе прерванные)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=CLEAR_DEBT_CHUNK_SIZE)
+        parser.add_argument("--loop", action="store_true", help="Не завершаться, а опрашивать очередь")
+        parser.add_argument("--interval", type=float, default=5.0, help="Пауза между опросами, секунд")
+
+    def handle(self, *args, **options):
+        while True:
+            count = run_pending_jobs(options["chunk_size"])
+            if count:
+                self.stdout.write(f"Выполнено заданий: {count}")
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
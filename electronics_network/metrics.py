@@ -0,0 +1,204 @@
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+
+from asgiref.sync import (iscoroutinefunction, markcoroutinefunction,
+                          sync_to_async)
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+
+from .timing import start_measuring, stop_measuring
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# Имя -> (тип, описание, границы корзин для гистограмм).
+METRICS = {
+    "http_requests_total": ("counter", "Запросы по представлению, методу и коду ответа.", None),
+    "http_request_duration_seconds": ("histogram", "Время ответа по представлению и методу.", LATENCY_BUCKETS),
+    "http_request_db_queries": ("histogram", "SQL-запросов на один запрос по представлению.", QUERY_BUCKETS),
+}
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+UNMATCHED_VIEW = "unmatched"
+
+
+class MetricsStore:
+    """
+    Счётчики в общем файле SQLite: каждый воркер gunicorn прибавляет свои значения к тем же
+    строкам, поэтому `/metrics` из любого процесса отдаёт сумму по всем. Внешний сервис не нужен.
+
+    Строка — (метрика, метки, ключ): ключ пустой у счётчика, у гистограммы это граница корзины
+    (наблюдение попадает в одну, накопленные суммы считаются при выводе) или "sum".
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+
+    def connection(self):
+        # Соединение своё у каждого потока и процесса: после fork унаследованное использовать нельзя.
+        connection = getattr(self.local, "connection", None)
+        if connection is None or self.local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS samples ("
+                "metric TEXT NOT NULL, labels TEXT NOT NULL, key TEXT NOT NULL, value REAL NOT NULL, "
+                "PRIMARY KEY (metric, labels, key))"
+            )
+            self.local.connection, self.local.pid = connection, os.getpid()
+        return connection
+
+    def add(self, increments):
+        """increments — [(метрика, метки, ключ, прибавка)]; всё одной транзакцией."""
+        connection = self.connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.executemany(
+                "INSERT INTO samples (metric, labels, key, value) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (metric, labels, key) DO UPDATE SET value = value + excluded.value",
+                [(metric, json.dumps(labels, sort_keys=True), key, value) for metric, labels, key, value in increments],
+            )
+
+    def samples(self):
+        rows = self.connection().execute("SELECT metric, labels, key, value FROM samples ORDER BY metric, labels")
+        return [(metric, json.loads(labels), key, value) for metric, labels, key, value in rows]
+
+    def clear(self):
+        self.connection().execute("DELETE FROM samples")
+
+
+_stores = {}
+
+
+def get_store():
+    path = settings.METRICS_FILE
+    if path not in _stores:
+        _stores[path] = MetricsStore(path)
+    return _stores[path]
+
+
+def bucket_key(buckets, value):
+    for bound in buckets:
+        if value <= bound:
+            return format_value(bound)
+    return "+Inf"
+
+
+def observe(metric, labels, value):
+    _, _, buckets = METRICS[metric]
+    return [(metric, labels, bucket_key(buckets, value), 1), (metric, labels, "sum", value)]
+
+
+def request_increments(view, method, status, duration, queries):
+    labels = {"view": view, "method": method}
+    return [
+        ("http_requests_total", {**labels, "status": str(status)}, "", 1),
+        *observe("http_request_duration_seconds", labels, duration),
+        *observe("http_request_db_queries", {"view": view}, queries),
+    ]
+
+
+def format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def format_labels(labels):
+    escaped = (
+        (name, str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")) for name, value in labels
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def render_metrics(samples):
+    """Текстовый формат Prometheus 0.0.4; у гистограмм — накопленные корзины, _sum и _count."""
+    grouped = {}
+    for metric, labels, key, value in samples:
+        grouped.setdefault(metric, {}).setdefault(tuple(sorted(labels.items())), {})[key] = value
+
+    lines = []
+    for metric, (kind, description, buckets) in METRICS.items():
+        lines += [f"# HELP {metric} {description}", f"# TYPE {metric} {kind}"]
+        for labels, values in sorted(grouped.get(metric, {}).items()):
+            if kind == "counter":
+                lines.append(f"{metric}{format_labels(labels)} {format_value(values[''])}")
+                continue
+            total = 0
+            for bound in (*buckets, math.inf):
+                total += values.get(format_value(bound), 0)
+                lines.append(f"{metric}_bucket{format_labels((*labels, ('le', format_value(bound))))} {int(total)}")
+            lines.append(f"{metric}_sum{format_labels(labels)} {format_value(values.get('sum', 0))}")
+            lines.append(f"{metric}_count{format_labels(labels)} {int(total)}")
+    return "\n".join(lines) + "\n"
+
+
+def view_label(request):
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match is not None and match.view_name else UNMATCHED_VIEW
+
+
+class MetricsMiddleware:
+    """
+    Собирает метрики запросов для `/metrics`: число запросов по коду ответа, гистограммы времени
+    ответа и числа SQL-запросов по представлению (имя маршрута: `supplier-list`, `token_obtain_pair`,
+    `admin:electronics_network_supplier_changelist`). Включается настройкой METRICS_ENABLED.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        timings, token = start_measuring()
+        try:
+            response = self.get_response(request)
+        finally:
+            stop_measuring(token)
+        self.record(request, response, time.perf_counter() - started, timings.queries)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        timings, token = start_measuring()
+        try:
+            response = await self.get_response(request)
+        finally:
+            stop_measuring(token)
+        # Запись в файл — блокирующая, поэтому не в цикле событий.
+        await sync_to_async(self.record, thread_sensitive=False)(
+            request, response, time.perf_counter() - started, timings.queries
+        )
+        return response
+
+    def record(self, request, response, duration, queries):
+        view = view_label(request)
+        if view == "metrics":
+            return
+        get_store().add(request_increments(view, request.method, response.status_code, duration, queries))
+
+
+def metrics_view(request):
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    if settings.METRICS_TOKEN:
+        authorization = request.headers.get("Authorization", "")
+        if not constant_time_compare(authorization, f"Bearer {settings.METRICS_TOKEN}"):
+            return HttpResponse("Требуется токен метрик.\n", status=401, content_type="text/plain; charset=utf-8")
+    return HttpResponse(render_metrics(get_store().samples()), content_type=PROMETHEUS_CONTENT_TYPE)
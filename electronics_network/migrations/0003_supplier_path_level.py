@@ -0,0 +1,59 @@
+# Generated by Django 5.1.15 on 2026-10-17 04:13
+
+from django.db import migrations, models
+
+
+def backfill_hierarchy(apps, schema_editor):
+    Supplier = apps.get_model("electronics_network", "Supplier")
+    parents = dict(Supplier.objects.values_list("id", "supplier_id"))
+    paths = {}
+
+    def resolve(pk):
+        chain = []
+        seen = set()
+        while pk is not None and pk not in paths:
+            if pk in seen:
+                # Цикл в старых данных: разрываем его на текущем звене.
+                Supplier.objects.filter(pk=pk).update(supplier=None)
+                parents[pk] = None
+                paths[pk] = ""
+                break
+            seen.add(pk)
+            chain.append(pk)
+            pk = parents[pk]
+        for node in reversed(chain):
+            parent = parents[node]
+            paths[node] = "" if parent is None else f"{paths[parent]}{parent}/"
+
+    for pk in parents:
+        resolve(pk)
+
+    suppliers = []
+    for pk, path in paths.items():
+        suppliers.append(Supplier(pk=pk, path=path, level=path.count("/")))
+    Supplier.objects.bulk_update(suppliers, ["path", "level"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("electronics_network", "0002_alter_product_options_alter_supplier_options_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="supplier",
+            name="level",
+            field=models.PositiveIntegerField(
+                db_index=True, default=0, editable=False, verbose_name="Уровень иерархии"
+            ),
+        ),
+        migrations.AddField(
+            model_name="supplier",
+            name="path",
+            field=models.TextField(
+                blank=True, db_index=True, default="", editable=False, verbose_name="Путь в иерархии"
+            ),
+        ),
+        migrations.RunPython(backfill_hierarchy, migrations.RunPython.noop),
+    ]
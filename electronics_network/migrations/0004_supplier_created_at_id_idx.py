@@ -0,0 +1,17 @@
+# Generated by Django 5.1.15 on 2026-10-17 04:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("electronics_network", "0003_supplier_path_level"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="supplier",
+            index=models.Index(fields=["created_at", "id"], name="supplier_created_at_id_idx"),
+        ),
+    ]
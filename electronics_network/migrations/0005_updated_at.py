@@ -0,0 +1,23 @@
+# Generated by Django 5.1.15 on 2026-10-17 04:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("electronics_network", "0004_supplier_created_at_id_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, verbose_name="Дата изменения"),
+        ),
+        migrations.AddField(
+            model_name="supplier",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name="Дата изменения"),
+        ),
+    ]
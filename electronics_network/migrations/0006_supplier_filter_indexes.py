@@ -0,0 +1,37 @@
+# Generated by Django 5.1.15 on 2026-10-17 04:33
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("electronics_network", "0005_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="supplier",
+            index=models.Index(
+                django.db.models.functions.text.Lower("country"),
+                models.F("created_at"),
+                name="supplier_country_ci_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="supplier",
+            index=models.Index(
+                fields=["supplier_type", "created_at"],
+                name="supplier_type_created_at_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="supplier",
+            index=models.Index(fields=["city"], name="supplier_city_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="supplier",
+            index=models.Index(fields=["debt"], name="supplier_debt_idx"),
+        ),
+    ]
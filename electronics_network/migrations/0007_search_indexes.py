@@ -0,0 +1,45 @@
+from django.db import migrations
+
+# Индексы для electronics_network.search: полнотекстовый вектор и триграммы по каждому полю.
+# Выражение вектора повторяет search._postgres_search, иначе планировщик его не сопоставит.
+SEARCH_INDEXES = {
+    "supplier": ("name", "city"),
+    "product": ("name", "model"),
+}
+
+
+def search_indexes(apps):
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+
+    for model_name, fields in SEARCH_INDEXES.items():
+        model = apps.get_model("electronics_network", model_name)
+        yield model, GinIndex(SearchVector(*fields, config="simple"), name=f"{model_name}_search_idx")
+        for field in fields:
+            yield model, GinIndex(fields=[field], opclasses=["gin_trgm_ops"], name=f"{model_name}_{field}_trgm_idx")
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for model, index in search_indexes(apps):
+        schema_editor.add_index(model, index)
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for model, index in search_indexes(apps):
+        schema_editor.remove_index(model, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("electronics_network", "0006_supplier_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.1.15 on 2026-10-17 04:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("electronics_network", "0007_search_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SupplierDebtRollup",
+            fields=[
+                (
+                    "supplier",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="debt_rollup",
+                        serialize=False,
+                        to="electronics_network.supplier",
+                        verbose_name="Поставщик",
+                    ),
+                ),
+                (
+                    "debt_total",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=20,
+                        verbose_name="Суммарная задолженность",
+                    ),
+                ),
+                (
+                    "supplier_count",
+                    models.PositiveIntegerField(default=0, verbose_name="Количество звеньев"),
+                ),
+                (
+                    "max_debt",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=10,
+                        verbose_name="Наибольшая задолженность",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Итоги задолженности поддерева",
+                "verbose_name_plural": "Итоги задолженности поддеревьев",
+            },
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 5.1.15 on 2026-10-17 04:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("electronics_network", "0008_supplier_debt_rollup"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DebtClearingJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "В очереди"),
+                            ("running", "Выполняется"),
+                            ("done", "Завершено"),
+                            ("failed", "Ошибка"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                        verbose_name="Статус",
+                    ),
+                ),
+                (
+                    "supplier_ids",
+                    models.JSONField(default=list, verbose_name="Поставщики"),
+                ),
+                ("total", models.PositiveIntegerField(default=0, verbose_name="Всего")),
+                (
+                    "processed",
+                    models.PositiveIntegerField(default=0, verbose_name="Обработано"),
+                ),
+                (
+                    "last_id",
+                    models.PositiveIntegerField(default=0, verbose_name="Последний обработанный id"),
+                ),
+                (
+                    "error",
+                    models.TextField(blank=True, default="", verbose_name="Ошибка"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Дата создания"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Дата изменения"),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(blank=True, null=True, verbose_name="Дата завершения"),
+                ),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Автор",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Задание очистки задолженности",
+                "verbose_name_plural": "Задания очистки задолженности",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
@@ -1,5 +1,97 @@
+from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Max, Value
+from django.db.models.functions import Concat, Lower, Substr
+from django.utils import timezone
+
+
+class SupplierQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        # Смена поставщика через queryset.update() обходит save(), поэтому путь, уровень
+        # и правила сети пересчитываются здесь же, для всего набора сразу.
+        for name in ("supplier", "supplier_id"):
+            if name in kwargs:
+                return self.reparent(kwargs.pop(name), **kwargs)
+        if "debt" in kwargs:
+            return self.update_debt(**kwargs)
+        return super().update(**kwargs)
+
+    def update_debt(self, **kwargs):
+        """
+        UPDATE с изменением задолженности: итоги цепочек затронутых звеньев пересчитываются
+        в той же транзакции, кэш ответов сбрасывается. Возвращает число обновлённых строк.
+        """
+        from .cache import invalidate_all
+        from .debt import refresh_debt_rollups, rollup_enabled
+
+        with transaction.atomic():
+            ids = list(self.values_list("id", flat=True))
+            count = super(SupplierQuerySet, Supplier.objects.filter(pk__in=ids)).update(**kwargs)
+            if rollup_enabled():
+                refresh_debt_rollups(ids)
+        invalidate_all()
+        return count
+
+    def reparent(self, parent, **kwargs):
+        """
+        Переносит выбранных поставщиков к parent (поставщик, его id или None).
+
+        Проверки выполняются для всего набора: цикл ловится пересечением выбранных id с
+        цепочкой нового родителя, правила `validate_rules` — по каждой строке в памяти,
+        глубина — одним запросом после переноса. Поддерево каждой строки переносится одним
+        UPDATE. Возвращает число перенесённых поставщиков.
+        """
+        parent_id = parent.pk if isinstance(parent, Supplier) else parent
+        with transaction.atomic():
+            rows = list(self.values_list("id", "path", "level", "supplier_type", "debt"))
+            if not rows:
+                return 0
+            path = ""
+            if parent_id is not None:
+                parent_path = Supplier.objects.filter(pk=parent_id).values_list("path", flat=True).first()
+                if parent_path is None:
+                    raise ValidationError(f"Поставщик с id {parent_id} не найден.")
+                path = f"{parent_path}{parent_id}/"
+            level = path.count("/")
+
+            chain = {int(pk) for pk in path.split("/") if pk}
+            ids, touched = [], set()
+            for pk, old_path, _, supplier_type, debt in rows:
+                if pk == parent_id:
+                    raise ValidationError("Поставщик не может ссылаться сам на себя.")
+                if pk in chain:
+                    raise ValidationError("Цепочка поставщиков образует цикл.")
+                Supplier.validate_rules(
+                    kwargs.get("supplier_type", supplier_type), kwargs.get("debt", debt), level, parent_id is not None
+                )
+                ids.append(pk)
+                touched |= {pk, *(int(ancestor) for ancestor in old_path.split("/") if ancestor)}
+
+            # Сначала глубокие поддеревья: так вложенные друг в друга выбранные звенья
+            # переносятся каждое под нового родителя, а не вместе с выбранным предком.
+            # У звеньев без клиентов переносить нечего, поэтому UPDATE поддерева только у остальных.
+            with_clients = set(Supplier.objects.filter(supplier_id__in=ids).values_list("supplier_id", flat=True))
+            for pk, old_path, old_level, _, _ in sorted(rows, key=lambda row: -row[2]):
+                if pk in with_clients:
+                    Supplier.rebase_subtree(f"{old_path}{pk}/", f"{path}{pk}/", level - old_level)
+            # Условия исходного queryset могли перестать совпадать после переноса, поэтому по id.
+            count = super(SupplierQuerySet, Supplier.objects.filter(pk__in=ids)).update(
+                supplier_id=parent_id, path=path, level=level, updated_at=timezone.now(), **kwargs
+            )
+            if parent_id is not None and (
+                Supplier.objects.filter(path__startswith=path, level__gt=settings.SUPPLIER_MAX_DEPTH).exists()
+            ):
+                raise ValidationError(f"Превышена максимальная глубина иерархии ({settings.SUPPLIER_MAX_DEPTH}).")
+
+        # Сигналы при queryset.update() не отправляются.
+        from .cache import invalidate_all
+        from .debt import refresh_debt_rollups, rollup_enabled
+
+        if rollup_enabled():
+            refresh_debt_rollups(touched)
+        invalidate_all()
+        return count
 
 
 class Supplier(models.Model):
@@ -21,33 +113,101 @@ class Supplier(models.Model):
     )
     debt = models.DecimalField(max_digits=10, decimal_places=2, default=0.00, verbose_name="Задолженность")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Дата изменения")
 
     supplier_type = models.CharField(
         max_length=20, choices=SUPPLIER_TYPE_CHOICES, default="retail", verbose_name="Тип поставщика"
     )
 
+    # Материализованный путь: id всех предков от корня, каждый с завершающим "/".
+    # У завода путь пустой, у его клиента "1/", у клиента клиента "1/5/" и т.д.
+    path = models.TextField(blank=True, default="", editable=False, db_index=True, verbose_name="Путь в иерархии")
+    level = models.PositiveIntegerField(default=0, editable=False, db_index=True, verbose_name="Уровень иерархии")
+
+    objects = SupplierQuerySet.as_manager()
+
     @property
-    def level(self):
-        if self.supplier is None:
-            return 0
-        return self.supplier.level + 1
+    def subtree_prefix(self):
+        return f"{self.path}{self.pk}/"
 
-    def clean(self):
-        if self.supplier_type == "factory" and self.supplier is not None:
+    @property
+    def ancestor_ids(self):
+        return [int(pk) for pk in self.path.split("/") if pk]
+
+    def get_ancestors(self):
+        return Supplier.objects.filter(pk__in=self.ancestor_ids).order_by("level")
+
+    def get_descendants(self):
+        return Supplier.objects.filter(path__startswith=self.subtree_prefix)
+
+    def update_hierarchy(self):
+        if self.supplier_id is None:
+            self.path = ""
+        else:
+            parent_path = Supplier.objects.filter(pk=self.supplier_id).values_list("path", flat=True).first() or ""
+            self.path = f"{parent_path}{self.supplier_id}/"
+        self.level = self.path.count("/")
+
+    @staticmethod
+    def rebase_subtree(old_prefix, new_prefix, level_delta):
+        """Переносит всех потомков с путём old_prefix на new_prefix одним UPDATE; возвращает их число."""
+        return Supplier.objects.filter(path__startswith=old_prefix).update(
+            path=Concat(Value(new_prefix), Substr("path", len(old_prefix) + 1), output_field=models.TextField()),
+            level=F("level") + level_delta,
+            updated_at=timezone.now(),
+        )
+
+    @staticmethod
+    def validate_rules(supplier_type, debt, level, has_supplier):
+        """Правила сети, не зависящие от конкретного экземпляра (используются и при массовом импорте)."""
+        if supplier_type == "factory" and has_supplier:
             raise ValidationError("Завод не может иметь поставщика.")
-        if self.supplier_type == "factory" and self.debt != 0.00:
+        if supplier_type == "factory" and debt != 0.00:
             raise ValidationError("У завода не может быть задолженности.")
-        if self.level == 0 and self.debt != 0.00:
+        if level == 0 and debt != 0.00:
             raise ValidationError("У нулевого уровня не может быть задолженности.")
-        if self.debt < 0:
+        if level > settings.SUPPLIER_MAX_DEPTH:
+            raise ValidationError(f"Превышена максимальная глубина иерархии ({settings.SUPPLIER_MAX_DEPTH}).")
+        if debt < 0:
             raise ValidationError("Задолженность не может быть отрицательной.")
-        if self.supplier == self:
+
+    def validate_subtree_depth(self):
+        """При переносе звена его потомки тоже сдвигаются и не должны выйти за максимальную глубину."""
+        if self.pk is None:
+            return
+        old = Supplier.objects.filter(pk=self.pk).values_list("path", "level").first()
+        if old is None or old[0] == self.path:
+            return
+        old_path, old_level = old
+        deepest = Supplier.objects.filter(path__startswith=f"{old_path}{self.pk}/").aggregate(Max("level"))[
+            "level__max"
+        ]
+        if deepest is not None and deepest - old_level + self.level > settings.SUPPLIER_MAX_DEPTH:
+            raise ValidationError(
+                f"После переноса потомки звена окажутся глубже максимального уровня ({settings.SUPPLIER_MAX_DEPTH})."
+            )
+
+    def clean(self):
+        if self.pk is not None and self.supplier_id == self.pk:
             raise ValidationError("Поставщик не может ссылаться сам на себя.")
+        self.update_hierarchy()
+        # Родитель из собственного поддерева: id звена оказывается в его же новом пути.
+        if self.pk is not None and self.pk in self.ancestor_ids:
+            raise ValidationError("Цепочка поставщиков образует цикл.")
+        self.validate_rules(self.supplier_type, self.debt, self.level, self.supplier_id is not None)
+        self.validate_subtree_depth()
         super().clean()
 
     def save(self, *args, **kwargs):
         self.full_clean()
-        super().save(*args, **kwargs)
+        old = None
+        if self.pk is not None:
+            old = Supplier.objects.filter(pk=self.pk).values_list("path", "level").first()
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if old is not None and old[0] != self.path:
+                old_path, old_level = old
+                self.rebase_subtree(f"{old_path}{self.pk}/", self.subtree_prefix, self.level - old_level)
 
     def __str__(self):
         return self.name
@@ -55,6 +215,13 @@ class Supplier(models.Model):
     class Meta:
         verbose_name = "Поставщик"
         verbose_name_plural = "Поставщики"
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="supplier_created_at_id_idx"),
+            models.Index(Lower("country"), "created_at", name="supplier_country_ci_idx"),
+            models.Index(fields=["supplier_type", "created_at"], name="supplier_type_created_at_idx"),
+            models.Index(fields=["city"], name="supplier_city_idx"),
+            models.Index(fields=["debt"], name="supplier_debt_idx"),
+        ]
 
 
 class Product(models.Model):
@@ -62,6 +229,7 @@ class Product(models.Model):
     model = models.CharField(max_length=255, verbose_name="Модель")
     release_date = models.DateField(verbose_name="Дата выпуска")
     supplier = models.ForeignKey(Supplier, on_delete=models.CASCADE, related_name="products", verbose_name="Поставщик")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата изменения")
 
     def __str__(self):
         return f"{self.name} ({self.model})"
@@ -69,3 +237,63 @@ class Product(models.Model):
     class Meta:
         verbose_name = "Товар"
         verbose_name_plural = "Товары"
+
+
+class SupplierDebtRollup(models.Model):
+    """
+    Предрасчитанные итоги задолженности по поддереву звена (само звено и все его потомки).
+
+    Включается настройкой SUPPLIER_DEBT_ROLLUP, заполняется командой `rebuild_debt_rollup`
+    и дальше поддерживается инкрементально (см. electronics_network.debt).
+    """
+
+    supplier = models.OneToOneField(
+        Supplier, on_delete=models.CASCADE, primary_key=True, related_name="debt_rollup", verbose_name="Поставщик"
+    )
+    debt_total = models.DecimalField(max_digits=20, decimal_places=2, default=0, verbose_name="Суммарная задолженность")
+    supplier_count = models.PositiveIntegerField(default=0, verbose_name="Количество звеньев")
+    max_debt = models.DecimalField(max_digits=10, decimal_places=2, default=0, verbose_name="Наибольшая задолженность")
+
+    def __str__(self):
+        return f"{self.supplier_id}: {self.debt_total}"
+
+    class Meta:
+        verbose_name = "Итоги задолженности поддерева"
+        verbose_name_plural = "Итоги задолженности поддеревьев"
+
+
+class DebtClearingJob(models.Model):
+    """Фоновая очистка задолженности для большого выбора поставщиков в админке."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "В очереди"),
+        (RUNNING, "Выполняется"),
+        (DONE, "Завершено"),
+        (FAILED, "Ошибка"),
+    ]
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING, verbose_name="Статус")
+    supplier_ids = models.JSONField(default=list, verbose_name="Поставщики")
+    total = models.PositiveIntegerField(default=0, verbose_name="Всего")
+    processed = models.PositiveIntegerField(default=0, verbose_name="Обработано")
+    # Последний обработанный id: прерванное задание продолжается с места остановки.
+    last_id = models.PositiveIntegerField(default=0, verbose_name="Последний обработанный id")
+    error = models.TextField(blank=True, default="", verbose_name="Ошибка")
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Автор"
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата изменения")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Дата завершения")
+
+    def __str__(self):
+        return f"Очистка задолженности #{self.pk} ({self.get_status_display()})"
+
+    class Meta:
+        verbose_name = "Задание очистки задолженности"
+        verbose_name_plural = "Задания очистки задолженности"
+        ordering = ["-created_at"]
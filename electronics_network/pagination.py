@@ -0,0 +1,152 @@
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    CursorPagination, в которой выборка страницы отделена от её обработки: так одна и та же
+    логика курсоров работает и с обычным ORM, и с async (`apaginate_queryset`).
+
+    Позиция курсора — значения всех полей ordering, а не только первого, и страница
+    выбирается сравнением кортежей (created_at, id). У DRF совпадающие created_at
+    разводятся смещением, которое обрезается на offset_cutoff: при тысячах строк с одним
+    временем (как после COPY) переходы по next зацикливались.
+    """
+
+    ordering = ("created_at", "id")
+    page_size_query_param = "page_size"
+    max_page_size = settings.API_MAX_PAGE_SIZE
+
+    def page_queryset(self, queryset, request, view=None):
+        """Срез queryset для текущего курсора (на одну строку больше страницы); None без пагинации."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        offset, reverse, current_position = (0, False, None) if self.cursor is None else self.cursor
+
+        queryset = queryset.order_by(*(_reverse_ordering(self.ordering) if reverse else self.ordering))
+        if current_position is not None:
+            try:
+                queryset = queryset.filter(self.position_filter(current_position, reverse))
+            except (ValidationError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+        end = offset + self.page_size + 1
+        return queryset[offset:end]
+
+    def position_filter(self, position, reverse):
+        """
+        Строки строго после позиции в порядке ordering: a >= x & ((a > x) | (a = x & b > y) | ...).
+
+        Условие a >= x избыточно по смыслу, но без него СУБД не начинает поиск по индексу
+        (created_at, id) с позиции курсора и читает индекс с начала.
+        """
+        try:
+            values = json.loads(position)
+        except ValueError:
+            values = None
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        condition, equal = Q(), {}
+        for order, value in zip(self.ordering, values):
+            order_attr = order.lstrip("-")
+            lookup = "lt" if reverse != order.startswith("-") else "gt"
+            condition |= Q(**equal, **{f"{order_attr}__{lookup}": value})
+            equal[order_attr] = value
+        if len(self.ordering) > 1:
+            order = self.ordering[0]
+            lookup = "lte" if reverse != order.startswith("-") else "gte"
+            condition &= Q(**{f"{order.lstrip('-')}__{lookup}": values[0]})
+        return condition
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for order in ordering:
+            order_attr = order.lstrip("-")
+            value = instance[order_attr] if isinstance(instance, dict) else getattr(instance, order_attr)
+            values.append(str(value))
+        return json.dumps(values)
+
+    def set_page(self, results):
+        """Страница из результатов page_queryset и позиции соседних страниц — как в CursorPagination."""
+        offset, reverse, current_position = (0, False, None) if self.cursor is None else self.cursor
+        self.page = list(results[: self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = current_position is not None or offset > 0
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None or offset > 0
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        queryset = self.page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page([row async for row in queryset])
+
+
+class IdCursorPagination(CreatedAtCursorPagination):
+    ordering = ("id",)
+
+
+def estimate_count(queryset):
+    """Оценка числа строк по статистике планировщика PostgreSQL; None на других СУБД."""
+    if connections[queryset.db].vendor != "postgresql":
+        return None
+    plan = json.loads(queryset.order_by().explain(format="json"))
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator для больших changelist в админке: точный COUNT(*) выполняется, только
+    если планировщик оценивает выборку меньше чем в exact_count_limit строк.
+    """
+
+    exact_count_limit = 10000
+
+    @cached_property
+    def count(self):
+        estimate = estimate_count(self.object_list)
+        if estimate is None or estimate < self.exact_count_limit:
+            return super().count
+        return estimate
@@ -0,0 +1,89 @@
+import re
+from functools import reduce
+from operator import add, and_, or_
+
+from django.db import connections
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Greatest
+
+SEARCH_CONFIG = "simple"
+MAX_SEARCH_TERMS = 8
+
+SUPPLIER_SEARCH_FIELDS = ("name", "city")
+PRODUCT_SEARCH_FIELDS = ("name", "model")
+
+
+def search_terms(query):
+    """
+    Слова запроса в исходном регистре; всё, кроме букв и цифр, отбрасывается.
+
+    Регистр не приводится: tsquery и триграммы PostgreSQL нормализуют его сами, а LIKE в SQLite
+    без учёта регистра сравнивает только ASCII, и «сеть» там не найдёт «Сеть».
+    """
+    return re.findall(r"\w+", query or "")[:MAX_SEARCH_TERMS]
+
+
+def _case_variants(term):
+    """Написания слова для поиска через LIKE: как в запросе, строчными и с заглавной буквы."""
+    return list(dict.fromkeys((term, term.lower(), term.capitalize())))
+
+
+def search_queryset(queryset, query, fields):
+    """
+    Отбирает записи, подходящие под запрос, и сортирует их по убыванию `search_rank`.
+
+    На PostgreSQL совпадение ищется по полнотекстовому вектору полей с префиксным tsquery
+    (`слово:*`) либо по триграммному сходству слов (`%>`), что даёт поиск с опечатками.
+    Оба условия обслуживаются GIN-индексами из миграции 0007. На остальных СУБД —
+    переносимый вариант через icontains без учёта опечаток.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset.none()
+    if connections[queryset.db].vendor == "postgresql":
+        return _postgres_search(queryset, terms, fields)
+    return _fallback_search(queryset, terms, fields)
+
+
+def _postgres_search(queryset, terms, fields):
+    # django.contrib.postgres тянет за собой psycopg, поэтому импорт только здесь.
+    from django.contrib.postgres.lookups import TrigramWordSimilar
+    from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                                SearchVector,
+                                                TrigramWordSimilarity)
+
+    # Выражение вектора должно совпадать с индексом *_search_idx, иначе индекс не используется.
+    vector = SearchVector(*fields, config=SEARCH_CONFIG)
+    tsquery = SearchQuery(" & ".join(f"{term}:*" for term in terms), config=SEARCH_CONFIG, search_type="raw")
+    text = " ".join(terms)
+    similarities = [TrigramWordSimilarity(text, F(field)) for field in fields]
+    similarity = Greatest(*similarities) if len(similarities) > 1 else similarities[0]
+    matches = Q(search_document=tsquery) | reduce(
+        or_, (Q(TrigramWordSimilar(F(field), Value(text))) for field in fields)
+    )
+    return (
+        queryset.alias(search_document=vector)
+        .filter(matches)
+        .annotate(search_rank=SearchRank(vector, tsquery) + similarity)
+        .order_by("-search_rank", "id")
+    )
+
+
+def _fallback_search(queryset, terms, fields):
+    # Каждое слово должно встретиться хотя бы в одном поле; совпадение с начала поля весит больше.
+    # icontains вне ASCII в SQLite чувствителен к регистру, поэтому слово ищется в нескольких написаниях.
+    def lookup(field, lookup_name, term):
+        return reduce(or_, (Q(**{f"{field}__{lookup_name}": variant}) for variant in _case_variants(term)))
+
+    matches = reduce(and_, (reduce(or_, (lookup(field, "icontains", term) for field in fields)) for term in terms))
+    weights = [
+        Case(
+            When(lookup(field, "istartswith", term), then=Value(1.0)),
+            When(lookup(field, "icontains", term), then=Value(0.5)),
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+        for term in terms
+        for field in fields
+    ]
+    return queryset.filter(matches).annotate(search_rank=reduce(add, weights)).order_by("-search_rank", "id")
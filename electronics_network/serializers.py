@@ -4,13 +4,24 @@ from rest_framework import serializers
 from .models import Product, Supplier
 
 
+class SparseFieldsMixin:
+    """Оставляет в сериализаторе только поля из context["fields"], если они заданы."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = self.context.get("fields")
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
 class ProductSerializer(serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = ["id", "name", "model", "release_date", "supplier"]
 
 
-class SupplierSerializer(serializers.ModelSerializer):
+class SupplierSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     products = ProductSerializer(many=True, read_only=True)
 
     class Meta:
@@ -43,3 +54,24 @@ class SupplierSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(str(e))
 
         return data
+
+
+class SupplierChangesSerializer(serializers.ModelSerializer):
+    """Новые значения полей для массового PATCH; правила сети проверяются для всего набора (bulk.py)."""
+
+    class Meta:
+        model = Supplier
+        fields = ["name", "email", "country", "city", "street", "house_number", "supplier", "supplier_type"]
+
+
+class SupplierTreeSerializer(SupplierSerializer):
+    depth = serializers.IntegerField(read_only=True)
+
+    class Meta(SupplierSerializer.Meta):
+        fields = SupplierSerializer.Meta.fields + ["depth"]
+
+
+class DebtSummarySerializer(serializers.Serializer):
+    count = serializers.IntegerField()
+    total_debt = serializers.DecimalField(max_digits=20, decimal_places=2)
+    max_debt = serializers.DecimalField(max_digits=10, decimal_places=2, allow_null=True)
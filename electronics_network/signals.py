@@ -0,0 +1,86 @@
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import chain_ids, invalidate_all, invalidate_suppliers
+from .debt import refresh_debt_rollups, rollup_enabled
+from .models import Product, Supplier
+
+
+@receiver(pre_delete, sender=Supplier)
+def detach_subtree(sender, instance, **kwargs):
+    # Клиенты удаляемого звена становятся корнями (on_delete=SET_NULL), поэтому
+    # их поддеревья укорачиваются на путь удаляемого звена. Путь перечитываем из БД:
+    # при массовом удалении он мог измениться после удаления одного из предков.
+    current = Supplier.objects.filter(pk=instance.pk).values_list("path", "level").first()
+    if current is None:
+        return
+    path, level = current
+    instance.path = path
+    if Supplier.rebase_subtree(f"{path}{instance.pk}/", "", -(level + 1)):
+        # UPDATE поддерева не отправляет сигналы, а у клиентов меняются поставщик и цепочка
+        # предков, поэтому кэш ответов сбрасывается целиком, как при массовом удалении.
+        invalidate_all()
+
+
+def supplier_chain(supplier_id):
+    path = Supplier.objects.filter(pk=supplier_id).values_list("path", flat=True).first()
+    return chain_ids(supplier_id, path or "")
+
+
+@receiver(pre_save, sender=Supplier)
+def remember_previous_state(sender, instance, raw=False, **kwargs):
+    # При смене поставщика меняются ответы и итоги задолженности и у прежних предков звена.
+    instance._previous_chain = set()
+    instance._previous_debt = None
+    if instance.pk is not None and not raw:
+        previous = Supplier.objects.filter(pk=instance.pk).values_list("path", "debt").first()
+        if previous is not None:
+            instance._previous_chain = chain_ids(instance.pk, previous[0])
+            instance._previous_debt = previous[1]
+
+
+@receiver(post_save, sender=Supplier)
+@receiver(post_delete, sender=Supplier)
+def invalidate_supplier_cache(sender, instance, **kwargs):
+    invalidate_suppliers(chain_ids(instance.pk, instance.path) | getattr(instance, "_previous_chain", set()))
+
+
+@receiver(post_save, sender=Supplier)
+def update_debt_rollup(sender, instance, created=False, raw=False, **kwargs):
+    if raw or not rollup_enabled():
+        return
+    chain = chain_ids(instance.pk, instance.path)
+    previous_chain = getattr(instance, "_previous_chain", set())
+    if not created and chain == previous_chain and instance.debt == instance._previous_debt:
+        return
+    refresh_debt_rollups(chain | previous_chain)
+
+
+@receiver(post_delete, sender=Supplier)
+def remove_from_debt_rollup(sender, instance, **kwargs):
+    # Строка итогов самого звена удаляется каскадно, пересчитываются только предки.
+    if rollup_enabled():
+        refresh_debt_rollups(instance.ancestor_ids)
+
+
+@receiver(pre_save, sender=Product)
+def remember_previous_supplier(sender, instance, raw=False, **kwargs):
+    instance._previous_supplier_id = None
+    if instance.pk is not None and not raw:
+        instance._previous_supplier_id = (
+            Product.objects.filter(pk=instance.pk).values_list("supplier_id", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_cache(sender, instance, **kwargs):
+    supplier_ids = {instance.supplier_id, getattr(instance, "_previous_supplier_id", None)} - {None}
+    # Товары входят в представление поставщика, поэтому его updated_at тоже сдвигается.
+    Supplier.objects.filter(pk__in=supplier_ids).update(updated_at=timezone.now())
+    ids = set()
+    for supplier_id in supplier_ids:
+        ids |= supplier_chain(supplier_id)
+    invalidate_suppliers(ids)
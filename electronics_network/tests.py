@@ -1,15 +1,61 @@
-from datetime import date
+import csv
+import io
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlencode, urlsplit
 
+from django.contrib import admin
 from django.contrib.admin.sites import AdminSite
 from django.contrib.auth import get_user_model
-from django.test import RequestFactory, TestCase
-from django.urls import reverse
+from django.contrib.auth.models import Group
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import F
+from django.test import (Client, RequestFactory, SimpleTestCase, TestCase,
+                         TransactionTestCase, override_settings)
+from django.test.utils import CaptureQueriesContext
+from django.urls import (URLResolver, get_resolver, include, path, resolve,
+                         reverse)
+from django.utils import timezone
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
 
-from .admin import SupplierAdmin
-from .models import Product, Supplier
+from .admin import (CityListFilter, DebtClearingJobAdmin, ProductAdmin,
+                    SupplierAdmin)
+from .async_views import AsyncSupplierView
+from .benchmarks import (AUTH_QUERIES, budget_failures, compare_reports,
+                         run_benchmarks)
+from .bulk import DELETE_RELATIONS
+from .bulk_import import NetworkImport
+from .debt import rebuild_debt_rollups
+from .filters import SupplierFilterBackend
+from .generator import CopyWriter, NetworkGenerator, NetworkSpec, clear_network
+from .jobs import clear_debt, run_debt_job, run_pending_jobs
+from .loadtest import run_load
+from .metrics import (PROMETHEUS_CONTENT_TYPE, MetricsStore, get_store,
+                      render_metrics, request_increments)
+from .models import DebtClearingJob, Product, Supplier, SupplierDebtRollup
+from .pagination import (CreatedAtCursorPagination, EstimatedCountPaginator,
+                         estimate_count)
+from .search import SUPPLIER_SEARCH_FIELDS, search_queryset, search_terms
 from .serializers import ProductSerializer, SupplierSerializer
+from .urls import router
+from .views import SupplierViewSet
 
 User = get_user_model()
 
@@ -87,7 +133,7 @@ class SupplierViewSetTest(APITestCase):
         self.assertEqual(Supplier.objects.count(), 1)
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data["results"]), 1)
 
     def test_create_supplier(self):
         data = {
@@ -181,8 +227,489 @@ class SupplierFilterTest(APITestCase):
     def test_filter_by_country(self):
         response = self.client.get(self.url, {"country": "Country 1"})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["name"], "Supplier 1")
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["name"], "Supplier 1")
+
+
+class SupplierFilterBackendTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="testpass", is_active=True)
+        self.client.force_authenticate(user=self.user)
+        self.factory = Supplier.objects.create(
+            name="Factory",
+            email="factory@example.com",
+            country="RU",
+            city="Moscow",
+            street="Street",
+            house_number="1",
+            supplier_type="factory",
+        )
+        self.retail = Supplier.objects.create(
+            name="Retail",
+            email="retail@example.com",
+            country="kz",
+            city="Almaty",
+            street="Street",
+            house_number="2",
+            supplier_type="retail",
+            supplier=self.factory,
+            debt=Decimal("150.00"),
+        )
+        self.entrepreneur = Supplier.objects.create(
+            name="Entrepreneur",
+            email="ip@example.com",
+            country="BY",
+            city="Minsk",
+            street="Street",
+            house_number="3",
+            supplier_type="entrepreneur",
+            supplier=self.retail,
+            debt=Decimal("20.00"),
+        )
+        Supplier.objects.filter(pk=self.factory.pk).update(created_at=datetime(2024, 1, 10, tzinfo=dt_timezone.utc))
+        self.url = reverse("supplier-list")
+
+    def names(self, params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {row["name"] for row in response.data["results"]}
+
+    def test_filters(self):
+        self.assertEqual(self.names({"country": "ru,KZ"}), {"Factory", "Retail"})
+        self.assertEqual(self.names({"supplier_type": "retail,entrepreneur"}), {"Retail", "Entrepreneur"})
+        self.assertEqual(self.names({"city": "Minsk"}), {"Entrepreneur"})
+        self.assertEqual(self.names({"level": "0,2"}), {"Factory", "Entrepreneur"})
+        self.assertEqual(self.names({"debt_min": "20", "debt_max": "100"}), {"Entrepreneur"})
+        self.assertEqual(self.names({"created_before": "2024-02-01"}), {"Factory"})
+        self.assertEqual(self.names({"created_after": "2024-02-01T00:00:00Z"}), {"Retail", "Entrepreneur"})
+
+    def test_filters_apply_to_tree_actions(self):
+        url = reverse("supplier-descendants", kwargs={"pk": self.factory.pk})
+        response = self.client.get(url, {"debt_min": "100"})
+        self.assertEqual([row["name"] for row in response.data["results"]], ["Retail"])
+
+    def test_invalid_values(self):
+        for params in (
+            {"supplier_type": "warehouse"},
+            {"level": "-1"},
+            {"debt_min": "lots"},
+            {"debt_max": "NaN"},
+            {"created_after": "2024-13-01"},
+        ):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+
+class SupplierFilterIndexTest(TestCase):
+    def explain(self, params):
+        if connection.vendor == "postgresql":
+            # На пустой таблице планировщик выбрал бы seq scan; проверяем, что индекс вообще применим.
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        request = Request(APIRequestFactory().get("/", params))
+        return SupplierFilterBackend().filter_queryset(request, Supplier.objects.all(), None).explain()
+
+    def assert_uses_index(self, params, index_name):
+        plan = self.explain(params)
+        self.assertRegex(plan, rf"(?i)index\b.*{index_name}", plan)
+
+    def test_country_uses_expression_index(self):
+        self.assert_uses_index({"country": "RU,KZ"}, "supplier_country_ci_idx")
+
+    def test_supplier_type_uses_index(self):
+        self.assert_uses_index({"supplier_type": "retail"}, "supplier_type_created_at_idx")
+
+    def test_city_uses_index(self):
+        self.assert_uses_index({"city": "Moscow,Minsk"}, "supplier_city_idx")
+
+    def test_level_uses_index(self):
+        self.assert_uses_index({"level": "1"}, "supplier_level")
+
+    def test_debt_range_uses_index(self):
+        self.assert_uses_index({"debt_min": "1", "debt_max": "5"}, "supplier_debt_idx")
+
+    def test_created_at_range_uses_index(self):
+        self.assert_uses_index({"created_after": "2024-01-01", "created_before": "2024-02-01"}, "created_at")
+
+
+class SupplierSearchTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="testpass", is_active=True)
+        self.client.force_authenticate(user=self.user)
+        self.factory = Supplier.objects.create(
+            name="Samsung Electronics",
+            email="samsung@example.com",
+            country="KR",
+            city="Suwon",
+            street="Street",
+            house_number="1",
+            supplier_type="factory",
+        )
+        self.retail = Supplier.objects.create(
+            name="Electro Market",
+            email="market@example.com",
+            country="RU",
+            city="Moscow",
+            street="Street",
+            house_number="2",
+            supplier_type="retail",
+            supplier=self.factory,
+        )
+        self.other = Supplier.objects.create(
+            name="Gadget Store",
+            email="gadget@example.com",
+            country="RU",
+            city="Samara",
+            street="Street",
+            house_number="3",
+            supplier_type="retail",
+            supplier=self.factory,
+        )
+        self.phone = Product.objects.create(
+            name="Galaxy", model="S24", release_date=date(2024, 1, 17), supplier=self.factory
+        )
+        Product.objects.create(name="Television", model="QN90", release_date=date(2023, 3, 1), supplier=self.retail)
+        self.url = reverse("supplier-search")
+
+    def test_search_terms(self):
+        self.assertEqual(search_terms("  Samsung, electro-market!"), ["Samsung", "electro", "market"])
+        self.assertEqual(search_terms("%_"), ["_"])
+        self.assertEqual(search_terms(None), [])
+
+    def test_prefix_search_is_ranked(self):
+        response = self.client.get(self.url, {"q": "elect"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        names = [row["name"] for row in response.data["suppliers"]]
+        self.assertEqual(set(names), {"Samsung Electronics", "Electro Market"})
+        # Совпадение с начала поля выше совпадения в середине.
+        if connection.vendor != "postgresql":
+            self.assertEqual(names, ["Electro Market", "Samsung Electronics"])
+        ranks = [row["rank"] for row in response.data["suppliers"]]
+        self.assertEqual(ranks, sorted(ranks, reverse=True))
+
+    def test_cyrillic_search_ignores_case(self):
+        # LIKE в SQLite без учёта регистра сравнивает только ASCII.
+        plant = Supplier.objects.create(
+            name="Завод Восток", email="plant@example.com", country="RU", city="Тула", street="Street", house_number="4"
+        )
+        for query in ("Завод", "завод", "ЗАВОД ТУЛ"):
+            with self.subTest(query=query):
+                response = self.client.get(self.url, {"q": query})
+                self.assertEqual([row["id"] for row in response.data["suppliers"]], [plant.pk])
+
+    def test_all_terms_must_match(self):
+        response = self.client.get(self.url, {"q": "sam sto"})
+        self.assertEqual([row["name"] for row in response.data["suppliers"]], ["Gadget Store"])
+
+    def test_searches_city_and_products(self):
+        response = self.client.get(self.url, {"q": "moscow"})
+        self.assertEqual([row["name"] for row in response.data["suppliers"]], ["Electro Market"])
+        response = self.client.get(self.url, {"q": "s24"})
+        self.assertEqual(response.data["suppliers"], [])
+        self.assertEqual([row["id"] for row in response.data["products"]], [self.phone.pk])
+        self.assertEqual(response.data["products"][0]["supplier"], self.factory.pk)
+
+    def test_combines_with_filters_fields_and_limit(self):
+        response = self.client.get(self.url, {"q": "s", "country": "ru", "fields": "id,name", "limit": "1"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["suppliers"]), 1)
+        self.assertEqual(set(response.data["suppliers"][0]), {"id", "name", "rank"})
+        self.assertIn(response.data["suppliers"][0]["id"], {self.retail.pk, self.other.pk})
+
+    def test_invalid_params(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {"q": " -- "}).status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {"q": "samsung", "limit": "0"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_cache_invalidated_on_change(self):
+        self.assertEqual(len(self.client.get(self.url, {"q": "gadget"}).data["suppliers"]), 1)
+        self.other.name = "Shop"
+        self.other.save()
+        self.assertEqual(self.client.get(self.url, {"q": "gadget"}).data["suppliers"], [])
+
+    def test_admin_uses_ranked_search(self):
+        request = RequestFactory().get("/")
+        supplier_admin = SupplierAdmin(Supplier, AdminSite())
+        queryset, may_have_duplicates = supplier_admin.get_search_results(request, Supplier.objects.all(), "suw")
+        self.assertEqual(list(queryset), [self.factory])
+        self.assertFalse(may_have_duplicates)
+        product_admin = ProductAdmin(Product, AdminSite())
+        queryset, _ = product_admin.get_search_results(request, Product.objects.all(), "qn9")
+        self.assertEqual([product.model for product in queryset], ["QN90"])
+        queryset, _ = product_admin.get_search_results(request, Product.objects.all(), "  ")
+        self.assertEqual(queryset.count(), 2)
+
+    def test_search_uses_indexes(self):
+        if connection.vendor != "postgresql":
+            self.skipTest("GIN-индексы поиска создаются только на PostgreSQL.")
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = search_queryset(Supplier.objects.all(), "samsng", SUPPLIER_SEARCH_FIELDS).explain()
+        self.assertRegex(plan, r"(?i)supplier_search_idx", plan)
+        self.assertRegex(plan, r"(?i)supplier_name_trgm_idx", plan)
+
+
+class SupplierDebtTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="testpass", is_active=True)
+        self.client.force_authenticate(user=self.user)
+        self.factory = self.create("Factory", "RU", "factory")
+        self.retail = self.create("Retail", "KZ", "retail", self.factory, "100.00")
+        self.entrepreneur = self.create("Entrepreneur", "RU", "entrepreneur", self.retail, "50.00")
+        self.other_factory = self.create("Other Factory", "CN", "factory")
+        self.other_retail = self.create("Other Retail", "CN", "retail", self.other_factory, "30.00")
+        self.url = reverse("supplier-debt")
+
+    def create(self, name, country, supplier_type, supplier=None, debt="0.00"):
+        return Supplier.objects.create(
+            name=name,
+            email=f"{name.lower().replace(' ', '')}@example.com",
+            country=country,
+            city="City",
+            street="Street",
+            house_number="1",
+            supplier_type=supplier_type,
+            supplier=supplier,
+            debt=Decimal(debt),
+        )
+
+    def get(self, url, params=None):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_summary(self):
+        self.assertEqual(self.get(self.url), {"count": 5, "total_debt": "180.00", "max_debt": "100.00"})
+        self.assertEqual(
+            self.get(self.url, {"country": "ru"}), {"count": 2, "total_debt": "50.00", "max_debt": "50.00"}
+        )
+
+    def test_group_by(self):
+        data = self.get(self.url, {"group_by": "country"})
+        self.assertEqual(data["group_by"], "country")
+        self.assertEqual(
+            data["results"],
+            [
+                {"country": "CN", "count": 2, "total_debt": "30.00", "max_debt": "30.00"},
+                {"country": "KZ", "count": 1, "total_debt": "100.00", "max_debt": "100.00"},
+                {"country": "RU", "count": 2, "total_debt": "50.00", "max_debt": "50.00"},
+            ],
+        )
+        data = self.get(self.url, {"group_by": "supplier_type", "debt_min": "1"})
+        self.assertEqual(
+            [(row["supplier_type"], row["count"], row["total_debt"]) for row in data["results"]],
+            [("entrepreneur", 1, "50.00"), ("retail", 2, "130.00")],
+        )
+        data = self.get(self.url, {"group_by": "factory"})
+        self.assertEqual(
+            data["results"],
+            [
+                {"factory": self.factory.pk, "count": 3, "total_debt": "150.00", "max_debt": "100.00"},
+                {"factory": self.other_factory.pk, "count": 2, "total_debt": "30.00", "max_debt": "30.00"},
+            ],
+        )
+
+    def test_subtree(self):
+        url = reverse("supplier-subtree-debt", kwargs={"pk": self.retail.pk})
+        self.assertEqual(self.get(url), {"count": 2, "total_debt": "150.00", "max_debt": "100.00"})
+        data = self.get(url, {"group_by": "country"})
+        self.assertEqual(
+            [(row["country"], row["total_debt"]) for row in data["results"]], [("KZ", "100.00"), ("RU", "50.00")]
+        )
+        url = reverse("supplier-subtree-debt", kwargs={"pk": self.entrepreneur.pk})
+        self.assertEqual(self.get(url, {"country": "KZ"}), {"count": 0, "total_debt": "0.00", "max_debt": None})
+
+    def test_invalid_group_by(self):
+        response = self.client.get(self.url, {"group_by": "city"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        url = reverse("supplier-subtree-debt", kwargs={"pk": 0})
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cache_invalidated_on_debt_change(self):
+        url = reverse("supplier-subtree-debt", kwargs={"pk": self.factory.pk})
+        self.assertEqual(self.get(url)["total_debt"], "150.00")
+        self.entrepreneur.debt = Decimal("10.00")
+        self.entrepreneur.save()
+        self.assertEqual(self.get(url)["total_debt"], "110.00")
+        self.assertEqual(self.get(self.url)["total_debt"], "140.00")
+
+
+@override_settings(SUPPLIER_DEBT_ROLLUP=True)
+class SupplierDebtRollupTest(SupplierDebtTest):
+    def setUp(self):
+        super().setUp()
+        rebuild_debt_rollups()
+
+    def assert_rollups_consistent(self):
+        rows = set(SupplierDebtRollup.objects.values_list("supplier_id", "debt_total", "supplier_count", "max_debt"))
+        rebuild_debt_rollups()
+        self.assertEqual(
+            rows, set(SupplierDebtRollup.objects.values_list("supplier_id", "debt_total", "supplier_count", "max_debt"))
+        )
+
+    def test_rebuild(self):
+        rollup = SupplierDebtRollup.objects.get(pk=self.factory.pk)
+        self.assertEqual(
+            (rollup.debt_total, rollup.supplier_count, rollup.max_debt), (Decimal("150.00"), 3, Decimal("100.00"))
+        )
+        self.assertEqual(SupplierDebtRollup.objects.count(), 5)
+
+    def test_debt_change_updates_chain(self):
+        self.retail.debt = Decimal("5.00")
+        self.retail.save()
+        rollup = SupplierDebtRollup.objects.get(pk=self.factory.pk)
+        self.assertEqual((rollup.debt_total, rollup.max_debt), (Decimal("55.00"), Decimal("50.00")))
+        self.assert_rollups_consistent()
+
+    def test_reparent_create_and_delete(self):
+        self.retail.supplier = self.other_factory
+        self.retail.save()
+        self.assertEqual(SupplierDebtRollup.objects.get(pk=self.factory.pk).supplier_count, 1)
+        self.assertEqual(SupplierDebtRollup.objects.get(pk=self.other_factory.pk).debt_total, Decimal("180.00"))
+        self.assert_rollups_consistent()
+
+        self.create("New", "RU", "entrepreneur", self.entrepreneur, "7.00")
+        self.assertEqual(SupplierDebtRollup.objects.get(pk=self.other_factory.pk).supplier_count, 5)
+        self.assert_rollups_consistent()
+
+        self.retail.delete()
+        self.assertEqual(SupplierDebtRollup.objects.get(pk=self.other_factory.pk).debt_total, Decimal("30.00"))
+        self.assert_rollups_consistent()
+
+    def test_bulk_paths(self):
+        SupplierAdmin(Supplier, AdminSite()).clear_debt(None, Supplier.objects.filter(pk=self.retail.pk))
+        self.assertEqual(SupplierDebtRollup.objects.get(pk=self.factory.pk).debt_total, Decimal("50.00"))
+        self.assert_rollups_consistent()
+
+        rows = [
+            {
+                "key": "a",
+                "name": "Imported",
+                "email": "a@example.com",
+                "country": "RU",
+                "city": "C",
+                "street": "S",
+                "house_number": "1",
+                "supplier_type": "retail",
+                "supplier_id": str(self.entrepreneur.pk),
+                "debt": "9.00",
+            }
+        ]
+        NetworkImport(rows, []).run()
+        self.assertEqual(SupplierDebtRollup.objects.get(pk=self.factory.pk).debt_total, Decimal("59.00"))
+        self.assert_rollups_consistent()
+
+    def test_queryset_update_of_debt(self):
+        url = reverse("supplier-subtree-debt", kwargs={"pk": self.factory.pk})
+        self.assertEqual(self.get(url)["total_debt"], "150.00")
+        updated = Supplier.objects.filter(pk__in=[self.retail.pk, self.entrepreneur.pk]).update(debt=F("debt") + 1)
+        self.assertEqual(updated, 2)
+        self.assertEqual(SupplierDebtRollup.objects.get(pk=self.factory.pk).debt_total, Decimal("152.00"))
+        self.assert_rollups_consistent()
+        # Закэшированный до UPDATE ответ не должен пережить изменение.
+        self.assertEqual(self.get(url)["total_debt"], "152.00")
+
+    def test_endpoints_read_rollups(self):
+        # Искажённая строка итогов видна в ответе, значит ответ собран из таблицы.
+        SupplierDebtRollup.objects.filter(pk=self.factory.pk).update(debt_total=Decimal("1.00"))
+        url = reverse("supplier-subtree-debt", kwargs={"pk": self.factory.pk})
+        self.assertEqual(self.get(url)["total_debt"], "1.00")
+        self.assertEqual(self.get(self.url, {"group_by": "factory"})["results"][0]["total_debt"], "1.00")
+        # С фильтрами — только SQL по самим поставщикам.
+        self.assertEqual(self.get(url, {"country": "RU,KZ"})["total_debt"], "150.00")
+
+
+class SupplierCycleAndDepthTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = self.create("Factory", "factory")
+        self.a = self.create("A", supplier=self.factory)
+        self.b = self.create("B", supplier=self.a)
+        self.c = self.create("C", supplier=self.b)
+        self.other = self.create("Other", supplier=self.factory)
+
+    def create(self, name, supplier_type="retail", supplier=None, debt="0.00"):
+        return Supplier.objects.create(
+            name=name,
+            email="supplier@example.com",
+            country="Country",
+            city="City",
+            street="Street",
+            house_number="1",
+            supplier_type=supplier_type,
+            supplier=supplier,
+            debt=Decimal(debt),
+        )
+
+    def hierarchy(self, supplier):
+        supplier.refresh_from_db()
+        return supplier.supplier_id, supplier.path, supplier.level
+
+    def test_clean_rejects_longer_cycles(self):
+        for parent in (self.b, self.c):
+            self.a.supplier = parent
+            with self.assertRaisesMessage(ValidationError, "Цепочка поставщиков образует цикл."):
+                self.a.full_clean()
+        self.a.supplier = self.a
+        with self.assertRaisesMessage(ValidationError, "Поставщик не может ссылаться сам на себя."):
+            self.a.full_clean()
+
+    def test_api_rejects_cycle(self):
+        user = User.objects.create_user(username="testuser", password="testpass", is_active=True)
+        self.client.force_authenticate(user=user)
+        url = reverse("supplier-detail", kwargs={"pk": self.a.pk})
+        response = self.client.patch(url, {"supplier": self.c.pk})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.hierarchy(self.a), (self.factory.pk, f"{self.factory.pk}/", 1))
+
+    @override_settings(SUPPLIER_MAX_DEPTH=4)
+    def test_max_depth(self):
+        self.create("D", supplier=self.c)
+        with self.assertRaisesMessage(ValidationError, "Превышена максимальная глубина иерархии (4)."):
+            self.create("E", supplier=Supplier.objects.get(name="D"))
+        # B с потомками до уровня 4 под Other помещается, но Other с ними под A — уже нет.
+        self.b.supplier = self.other
+        self.b.save()
+        self.assertEqual(Supplier.objects.get(name="D").level, 4)
+        self.other.supplier = self.a
+        with self.assertRaisesMessage(ValidationError, "После переноса потомки звена окажутся глубже"):
+            self.other.full_clean()
+
+    def test_bulk_update_rejects_cycle_and_rules(self):
+        with self.assertRaisesMessage(ValidationError, "Цепочка поставщиков образует цикл."):
+            Supplier.objects.filter(pk__in=[self.a.pk, self.other.pk]).update(supplier=self.c)
+        with self.assertRaisesMessage(ValidationError, "Поставщик не может ссылаться сам на себя."):
+            Supplier.objects.filter(pk=self.a.pk).update(supplier_id=self.a.pk)
+        other_factory = self.create("Other Factory", "factory")
+        with self.assertRaisesMessage(ValidationError, "Завод не может иметь поставщика."):
+            Supplier.objects.filter(pk=other_factory.pk).update(supplier=self.other)
+        with self.assertRaisesMessage(ValidationError, "Поставщик с id 0 не найден."):
+            Supplier.objects.filter(pk=self.a.pk).update(supplier_id=0)
+        with override_settings(SUPPLIER_MAX_DEPTH=3):
+            with self.assertRaisesMessage(ValidationError, "Превышена максимальная глубина иерархии (3)."):
+                Supplier.objects.filter(pk=self.a.pk).update(supplier=self.other)
+        self.assertEqual(self.hierarchy(self.c), (self.b.pk, f"{self.factory.pk}/{self.a.pk}/{self.b.pk}/", 3))
+
+    def test_bulk_update_rebases_nested_selection(self):
+        moved = Supplier.objects.filter(pk__in=[self.a.pk, self.b.pk]).update(supplier=self.other, name="Moved")
+        self.assertEqual(moved, 2)
+        prefix = f"{self.factory.pk}/{self.other.pk}/"
+        self.assertEqual(self.hierarchy(self.a), (self.other.pk, prefix, 2))
+        self.assertEqual(self.hierarchy(self.b), (self.other.pk, prefix, 2))
+        self.assertEqual(self.hierarchy(self.c), (self.b.pk, f"{prefix}{self.b.pk}/", 3))
+        self.assertEqual(self.b.name, "Moved")
+
+        Supplier.objects.filter(pk=self.b.pk).update(supplier=None)
+        self.assertEqual(self.hierarchy(self.b), (None, "", 0))
+        self.assertEqual(self.hierarchy(self.c), (self.b.pk, f"{self.b.pk}/", 1))
+
+    def test_bulk_update_without_supplier_is_plain_update(self):
+        with self.assertNumQueries(1):
+            Supplier.objects.filter(pk=self.c.pk).update(name="Renamed")
 
 
 class SupplierHierarchyTest(TestCase):
@@ -190,37 +717,1691 @@ class SupplierHierarchyTest(TestCase):
         self.factory = Supplier.objects.create(
             name="Factory",
             email="factory@example.com",
-            country="Country",
+            country="Country",
+            city="City",
+            street="Street",
+            house_number="123",
+            supplier_type="factory",
+        )
+        self.retail = Supplier.objects.create(
+            name="Retail",
+            email="retail@example.com",
+            country="Country",
+            city="City",
+            street="Street",
+            house_number="456",
+            supplier_type="retail",
+            supplier=self.factory,
+        )
+        self.entrepreneur = Supplier.objects.create(
+            name="Entrepreneur",
+            email="entrepreneur@example.com",
+            country="Country",
+            city="City",
+            street="Street",
+            house_number="789",
+            supplier_type="entrepreneur",
+            supplier=self.retail,
+        )
+
+    def test_hierarchy_levels(self):
+        self.assertEqual(self.factory.level, 0)
+        self.assertEqual(self.retail.level, 1)
+        self.assertEqual(self.entrepreneur.level, 2)
+
+
+class SupplierMaterializedPathTest(TestCase):
+    def setUp(self):
+        self.factory = Supplier.objects.create(
+            name="Factory",
+            email="factory@example.com",
+            country="Country",
+            city="City",
+            street="Street",
+            house_number="1",
+            supplier_type="factory",
+        )
+        self.other_factory = Supplier.objects.create(
+            name="Other Factory",
+            email="other@example.com",
+            country="Country",
+            city="City",
+            street="Street",
+            house_number="2",
+            supplier_type="factory",
+        )
+        self.retail = Supplier.objects.create(
+            name="Retail",
+            email="retail@example.com",
+            country="Country",
+            city="City",
+            street="Street",
+            house_number="3",
+            supplier_type="retail",
+            supplier=self.factory,
+        )
+        self.entrepreneur = Supplier.objects.create(
+            name="Entrepreneur",
+            email="entrepreneur@example.com",
+            country="Country",
+            city="City",
+            street="Street",
+            house_number="4",
+            supplier_type="entrepreneur",
+            supplier=self.retail,
+        )
+
+    def test_path_on_create(self):
+        self.assertEqual(self.factory.path, "")
+        self.assertEqual(self.retail.path, f"{self.factory.pk}/")
+        self.assertEqual(self.entrepreneur.path, f"{self.factory.pk}/{self.retail.pk}/")
+        self.assertEqual(self.entrepreneur.level, 2)
+
+    def test_level_needs_no_queries(self):
+        entrepreneur = Supplier.objects.get(pk=self.entrepreneur.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(entrepreneur.level, 2)
+
+    def test_ancestors_and_descendants_single_query(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(list(self.entrepreneur.get_ancestors()), [self.factory, self.retail])
+        with self.assertNumQueries(1):
+            self.assertEqual(set(self.factory.get_descendants()), {self.retail, self.entrepreneur})
+
+    def test_reparent_moves_subtree(self):
+        self.retail.supplier = self.other_factory
+        self.retail.save()
+        self.entrepreneur.refresh_from_db()
+        self.assertEqual(self.entrepreneur.path, f"{self.other_factory.pk}/{self.retail.pk}/")
+        self.assertEqual(self.entrepreneur.level, 2)
+
+        self.retail.supplier = None
+        self.retail.save()
+        self.entrepreneur.refresh_from_db()
+        self.assertEqual(self.retail.level, 0)
+        self.assertEqual(self.entrepreneur.path, f"{self.retail.pk}/")
+        self.assertEqual(self.entrepreneur.level, 1)
+
+    def test_delete_detaches_subtree(self):
+        self.factory.delete()
+        self.retail.refresh_from_db()
+        self.entrepreneur.refresh_from_db()
+        self.assertIsNone(self.retail.supplier)
+        self.assertEqual(self.retail.path, "")
+        self.assertEqual(self.retail.level, 0)
+        self.assertEqual(self.entrepreneur.path, f"{self.retail.pk}/")
+        self.assertEqual(self.entrepreneur.level, 1)
+
+    def test_bulk_delete_of_chain(self):
+        Supplier.objects.filter(pk__in=[self.factory.pk, self.retail.pk]).delete()
+        self.entrepreneur.refresh_from_db()
+        self.assertEqual(self.entrepreneur.path, "")
+        self.assertEqual(self.entrepreneur.level, 0)
+
+
+class SupplierBulkActionsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="testpass", is_active=True)
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("supplier-bulk")
+        self.factory = self.create_supplier("Factory", "factory")
+        self.chain = self.create_supplier("Chain", "retail", self.factory)
+        self.other_chain = self.create_supplier("Other Chain", "retail", self.factory)
+        self.entrepreneurs = [
+            self.create_supplier(f"IP {number}", "entrepreneur", self.chain, debt=Decimal(number))
+            for number in range(4)
+        ]
+        self.sub = self.create_supplier("Sub", "entrepreneur", self.entrepreneurs[1])
+        Product.objects.create(name="TV", model="X1", release_date=date.today(), supplier=self.entrepreneurs[1])
+
+    def create_supplier(self, name, supplier_type, parent=None, debt=Decimal("0.00")):
+        return Supplier.objects.create(
+            name=name,
+            email=f"{name.lower().replace(' ', '')}@example.com",
+            country="RU",
+            city="Moscow",
+            street="Street",
+            house_number="1",
+            supplier_type=supplier_type,
+            supplier=parent,
+            debt=debt,
+        )
+
+    def patch(self, data, **params):
+        url = self.url if not params else f"{self.url}?{urlencode(params)}"
+        return self.client.patch(url, data, format="json")
+
+    def statuses(self, response):
+        return {row["id"]: row["status"] for row in response.data["results"]}
+
+    def test_reparent_by_ids(self):
+        ids = [supplier.pk for supplier in self.entrepreneurs]
+        response = self.patch({"ids": ids, "changes": {"supplier": self.other_chain.pk, "city": "Kazan"}})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data["updated"], response.data["errors"]), (4, 0))
+        self.assertEqual(self.statuses(response), dict.fromkeys(ids, "updated"))
+        for supplier in Supplier.objects.filter(pk__in=ids):
+            self.assertEqual((supplier.supplier_id, supplier.level, supplier.city), (self.other_chain.pk, 2, "Kazan"))
+            self.assertEqual(supplier.path, self.other_chain.subtree_prefix)
+        self.sub.refresh_from_db()
+        self.assertEqual(self.sub.path, f"{self.other_chain.subtree_prefix}{self.entrepreneurs[1].pk}/")
+        self.assertEqual(self.sub.level, 3)
+        self.assertEqual(self.chain.clients.count(), 0)
+        # Ответы API сброшены: список видит перенос.
+        detail = self.client.get(reverse("supplier-detail", kwargs={"pk": ids[0]}))
+        self.assertEqual(detail.data["supplier"], self.other_chain.pk)
+
+    def test_queries_do_not_grow_with_selection(self):
+        def count(ids, parent):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.patch({"ids": ids, "changes": {"supplier": parent.pk}})
+            self.assertEqual(response.data["updated"], len(ids))
+            return len(queries)
+
+        leaves = [supplier.pk for supplier in self.entrepreneurs if supplier != self.entrepreneurs[1]]
+        self.assertEqual(count(leaves[:1], self.other_chain), count(leaves, self.chain))
+
+    def test_filter_selection(self):
+        response = self.patch({"changes": {"city": "Kazan"}}, supplier_type="entrepreneur", debt_min="1")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected = sorted(supplier.pk for supplier in self.entrepreneurs[1:])
+        self.assertEqual(sorted(self.statuses(response)), expected)
+        self.assertEqual(sorted(Supplier.objects.filter(city="Kazan").values_list("id", flat=True)), expected)
+
+    def test_network_rules_per_id(self):
+        ids = [self.entrepreneurs[0].pk, self.entrepreneurs[2].pk, 999999]
+        response = self.patch({"ids": ids, "changes": {"supplier": None}})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data["updated"], response.data["errors"]), (1, 1))
+        results = {row["id"]: row for row in response.data["results"]}
+        self.assertEqual([row["id"] for row in response.data["results"]], ids)
+        self.assertEqual(results[ids[0]]["status"], "updated")
+        self.assertEqual(results[ids[1]]["errors"], ["У нулевого уровня не может быть задолженности."])
+        self.assertEqual(results[999999]["status"], "not_found")
+        self.assertEqual(Supplier.objects.get(pk=ids[0]).level, 0)
+        self.assertEqual(Supplier.objects.get(pk=ids[1]).level, 2)
+
+        response = self.patch({"ids": [self.chain.pk], "changes": {"supplier": self.sub.pk}})
+        self.assertEqual(response.data["results"][0]["errors"], ["Цепочка поставщиков образует цикл."])
+        response = self.patch({"ids": [self.chain.pk], "changes": {"supplier": self.chain.pk}})
+        self.assertEqual(response.data["results"][0]["errors"], ["Поставщик не может ссылаться сам на себя."])
+        response = self.patch({"ids": [self.other_chain.pk], "changes": {"supplier_type": "factory"}})
+        self.assertEqual(response.data["results"][0]["errors"], ["Завод не может иметь поставщика."])
+        self.assertEqual(Supplier.objects.get(pk=self.chain.pk).supplier_id, self.factory.pk)
+
+    @override_settings(SUPPLIER_MAX_DEPTH=4)
+    def test_subtree_depth(self):
+        # Chain(1) -> IP 1(2) -> Sub(3): под Branch (уровень 2) Sub оказался бы на уровне 5.
+        branch = self.create_supplier("Branch", "entrepreneur", self.other_chain)
+        response = self.patch({"ids": [self.chain.pk], "changes": {"supplier": branch.pk}})
+        self.assertEqual(
+            response.data["results"][0]["errors"],
+            ["После переноса потомки звена окажутся глубже максимального уровня (4)."],
+        )
+        self.assertEqual(
+            self.patch({"ids": [self.chain.pk], "changes": {"supplier": self.other_chain.pk}}).data["updated"], 1
+        )
+        self.sub.refresh_from_db()
+        self.assertEqual(self.sub.level, 4)
+
+    def test_strict_applies_all_or_nothing(self):
+        ids = [self.entrepreneurs[0].pk, self.entrepreneurs[2].pk]
+        response = self.patch({"ids": ids, "changes": {"supplier": None}, "strict": True})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.statuses(response), {ids[0]: "skipped", ids[1]: "invalid"})
+        self.assertFalse(Supplier.objects.filter(pk__in=ids, level=0).exists())
+
+    def test_debt_is_read_only(self):
+        ids = [supplier.pk for supplier in self.entrepreneurs]
+        for changes in ({"debt": "0.00"}, {"debt": "0.00", "city": "Kazan"}, {"created_at": "2024-01-01"}):
+            response = self.patch({"ids": ids, "changes": changes})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("changes", response.data)
+        self.assertEqual(Supplier.objects.filter(pk__in=ids, city="Kazan").count(), 0)
+        self.assertEqual(Supplier.objects.get(pk=ids[3]).debt, Decimal("3.00"))
+
+    def test_selection_is_required(self):
+        for data in ({"changes": {"city": "Kazan"}}, {"ids": [], "changes": {"city": "Kazan"}}):
+            self.assertEqual(self.patch(data).status_code, status.HTTP_400_BAD_REQUEST)
+        for ids in ("1,2", [1, "x"], [True]):
+            response = self.patch({"ids": ids, "changes": {"city": "Kazan"}})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.patch({"ids": [1], "changes": {}}).status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.patch({"ids": [1], "changes": {"supplier": 999999}})
+        self.assertIn("supplier", response.data["changes"])
+        with override_settings(SUPPLIER_BULK_LIMIT=2):
+            response = self.patch({"changes": {"city": "Kazan"}}, supplier_type="entrepreneur")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.delete(self.url).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Supplier.objects.count(), 8)
+
+    def test_bulk_delete(self):
+        ids = [self.chain.pk, self.entrepreneurs[1].pk, 999999]
+        response = self.client.delete(self.url, {"ids": ids}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["deleted"], 2)
+        self.assertEqual(
+            self.statuses(response),
+            {self.chain.pk: "deleted", self.entrepreneurs[1].pk: "deleted", 999999: "not_found"},
+        )
+        self.assertFalse(Supplier.objects.filter(pk__in=ids).exists())
+        self.assertFalse(Product.objects.exists())
+        # Как при одиночном удалении: клиенты удалённых звеньев становятся корнями вместе с поддеревьями.
+        for supplier in Supplier.objects.exclude(pk__in=[self.factory.pk, self.other_chain.pk]):
+            self.assertEqual((supplier.supplier_id, supplier.path, supplier.level), (None, "", 0))
+        self.assertEqual(self.client.get(reverse("supplier-detail", kwargs={"pk": ids[0]})).status_code, 404)
+
+        response = self.client.delete(f"{self.url}?supplier_type=entrepreneur", format="json")
+        self.assertEqual(response.data["deleted"], 4)
+        self.assertEqual(set(Supplier.objects.values_list("id", flat=True)), {self.factory.pk, self.other_chain.pk})
+
+    def test_bulk_delete_cascades_products(self):
+        kept = Product.objects.create(name="Radio", model="R2", release_date=date.today(), supplier=self.other_chain)
+        Product.objects.create(name="Phone", model="P3", release_date=date.today(), supplier=self.entrepreneurs[0])
+        self.client.delete(self.url, {"ids": [self.entrepreneurs[0].pk, self.entrepreneurs[1].pk]}, format="json")
+        self.assertEqual(list(Product.objects.all()), [kept])
+
+    def test_delete_relations_match_model(self):
+        # delete_chunk обходит коллектор, поэтому каждая связь на Supplier должна быть в DELETE_RELATIONS.
+        relations = {(rel.related_model, rel.field.name): rel.on_delete for rel in Supplier._meta.related_objects}
+        self.assertEqual(relations, DELETE_RELATIONS)
+
+    @override_settings(SUPPLIER_DEBT_ROLLUP=True)
+    def test_debt_rollups_stay_consistent(self):
+        def rollups():
+            return dict(SupplierDebtRollup.objects.values_list("supplier_id", "debt_total"))
+
+        rebuild_debt_rollups()
+        self.patch(
+            {"ids": [self.entrepreneurs[1].pk, self.entrepreneurs[3].pk], "changes": {"supplier": self.other_chain.pk}}
+        )
+        self.client.delete(self.url, {"ids": [self.entrepreneurs[2].pk]}, format="json")
+        current = rollups()
+        rebuild_debt_rollups()
+        self.assertEqual(current, rollups())
+        self.assertEqual(current[self.other_chain.pk], Decimal("4.00"))
+
+    @override_settings(ROOT_URLCONF="electronics_network.tests")
+    def test_async_urls(self):
+        # С ASYNC_READ_VIEWS адрес bulk не должен совпасть с карточкой <pk>.
+        response = self.patch({"ids": [self.chain.pk], "changes": {"city": "Kazan"}})
+        self.assertEqual(response.data["updated"], 1)
+
+
+class SupplierTreeActionsTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpass", is_active=True)
+        self.client.force_authenticate(user=self.user)
+        self.factory = Supplier.objects.create(
+            name="Factory",
+            email="factory@example.com",
+            country="RU",
+            city="City",
+            street="Street",
+            house_number="1",
+            supplier_type="factory",
+        )
+        self.retail = Supplier.objects.create(
+            name="Retail",
+            email="retail@example.com",
+            country="RU",
+            city="City",
+            street="Street",
+            house_number="2",
+            supplier_type="retail",
+            supplier=self.factory,
+        )
+        self.entrepreneur = Supplier.objects.create(
+            name="Entrepreneur",
+            email="entrepreneur@example.com",
+            country="KZ",
+            city="City",
+            street="Street",
+            house_number="3",
+            supplier_type="entrepreneur",
+            supplier=self.retail,
+        )
+
+    def test_descendants(self):
+        url = reverse("supplier-descendants", kwargs={"pk": self.factory.pk})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row["id"], row["depth"]) for row in response.data["results"]],
+            [(self.retail.pk, 1), (self.entrepreneur.pk, 2)],
+        )
+
+    def test_descendants_max_depth_and_filters(self):
+        url = reverse("supplier-descendants", kwargs={"pk": self.factory.pk})
+        response = self.client.get(url, {"max_depth": 1})
+        self.assertEqual([row["id"] for row in response.data["results"]], [self.retail.pk])
+        response = self.client.get(url, {"country": "KZ"})
+        self.assertEqual([row["id"] for row in response.data["results"]], [self.entrepreneur.pk])
+        response = self.client.get(url, {"supplier_type": "retail"})
+        self.assertEqual([row["id"] for row in response.data["results"]], [self.retail.pk])
+
+    def test_descendants_invalid_max_depth(self):
+        url = reverse("supplier-descendants", kwargs={"pk": self.factory.pk})
+        response = self.client.get(url, {"max_depth": "abc"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_ancestors(self):
+        url = reverse("supplier-ancestors", kwargs={"pk": self.entrepreneur.pk})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row["id"], row["depth"]) for row in response.data],
+            [(self.retail.pk, 1), (self.factory.pk, 2)],
+        )
+        response = self.client.get(url, {"max_depth": 1})
+        self.assertEqual([row["id"] for row in response.data], [self.retail.pk])
+
+    def test_missing_supplier(self):
+        response = self.client.get(reverse("supplier-ancestors", kwargs={"pk": 0}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class SupplierListQueryBudgetTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="testpass", is_active=True)
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("supplier-list")
+        self.factory = self.create_supplier()
+
+    def create_supplier(self, parent=None):
+        supplier = Supplier.objects.create(
+            name="Supplier",
+            email="supplier@example.com",
+            country="Country",
+            city="City",
+            street="Street",
+            house_number="1",
+            supplier_type="factory" if parent is None else "retail",
+            supplier=parent,
+        )
+        for number in range(3):
+            Product.objects.create(
+                name=f"Product {number}", model="Model", release_date=date.today(), supplier=supplier
+            )
+        return supplier
+
+    def test_list_query_count_is_constant(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {"expand": "products"})
+        self.assertEqual(len(response.data["results"]), 1)
+
+        parent = self.factory
+        for _ in range(5):
+            parent = self.create_supplier(parent)
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {"expand": "products"})
+        self.assertEqual(len(response.data["results"]), 6)
+        self.assertEqual(len(response.data["results"][-1]["products"]), 3)
+
+
+# Потолки SQL-запросов для каждого маршрута API (electronics_network/urls.py, users/urls.py)
+# и для списка и формы каждой модели админки. Проверяются на сети двух размеров: число
+# запросов не должно ни превышать потолок, ни расти вместе с числом строк (N+1). Числа
+# учитывают SAVEPOINT/RELEASE транзакций представлений внутри TestCase и запрос пользователя
+# при JWTAuthentication (AUTH_QUERIES; с JWT_STATELESS_AUTH его нет).
+API_QUERY_BUDGETS = {
+    ("api-root", "get"): AUTH_QUERIES,
+    ("supplier-list", "get"): 2 + AUTH_QUERIES,
+    ("supplier-list", "post"): 8 + AUTH_QUERIES,
+    ("supplier-detail", "get"): 2 + AUTH_QUERIES,
+    ("supplier-detail", "put"): 17 + AUTH_QUERIES,
+    ("supplier-detail", "patch"): 13 + AUTH_QUERIES,
+    ("supplier-detail", "delete"): 8 + AUTH_QUERIES,
+    ("supplier-descendants", "get"): 2 + AUTH_QUERIES,
+    ("supplier-ancestors", "get"): 2 + AUTH_QUERIES,
+    ("supplier-search", "get"): 2 + AUTH_QUERIES,
+    ("supplier-debt", "get"): 1 + AUTH_QUERIES,
+    ("supplier-subtree-debt", "get"): 2 + AUTH_QUERIES,
+    ("supplier-export", "get"): 2 + AUTH_QUERIES,
+    ("supplier-import-network", "post"): 6 + AUTH_QUERIES,
+    ("supplier-bulk", "patch"): 11 + AUTH_QUERIES,
+    ("supplier-bulk", "delete"): 9 + AUTH_QUERIES,
+    ("token_obtain_pair", "post"): 1,
+    ("token_refresh", "post"): 1,
+}
+# Модель админки -> (список, форма изменения).
+ADMIN_QUERY_BUDGETS = {
+    "electronics_network.supplier": (4, 8),
+    "electronics_network.product": (5, 6),
+    "electronics_network.debtclearingjob": (5, 6),
+    "users.customuser": (5, 9),
+    "auth.group": (5, 7),
+}
+
+
+def route_methods(patterns):
+    """{(имя маршрута, метод)} для списка маршрутов, без HEAD и OPTIONS."""
+    routes = set()
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            routes |= route_methods(pattern.url_patterns)
+            continue
+        callback = pattern.callback
+        actions = getattr(callback, "actions", None)
+        if actions is None:
+            view_class = callback.view_class
+            actions = [method for method in view_class.http_method_names if hasattr(view_class, method)]
+        routes |= {(pattern.name, method) for method in actions if method not in ("head", "options")}
+    return routes
+
+
+@override_settings(SUPPLIER_CACHE_TIMEOUT=0)
+class QueryBudgetTest(APITestCase):
+    SIZES = {
+        "small": (NetworkSpec(factories=1, depth=2, fan_out=2, products=1), 2),
+        "large": (NetworkSpec(factories=2, depth=3, fan_out=3, products=2), 12),
+    }
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_superuser("budget", "budget@example.com", "testpass")
+        self.admin_client = Client()
+        self.admin_client.force_login(self.user)
+
+    def seed(self, spec, count):
+        """Сеть из генератора и по count заданий очистки, пользователей и групп."""
+        clear_network()
+        NetworkGenerator(spec).run()
+        for number in range(count):
+            user = User.objects.create_user(f"user{spec.supplier_count}_{number}", is_active=True)
+            user.groups.add(Group.objects.create(name=f"group{spec.supplier_count}_{number}"))
+            DebtClearingJob.objects.create(supplier_ids=[1], total=1, created_by=user)
+
+    def count_queries(self, client, method, url, data=None, **extra):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(client, method)(url, data, **extra)
+            if response.streaming:
+                b"".join(response.streaming_content)
+        self.assertLess(response.status_code, 400, f"{method.upper()} {url}: {response.status_code}")
+        return len(queries), response
+
+    def supplier_data(self, parent, **extra):
+        return {
+            "name": "Budget",
+            "email": "budget@example.com",
+            "country": "RU",
+            "city": "City",
+            "street": "Street",
+            "house_number": "1",
+            "supplier_type": "retail",
+            "supplier": parent.pk,
+            **extra,
+        }
+
+    def api_counts(self):
+        factory = Supplier.objects.filter(level=0).order_by("pk").first()
+        deepest = Supplier.objects.order_by("-level", "pk").first()
+        tokens = self.client.post(reverse("token_obtain_pair"), {"username": "budget", "password": "testpass"}).data
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        requests = [
+            ("api-root", "get", reverse("api-root"), None),
+            ("supplier-list", "get", reverse("supplier-list"), {"expand": "products"}),
+            ("supplier-detail", "get", reverse("supplier-detail", args=[deepest.pk]), None),
+            ("supplier-descendants", "get", reverse("supplier-descendants", args=[factory.pk]), None),
+            ("supplier-ancestors", "get", reverse("supplier-ancestors", args=[deepest.pk]), None),
+            ("supplier-search", "get", reverse("supplier-search"), {"q": "Сеть"}),
+            ("supplier-debt", "get", reverse("supplier-debt"), {"group_by": "factory"}),
+            ("supplier-subtree-debt", "get", reverse("supplier-subtree-debt", args=[factory.pk]), None),
+            ("supplier-export", "get", reverse("supplier-export"), None),
+        ]
+        counts = {}
+        for name, method, url, data in requests:
+            # Прогрев: разовые запросы (версия авторизации, ContentType) не должны попасть в подсчёт.
+            self.client.get(url, data)
+            counts[name, method], response = self.count_queries(self.client, method, url, data)
+            if name == "supplier-search":
+                self.assertTrue(response.data["suppliers"], "поисковый запрос бюджета ничего не находит")
+
+        counts["supplier-list", "post"], response = self.count_queries(
+            self.client, "post", reverse("supplier-list"), self.supplier_data(factory), format="json"
+        )
+        detail = reverse("supplier-detail", args=[response.data["id"]])
+        counts["supplier-detail", "put"], _ = self.count_queries(
+            self.client, "put", detail, self.supplier_data(deepest, name="Moved"), format="json"
+        )
+        counts["supplier-detail", "patch"], _ = self.count_queries(
+            self.client, "patch", detail, {"name": "Renamed"}, format="json"
+        )
+        counts["supplier-detail", "delete"], _ = self.count_queries(self.client, "delete", detail)
+        # Массовые действия над всеми листьями: их число растёт с сетью, запросов — нет.
+        leaves = list(Supplier.objects.filter(level=deepest.level).values_list("id", flat=True))
+        counts["supplier-bulk", "patch"], _ = self.count_queries(
+            self.client,
+            "patch",
+            reverse("supplier-bulk"),
+            {"ids": leaves, "changes": {"supplier": factory.pk}},
+            format="json",
+        )
+        counts["supplier-bulk", "delete"], _ = self.count_queries(
+            self.client, "delete", reverse("supplier-bulk"), {"ids": leaves}, format="json"
+        )
+        rows = {
+            "suppliers": [
+                {**self.supplier_data(factory), "key": "shop", "supplier": None, "supplier_id": factory.pk},
+                {**self.supplier_data(factory), "key": "ip", "supplier": "shop", "supplier_type": "entrepreneur"},
+            ],
+            "products": [{"name": "TV", "model": "X1", "release_date": "2024-01-01", "supplier": "ip"}],
+        }
+        counts["supplier-import-network", "post"], _ = self.count_queries(
+            self.client, "post", reverse("supplier-import-network"), rows, format="json"
+        )
+
+        self.client.credentials()
+        counts["token_obtain_pair", "post"], _ = self.count_queries(
+            self.client, "post", reverse("token_obtain_pair"), {"username": "budget", "password": "testpass"}
+        )
+        self.client.post(reverse("token_refresh"), {"refresh": tokens["refresh"]})
+        counts["token_refresh", "post"], _ = self.count_queries(
+            self.client, "post", reverse("token_refresh"), {"refresh": tokens["refresh"]}
+        )
+        return counts
+
+    def admin_counts(self):
+        counts = {}
+        objects = {
+            "electronics_network.supplier": Supplier.objects.order_by("-level", "pk").first(),
+            "electronics_network.product": Product.objects.order_by("pk").last(),
+            "electronics_network.debtclearingjob": DebtClearingJob.objects.order_by("pk").last(),
+            "users.customuser": self.user,
+            "auth.group": Group.objects.order_by("pk").last(),
+        }
+        for model in admin.site._registry:
+            label = model._meta.label_lower
+            info = (model._meta.app_label, model._meta.model_name)
+            urls = (
+                reverse("admin:%s_%s_changelist" % info),
+                reverse("admin:%s_%s_change" % info, args=[objects[label].pk]),
+            )
+            for view, url in zip(("changelist", "change"), urls):
+                self.admin_client.get(url)
+                counts[label, view], _ = self.count_queries(self.admin_client, "get", url)
+        return counts
+
+    def test_every_route_has_a_budget(self):
+        routes = route_methods(get_resolver("electronics_network.urls").url_patterns)
+        routes |= route_methods(get_resolver("users.urls").url_patterns)
+        self.assertEqual(routes, set(API_QUERY_BUDGETS))
+        self.assertEqual({model._meta.label_lower for model in admin.site._registry}, set(ADMIN_QUERY_BUDGETS))
+
+    def test_query_budgets(self):
+        measured = {}
+        for size, (spec, count) in self.SIZES.items():
+            self.seed(spec, count)
+            measured[size] = {**self.api_counts(), **self.admin_counts()}
+        budgets = dict(API_QUERY_BUDGETS)
+        for label, (changelist, change) in ADMIN_QUERY_BUDGETS.items():
+            budgets[label, "changelist"], budgets[label, "change"] = changelist, change
+        for route, budget in budgets.items():
+            with self.subTest(route=route):
+                self.assertEqual(measured["large"][route], measured["small"][route], "число запросов растёт с данными")
+                self.assertLessEqual(measured["large"][route], budget)
+
+
+class SupplierPaginationTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpass", is_active=True)
+        self.client.force_authenticate(user=self.user)
+        self.suppliers = [
+            Supplier.objects.create(
+                name=f"Supplier {number}",
+                email="supplier@example.com",
+                country="Country",
+                city="City",
+                street="Street",
+                house_number=str(number),
+                supplier_type="factory",
+            )
+            for number in range(5)
+        ]
+        self.url = reverse("supplier-list")
+
+    def test_cursor_walks_whole_table(self):
+        ids = []
+        response = self.client.get(self.url, {"page_size": 2})
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data["results"]), 2)
+            ids.extend(row["id"] for row in response.data["results"])
+            if response.data["next"] is None:
+                break
+            response = self.client.get(response.data["next"])
+        self.assertEqual(ids, [supplier.pk for supplier in self.suppliers])
+
+    def walk(self, response, link):
+        ids = []
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(row["id"] for row in response.data["results"])
+            if response.data[link] is None:
+                return ids, response
+            response = self.client.get(response.data[link])
+
+    def test_cursor_walks_rows_with_equal_created_at(self):
+        # Больше offset_cutoff строк с одним created_at: позиция курсора — (created_at, id).
+        cutoff = CreatedAtCursorPagination.offset_cutoff
+        Supplier.objects.bulk_create(
+            Supplier(name=f"Bulk {number}", supplier_type="factory", house_number="1") for number in range(cutoff + 1)
+        )
+        Supplier.objects.update(created_at=timezone.now())
+        expected = list(Supplier.objects.order_by("id").values_list("id", flat=True))
+        ids, last = self.walk(self.client.get(self.url, {"page_size": 300}), "next")
+        self.assertEqual(ids, expected)
+        ids, _ = self.walk(self.client.get(last.data["previous"]), "previous")
+        self.assertEqual(sorted(ids), expected[: -len(last.data["results"])])
+
+    def test_cursor_page_uses_index_search(self):
+        # Страница по курсору начинается с поиска по индексу (created_at, id), а не с чтения индекса сначала.
+        def cursor(link):
+            return parse_qs(urlsplit(link).query)["cursor"][0]
+
+        second = self.client.get(self.url, {"page_size": 2}).data["next"]
+        cursors = {"next": cursor(second), "previous": cursor(self.client.get(second).data["previous"])}
+        for name, value in cursors.items():
+            request = Request(APIRequestFactory().get(self.url, {"cursor": value, "page_size": 2}))
+            plan = CreatedAtCursorPagination().page_queryset(Supplier.objects.all(), request).explain()
+            with self.subTest(name):
+                if connection.vendor == "postgresql":
+                    self.assertIn("Index Cond", plan)
+                else:
+                    self.assertIn("SEARCH electronics_network_supplier USING INDEX supplier_created_at_id_idx", plan)
+                    # Ни полного чтения, ни объединения поисков по OR с сортировкой результата.
+                    for step in ("SCAN", "MULTI-INDEX OR", "TEMP B-TREE"):
+                        self.assertNotIn(step, plan)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {"cursor": "cD0yMDI0"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_size_is_capped(self):
+        with patch.object(CreatedAtCursorPagination, "max_page_size", 3):
+            response = self.client.get(self.url, {"page_size": 100})
+        self.assertEqual(len(response.data["results"]), 3)
+
+
+class SupplierExportTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpass", is_active=True)
+        self.client.force_authenticate(user=self.user)
+        self.factory = Supplier.objects.create(
+            name="Factory",
+            email="factory@example.com",
+            country="RU",
+            city="City",
+            street="Street",
+            house_number="1",
+            supplier_type="factory",
+        )
+        self.retail = Supplier.objects.create(
+            name="Retail",
+            email="retail@example.com",
+            country="KZ",
+            city="City",
+            street="Street",
+            house_number="2",
+            supplier_type="retail",
+            supplier=self.factory,
+        )
+        for number in range(2):
+            Product.objects.create(
+                name=f"Product {number}", model="Model", release_date=date(2024, 1, 1), supplier=self.factory
+            )
+        self.url = reverse("supplier-export")
+
+    def test_export_ndjson(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row["id"] for row in rows], [self.factory.pk, self.retail.pk])
+        self.assertEqual(rows[1]["level"], 1)
+        self.assertEqual(rows[1]["supplier_id"], self.factory.pk)
+        self.assertEqual([product["name"] for product in rows[0]["products"]], ["Product 0", "Product 1"])
+        self.assertEqual(rows[1]["products"], [])
+
+    def test_export_csv_with_filter(self):
+        response = self.client.get(self.url, {"export_format": "csv", "country": "RU"})
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = list(csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode())))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual({row["product_name"] for row in rows}, {"Product 0", "Product 1"})
+        self.assertEqual({row["id"] for row in rows}, {str(self.factory.pk)})
+
+    def test_export_invalid_format(self):
+        response = self.client.get(self.url, {"export_format": "xml"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_command(self):
+        out = io.StringIO()
+        call_command("export_suppliers", "--format", "csv", "--chunk-size", "1", stdout=out)
+        rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[-1]["product_id"], "")
+        self.assertEqual(rows[-1]["level"], "1")
+
+    def test_export_command_country_filter(self):
+        # Те же правила, что у фильтра country в API: без учёта регистра, несколько через запятую.
+        both = {str(self.factory.pk), str(self.retail.pk)}
+        for countries, expected in (("kz", {str(self.retail.pk)}), ("ru,Kz", both)):
+            with self.subTest(countries=countries):
+                out = io.StringIO()
+                call_command("export_suppliers", "--format", "csv", "--country", countries, stdout=out)
+                rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+                self.assertEqual({row["id"] for row in rows}, expected)
+
+
+class NetworkImportTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpass", is_active=True)
+        self.client.force_authenticate(user=self.user)
+        self.existing = Supplier.objects.create(
+            name="Existing Factory",
+            email="existing@example.com",
+            country="RU",
+            city="City",
+            street="Street",
+            house_number="1",
+            supplier_type="factory",
+        )
+        self.url = reverse("supplier-import-network")
+
+    def supplier_row(self, key, supplier_type="retail", **extra):
+        row = {
+            "key": key,
+            "name": f"Supplier {key}",
+            "email": f"{key}@example.com",
+            "country": "RU",
+            "city": "City",
+            "street": "Street",
+            "house_number": "1",
+            "supplier_type": supplier_type,
+        }
+        row.update(extra)
+        return row
+
+    def test_import_with_external_keys(self):
+        data = {
+            "suppliers": [
+                self.supplier_row("ip", "entrepreneur", supplier="shop"),
+                self.supplier_row("shop", supplier="plant"),
+                self.supplier_row("plant", "factory"),
+                self.supplier_row("branch", supplier_id=self.existing.pk),
+            ],
+            "products": [
+                {"name": "TV", "model": "X1", "release_date": "2024-01-01", "supplier": "plant"},
+                {"name": "Radio", "model": "R2", "release_date": "2024-02-01", "supplier_id": self.existing.pk},
+            ],
+        }
+        response = self.client.post(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["errors"], [])
+        self.assertEqual(response.data["suppliers_created"], 4)
+        self.assertEqual(response.data["products_created"], 2)
+
+        plant = Supplier.objects.get(name="Supplier plant")
+        shop = Supplier.objects.get(name="Supplier shop")
+        ip = Supplier.objects.get(name="Supplier ip")
+        branch = Supplier.objects.get(name="Supplier branch")
+        self.assertEqual(ip.supplier, shop)
+        self.assertEqual(ip.path, f"{plant.pk}/{shop.pk}/")
+        self.assertEqual(ip.level, 2)
+        self.assertEqual(branch.path, f"{self.existing.pk}/")
+        self.assertEqual(plant.products.get().name, "TV")
+
+    def test_row_errors_do_not_abort_import(self):
+        data = {
+            "suppliers": [
+                self.supplier_row("plant", "factory", supplier="shop"),
+                self.supplier_row("shop", email="not-an-email"),
+                self.supplier_row("a", supplier="b"),
+                self.supplier_row("b", supplier="a"),
+                self.supplier_row("ok"),
+            ],
+            "products": [{"name": "TV", "model": "X1", "release_date": "2024-01-01", "supplier": "shop"}],
+        }
+        response = self.client.post(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["suppliers_created"], 1)
+        self.assertEqual(response.data["products_created"], 0)
+        failed = {(error["section"], error["row"]) for error in response.data["errors"]}
+        self.assertEqual(
+            failed, {("suppliers", 1), ("suppliers", 2), ("suppliers", 3), ("suppliers", 4), ("products", 1)}
+        )
+        self.assertTrue(Supplier.objects.filter(name="Supplier ok").exists())
+
+    def test_deep_chain_in_child_first_order(self):
+        # Цепочка из 1500 звеньев от нижнего к заводу: ошибки глубины по строкам, а не RecursionError.
+        depth = 1500
+        rows = [self.supplier_row(f"s{level}", supplier=f"s{level - 1}") for level in range(depth - 1, 0, -1)]
+        rows.append(self.supplier_row("s0", "factory"))
+        with override_settings(SUPPLIER_MAX_DEPTH=3):
+            result = NetworkImport(rows, [], allow_debt=False).run()
+        self.assertEqual(result["suppliers_created"], 4)
+        self.assertEqual(len(result["errors"]), depth - 4)
+        self.assertTrue(all("глубина" in error["errors"][0] for error in result["errors"]))
+        self.assertEqual(Supplier.objects.get(name="Supplier s3").level, 3)
+
+    def test_long_cycle_is_reported_per_row(self):
+        rows = [self.supplier_row(f"c{number}", supplier=f"c{(number + 1) % 5}") for number in range(5)]
+        result = NetworkImport(rows, []).run()
+        self.assertEqual(result["suppliers_created"], 0)
+        self.assertEqual(sorted(error["row"] for error in result["errors"]), [1, 2, 3, 4, 5])
+        self.assertIn("Цепочка поставщиков образует цикл.", [error["errors"][0] for error in result["errors"]])
+
+    def test_strict_import_writes_nothing(self):
+        data = {
+            "suppliers": [self.supplier_row("ok"), self.supplier_row("bad", "factory", supplier="ok")],
+            "strict": True,
+        }
+        response = self.client.post(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Supplier.objects.count(), 1)
+
+    def test_debt_is_ignored_in_api_import(self):
+        data = {"suppliers": [self.supplier_row("shop", supplier_id=self.existing.pk, debt="10.00")]}
+        self.client.post(self.url, data, format="json")
+        self.assertEqual(Supplier.objects.get(name="Supplier shop").debt, 0)
+
+    def test_import_csv_files(self):
+        suppliers = io.StringIO()
+        writer = csv.DictWriter(suppliers, fieldnames=list(self.supplier_row("x", supplier="")))
+        writer.writeheader()
+        writer.writerow(self.supplier_row("plant", "factory", supplier=""))
+        writer.writerow(self.supplier_row("shop", supplier="plant"))
+        suppliers_file = SimpleUploadedFile("suppliers.csv", suppliers.getvalue().encode())
+        products_file = SimpleUploadedFile(
+            "products.json",
+            json.dumps([{"name": "TV", "model": "X1", "release_date": "2024-01-01", "supplier": "shop"}]).encode(),
+        )
+        response = self.client.post(self.url, {"suppliers": suppliers_file, "products": products_file})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["suppliers_created"], 2)
+        self.assertEqual(response.data["products_created"], 1)
+
+    def test_import_command(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as file:
+            json.dump([self.supplier_row("shop", supplier_id=self.existing.pk, debt="10.00")], file)
+        self.addCleanup(os.remove, file.name)
+        out = io.StringIO()
+        call_command("import_network", "--suppliers", file.name, stdout=out, stderr=io.StringIO())
+        self.assertIn("Создано поставщиков: 1", out.getvalue())
+        self.assertEqual(Supplier.objects.get(name="Supplier shop").debt, 10)
+
+
+class SupplierResponseCacheTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="testpass", is_active=True)
+        self.client.force_authenticate(user=self.user)
+        self.factory = Supplier.objects.create(
+            name="Factory",
+            email="factory@example.com",
+            country="RU",
             city="City",
             street="Street",
-            house_number="123",
+            house_number="1",
             supplier_type="factory",
         )
         self.retail = Supplier.objects.create(
             name="Retail",
             email="retail@example.com",
-            country="Country",
+            country="KZ",
             city="City",
             street="Street",
-            house_number="456",
+            house_number="2",
+            supplier_type="retail",
+            supplier=self.factory,
+        )
+        self.list_url = reverse("supplier-list")
+        self.detail_url = reverse("supplier-detail", kwargs={"pk": self.retail.pk})
+
+    def test_repeated_reads_skip_database(self):
+        first = self.client.get(self.list_url)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.list_url)
+        self.assertEqual(first.data, second.data)
+
+        self.client.get(self.detail_url)
+        with self.assertNumQueries(0):
+            self.client.get(self.detail_url)
+
+    def test_query_params_are_part_of_key(self):
+        self.assertEqual(len(self.client.get(self.list_url, {"country": "RU"}).data["results"]), 1)
+        self.assertEqual(len(self.client.get(self.list_url, {"country": "KZ"}).data["results"]), 1)
+        self.assertEqual(len(self.client.get(self.list_url).data["results"]), 2)
+
+    def test_supplier_change_invalidates(self):
+        self.client.get(self.list_url)
+        self.client.get(self.detail_url)
+        self.retail.name = "Renamed"
+        self.retail.save()
+        self.assertEqual(self.client.get(self.list_url).data["results"][1]["name"], "Renamed")
+        self.assertEqual(self.client.get(self.detail_url).data["name"], "Renamed")
+
+    def test_product_change_invalidates_supplier_and_ancestors(self):
+        descendants_url = reverse("supplier-descendants", kwargs={"pk": self.factory.pk})
+        expand = {"expand": "products"}
+        self.client.get(self.detail_url, expand)
+        self.client.get(descendants_url, expand)
+        product = Product.objects.create(name="TV", model="X1", release_date=date.today(), supplier=self.retail)
+        self.assertEqual(len(self.client.get(self.detail_url, expand).data["products"]), 1)
+        self.assertEqual(len(self.client.get(descendants_url, expand).data["results"][0]["products"]), 1)
+
+        product.delete()
+        self.assertEqual(self.client.get(self.detail_url, expand).data["products"], [])
+
+    def test_ancestor_change_invalidates_descendants(self):
+        ancestors_url = reverse("supplier-ancestors", kwargs={"pk": self.retail.pk})
+        self.client.get(ancestors_url)
+        self.factory.name = "Renamed Factory"
+        self.factory.save()
+        self.assertEqual(self.client.get(ancestors_url).data[0]["name"], "Renamed Factory")
+
+    def test_reparent_invalidates_previous_ancestors(self):
+        descendants_url = reverse("supplier-descendants", kwargs={"pk": self.factory.pk})
+        self.assertEqual(len(self.client.get(descendants_url).data["results"]), 1)
+        self.retail.supplier = None
+        self.retail.save()
+        self.assertEqual(self.client.get(descendants_url).data["results"], [])
+
+    def test_supplier_delete_invalidates_clients(self):
+        shop = Supplier.objects.create(
+            name="Shop",
+            email="shop@example.com",
+            country="KZ",
+            city="City",
+            street="Street",
+            house_number="3",
+            supplier_type="entrepreneur",
+            supplier=self.retail,
+        )
+        shop_url = reverse("supplier-detail", kwargs={"pk": shop.pk})
+        ancestors_url = reverse("supplier-ancestors", kwargs={"pk": shop.pk})
+        self.assertEqual(self.client.get(self.detail_url).data["supplier"], self.factory.pk)
+        self.assertEqual(len(self.client.get(ancestors_url).data), 2)
+        self.factory.delete()
+        self.assertIsNone(self.client.get(self.detail_url).data["supplier"])
+        self.assertEqual([row["id"] for row in self.client.get(ancestors_url).data], [self.retail.pk])
+        self.assertEqual(self.client.get(shop_url).data["supplier"], self.retail.pk)
+
+    def test_padded_pk_shares_version(self):
+        # "/01/" и "/1/" — одно звено: изменение сбрасывает кэш по обоим адресам.
+        detail_url = reverse("supplier-detail", kwargs={"pk": f"0{self.retail.pk}"})
+        descendants_url = reverse("supplier-descendants", kwargs={"pk": f"0{self.factory.pk}"})
+        debt_url = reverse("supplier-subtree-debt", kwargs={"pk": f"0{self.factory.pk}"})
+        self.assertEqual(self.client.get(detail_url).data["name"], "Retail")
+        self.assertEqual(self.client.get(descendants_url).data["results"][0]["name"], "Retail")
+        self.assertEqual(self.client.get(debt_url).data["total_debt"], "0.00")
+        self.retail.name = "Renamed"
+        self.retail.debt = 7
+        self.retail.save()
+        self.assertEqual(self.client.get(detail_url).data["name"], "Renamed")
+        self.assertEqual(self.client.get(descendants_url).data["results"][0]["name"], "Renamed")
+        self.assertEqual(self.client.get(debt_url).data["total_debt"], "7.00")
+        self.assertEqual(self.client.get(reverse("supplier-detail", kwargs={"pk": "x1"})).status_code, 404)
+
+    def test_clear_debt_invalidates(self):
+        self.retail.debt = 5
+        self.retail.save()
+        self.assertEqual(self.client.get(self.detail_url).data["debt"], "5.00")
+        SupplierAdmin(Supplier, AdminSite()).clear_debt(None, Supplier.objects.all())
+        self.assertEqual(self.client.get(self.detail_url).data["debt"], "0.00")
+
+
+class SupplierConditionalGetTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="testpass", is_active=True)
+        self.client.force_authenticate(user=self.user)
+        self.supplier = Supplier.objects.create(
+            name="Factory",
+            email="factory@example.com",
+            country="RU",
+            city="City",
+            street="Street",
+            house_number="1",
+            supplier_type="factory",
+        )
+        self.list_url = reverse("supplier-list")
+        self.detail_url = reverse("supplier-detail", kwargs={"pk": self.supplier.pk})
+
+    def test_detail_not_modified_without_serializing(self):
+        response = self.client.get(self.detail_url)
+        self.assertIn("Last-Modified", response)
+        etag = response["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        cache.clear()
+        with patch.object(SupplierSerializer, "to_representation") as to_representation:
+            with self.assertNumQueries(1):
+                response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        to_representation.assert_not_called()
+
+    def test_product_change_bumps_supplier(self):
+        response = self.client.get(self.detail_url)
+        updated_at = Supplier.objects.get(pk=self.supplier.pk).updated_at
+        Product.objects.create(name="TV", model="X1", release_date=date.today(), supplier=self.supplier)
+        self.assertGreater(Supplier.objects.get(pk=self.supplier.pk).updated_at, updated_at)
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_list_not_modified_without_aggregate(self):
+        # ETag списка строится по версиям кэша: ни COUNT/MAX по выборке, ни запроса страницы.
+        response = self.client.get(self.list_url, {"page_size": 1})
+        self.assertNotIn("Last-Modified", response)
+        with patch.object(SupplierViewSet, "cached_response", lambda self, request, keys, build: build()):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(self.list_url, {"page_size": 1}, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(queries.captured_queries, [])
+
+    def test_list_page_does_not_aggregate(self):
+        with patch.object(SupplierViewSet, "cached_response", lambda self, request, keys, build: build()):
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(self.list_url, {"page_size": 1})
+        self.assertFalse([query["sql"] for query in queries.captured_queries if "MAX(" in query["sql"].upper()])
+
+    def test_list_etag_changes_on_update(self):
+        etag = self.client.get(self.list_url)["ETag"]
+        self.supplier.name = "Renamed"
+        self.supplier.save()
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_list_etag_changes_on_delete(self):
+        Supplier.objects.create(
+            name="Other",
+            email="other@example.com",
+            country="RU",
+            city="City",
+            street="Street",
+            house_number="2",
+            supplier_type="factory",
+        )
+        etag = self.client.get(self.list_url)["ETag"]
+        Supplier.objects.filter(name="Other").delete()
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 1)
+
+
+class SupplierSparseFieldsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="testpass", is_active=True)
+        self.client.force_authenticate(user=self.user)
+        self.supplier = Supplier.objects.create(
+            name="Factory",
+            email="factory@example.com",
+            country="RU",
+            city="City",
+            street="Street",
+            house_number="1",
+            supplier_type="factory",
+        )
+        Product.objects.create(name="TV", model="X1", release_date=date.today(), supplier=self.supplier)
+        self.list_url = reverse("supplier-list")
+        self.detail_url = reverse("supplier-detail", kwargs={"pk": self.supplier.pk})
+
+    def test_products_are_opt_in(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.list_url)
+        self.assertNotIn("products", response.data["results"][0])
+        response = self.client.get(self.detail_url, {"expand": "products"})
+        self.assertEqual([product["name"] for product in response.data["products"]], ["TV"])
+
+    def test_selected_fields_only(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.list_url, {"fields": "id,name,debt"})
+        self.assertEqual(list(response.data["results"][0]), ["id", "name", "debt"])
+        self.assertNotIn('"email"', queries[-1]["sql"])
+
+        response = self.client.get(self.detail_url, {"fields": "id,products"})
+        self.assertEqual(list(response.data), ["id", "products"])
+
+    def test_unknown_fields_rejected(self):
+        response = self.client.get(self.list_url, {"fields": "id,password"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.list_url, {"expand": "clients"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_tree_actions_support_fields(self):
+        retail = Supplier.objects.create(
+            name="Retail",
+            email="retail@example.com",
+            country="RU",
+            city="City",
+            street="Street",
+            house_number="2",
+            supplier_type="retail",
+            supplier=self.supplier,
+        )
+        url = reverse("supplier-descendants", kwargs={"pk": self.supplier.pk})
+        response = self.client.get(url, {"fields": "id,depth"})
+        self.assertEqual(response.data["results"], [{"id": retail.pk, "depth": 1}])
+
+    def test_write_returns_full_representation(self):
+        response = self.client.patch(f"{self.detail_url}?fields=id", {"name": "Renamed"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["name"], "Renamed")
+        self.assertEqual(len(response.data["products"]), 1)
+
+
+class SupplierFastReadParityTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpass", is_active=True)
+        self.client.force_authenticate(user=self.user)
+        self.factory = Supplier.objects.create(
+            name="Завод «Электрон»",
+            email="factory@example.com",
+            country="RU",
+            city="Москва",
+            street="Street",
+            house_number="1",
+            supplier_type="factory",
+        )
+        self.retail = Supplier.objects.create(
+            name="Retail",
+            email="retail@example.com",
+            country="KZ",
+            city="City",
+            street="Street",
+            house_number="2",
             supplier_type="retail",
             supplier=self.factory,
+            debt=Decimal("1234.5"),
         )
         self.entrepreneur = Supplier.objects.create(
             name="Entrepreneur",
-            email="entrepreneur@example.com",
-            country="Country",
+            email="ip@example.com",
+            country="KZ",
             city="City",
             street="Street",
-            house_number="789",
+            house_number="3",
             supplier_type="entrepreneur",
             supplier=self.retail,
+            debt=Decimal("0.01"),
         )
+        for supplier in (self.factory, self.retail):
+            for number in range(2):
+                Product.objects.create(
+                    name=f"Product {number}", model="M-1", release_date=date(2024, 1, number + 1), supplier=supplier
+                )
 
-    def test_hierarchy_levels(self):
-        self.assertEqual(self.factory.level, 0)
-        self.assertEqual(self.retail.level, 1)
-        self.assertEqual(self.entrepreneur.level, 2)
+    def get(self, url, params, fast_read):
+        cache.clear()
+        with patch.object(SupplierViewSet, "fast_read", fast_read):
+            return self.client.get(url, params)
+
+    def assert_parity(self, url, params=None):
+        with patch.object(SupplierSerializer, "to_representation", side_effect=AssertionError):
+            fast = self.get(url, params, True)
+        slow = self.get(url, params, False)
+        self.assertEqual(slow.status_code, status.HTTP_200_OK)
+        self.assertEqual(fast.status_code, slow.status_code)
+        self.assertEqual(fast.content, slow.content)
+        return slow
+
+    def test_list_parity(self):
+        list_url = reverse("supplier-list")
+        self.assert_parity(list_url)
+        self.assert_parity(list_url, {"expand": "products"})
+        self.assert_parity(list_url, {"fields": "id,debt,created_at,supplier"})
+        self.assert_parity(list_url, {"fields": "name,products", "country": "KZ"})
+        response = self.assert_parity(list_url, {"page_size": 2, "expand": "products"})
+        self.assert_parity(response.data["next"])
+
+    def test_detail_parity(self):
+        for supplier in (self.factory, self.retail, self.entrepreneur):
+            url = reverse("supplier-detail", kwargs={"pk": supplier.pk})
+            self.assert_parity(url)
+            self.assert_parity(url, {"expand": "products"})
+            self.assert_parity(url, {"fields": "debt"})
+
+    def test_tree_parity(self):
+        self.assert_parity(reverse("supplier-descendants", kwargs={"pk": self.factory.pk}), {"expand": "products"})
+        self.assert_parity(reverse("supplier-ancestors", kwargs={"pk": self.entrepreneur.pk}), {"expand": "products"})
+        self.assert_parity(reverse("supplier-ancestors", kwargs={"pk": self.entrepreneur.pk}), {"fields": "id,depth"})
+
+    def test_missing_supplier(self):
+        response = self.get(reverse("supplier-detail", kwargs={"pk": 0}), None, True)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+# URLconf для AsyncSupplierReadTest: async-маршруты перед обычными, как при ASYNC_READ_VIEWS.
+urlpatterns = [
+    path("api/", include("electronics_network.async_urls")),
+    path("", include("config.urls")),
+]
+
+
+@override_settings(ROOT_URLCONF="electronics_network.tests")
+class AsyncSupplierReadTest(SupplierFastReadParityTest):
+    """Проверки SupplierFastReadParityTest через async-представления и сверка с синхронными ответами."""
+
+    def sync_get(self, url, params=None):
+        cache.clear()
+        with override_settings(ROOT_URLCONF="config.urls"):
+            return self.client.get(url, params)
+
+    def assert_matches_sync(self, url, params=None):
+        cache.clear()
+        response = self.client.get(url, params)
+        self.assertIs(response.resolver_match.func.view_class, AsyncSupplierView)
+        expected = self.sync_get(url, params)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.content, expected.content)
+        return response
+
+    def test_reads_match_sync_views(self):
+        list_url = reverse("supplier-list")
+        self.assert_matches_sync(list_url, {"country": "KZ", "expand": "products"})
+        response = self.assert_matches_sync(list_url, {"page_size": 1})
+        response = self.assert_matches_sync(response.json()["next"])
+        self.assert_matches_sync(response.json()["previous"])
+        self.assert_matches_sync(reverse("supplier-detail", kwargs={"pk": self.retail.pk}), {"fields": "id,debt"})
+        descendants_url = reverse("supplier-descendants", kwargs={"pk": self.factory.pk})
+        self.assert_matches_sync(descendants_url, {"max_depth": 1, "expand": "products"})
+        self.assert_matches_sync(reverse("supplier-search"), {"q": "retail"})
+        self.assert_matches_sync(reverse("supplier-search"), {"q": "product", "limit": 1})
+
+    def test_errors_match_sync_views(self):
+        # Нечисловой pk async-маршруты не принимают: его обслуживает router с тем же 404.
+        url = reverse("supplier-detail", kwargs={"pk": "abc"})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.content, self.sync_get(url).content)
+        self.assert_matches_sync(reverse("supplier-descendants", kwargs={"pk": 0}))
+        self.assert_matches_sync(reverse("supplier-search"))
+        self.assert_matches_sync(reverse("supplier-list"), {"level": "x"})
+        self.client.force_authenticate(user=None)
+        self.assert_matches_sync(reverse("supplier-list"))
+
+    def test_cached_and_conditional_responses(self):
+        cache.clear()
+        url = reverse("supplier-detail", kwargs={"pk": self.factory.pk})
+        first = self.client.get(url)
+        with self.assertNumQueries(0):
+            cached = self.client.get(url)
+        self.assertEqual(cached.content, first.content)
+        self.assertEqual(cached["ETag"], first["ETag"])
+        cache.clear()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_router_routes_resolve(self):
+        # Каждый маршрут router должен попасть в своё действие, а не в карточку async <pk>.
+        for pattern in router.urls:
+            if not (pattern.name or "").startswith("supplier-") or "format" in pattern.pattern.regex.groupindex:
+                continue
+            kwargs = {"pk": self.factory.pk} if "pk" in pattern.pattern.regex.groupindex else {}
+            with self.subTest(pattern.name):
+                match = resolve(reverse(pattern.name, kwargs=kwargs))
+                self.assertEqual(match.url_name, pattern.name)
+                if getattr(match.func, "view_class", None) is not AsyncSupplierView:
+                    self.assertEqual(match.func.actions, pattern.callback.actions)
+
+        self.assertEqual(self.client.get(reverse("supplier-export")).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(reverse("supplier-debt")).status_code, status.HTTP_200_OK)
+        response = self.client.post(reverse("supplier-import-network"), {"suppliers": []}, format="json")
+        self.assertNotEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_writes_are_delegated_to_viewset(self):
+        response = self.client.post(
+            reverse("supplier-list"),
+            {
+                "name": "New",
+                "email": "new@example.com",
+                "country": "RU",
+                "city": "City",
+                "street": "Street",
+                "house_number": "4",
+                "supplier_type": "retail",
+                "supplier": self.factory.pk,
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        url = reverse("supplier-detail", kwargs={"pk": response.data["id"]})
+        response = self.client.patch(url, {"name": "Renamed"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(url).json()["name"], "Renamed")
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+
+class LoadTestTest(SimpleTestCase):
+    def setUp(self):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                code = 200 if self.headers.get("Authorization") == "Bearer token" else 401
+                self.send_response(code)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"{}")
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/api/suppliers/?page_size=1"
+
+    def test_run_load(self):
+        results = run_load([self.url], [1, 4], 6, {"Authorization": "Bearer token"}, slow_client=0.01)
+        self.assertEqual([result.concurrency for result in results], [1, 4])
+        for result in results:
+            row = result.as_dict()
+            self.assertEqual((row["requests"], row["ok"], row["errors"]), (6, 6, 0))
+            self.assertEqual(row["statuses"], {"200": 6})
+            self.assertGreater(row["rps"], 0)
+            self.assertLessEqual(row["p50_ms"], row["p95_ms"])
+
+    def test_statuses_and_errors(self):
+        result = run_load([self.url], [2], 2, {})[0]
+        self.assertEqual((result.ok, result.statuses), (0, {401: 2}))
+        result = run_load(["http://127.0.0.1:1/"], [1], 1, {}, timeout=1)[0]
+        self.assertEqual((result.errors, result.as_dict()["p50_ms"]), (1, None))
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command("bench_concurrency", self.url, token="token", concurrency="2", requests=2, json=True, stdout=out)
+        self.assertEqual(json.loads(out.getvalue())[0]["ok"], 2)
+        with self.assertRaises(CommandError):
+            call_command("bench_concurrency", self.url, concurrency="0")
+
+
+class NetworkGeneratorTest(TestCase):
+    def generate(self, spec, **kwargs):
+        return NetworkGenerator(spec, batch_size=4, **kwargs).run()
+
+    def test_network_shape(self):
+        spec = NetworkSpec(factories=2, depth=2, fan_out=3, products=2, seed=1)
+        self.assertEqual((spec.supplier_count, spec.product_count), (26, 52))
+        self.assertEqual(self.generate(spec), {"suppliers": 26, "products": 52})
+        self.assertEqual(Supplier.objects.count(), 26)
+        self.assertEqual(Product.objects.count(), 52)
+        self.assertEqual([Supplier.objects.filter(level=level).count() for level in range(3)], [2, 6, 18])
+        for supplier in Supplier.objects.select_related("supplier"):
+            if supplier.supplier is None:
+                self.assertEqual((supplier.supplier_type, supplier.debt, supplier.path), ("factory", 0, ""))
+                continue
+            self.assertNotEqual(supplier.supplier_type, "factory")
+            self.assertEqual(supplier.path, supplier.supplier.subtree_prefix)
+            self.assertEqual(supplier.level, supplier.supplier.level + 1)
+            self.assertEqual(supplier.supplier.clients.count() if supplier.level == 1 else 3, 3)
+        # Последовательность id догнана: обычное создание не конфликтует с заданными id.
+        created = Supplier.objects.create(
+            name="New",
+            email="new@example.com",
+            country="RU",
+            city="Moscow",
+            street="Main",
+            house_number="1",
+            supplier_type="factory",
+        )
+        self.assertGreater(created.pk, Supplier.objects.exclude(pk=created.pk).order_by("-pk").first().pk)
+
+    def test_seed_is_deterministic(self):
+        spec = NetworkSpec(factories=1, depth=2, fan_out=2, products=1, seed=7)
+        fields = ("name", "city", "supplier_type", "debt", "path", "level", "products__model")
+        self.generate(spec)
+        first = list(Supplier.objects.order_by("pk").values_list(*fields))
+        clear_network()
+        self.assertFalse(Supplier.objects.exists())
+        self.assertFalse(Product.objects.exists())
+        self.generate(spec)
+        self.assertEqual(list(Supplier.objects.order_by("pk").values_list(*fields)), first)
+
+    def test_invalid_options(self):
+        with self.assertRaises(ValueError):
+            NetworkGenerator(NetworkSpec(1, 100, 1, 0))
+        with self.assertRaises(ValueError):
+            NetworkGenerator(NetworkSpec(1, 1, 1, 0), method="copy")
+
+    @override_settings(SUPPLIER_DEBT_ROLLUP=True)
+    def test_rollups_rebuilt(self):
+        self.generate(NetworkSpec(factories=1, depth=1, fan_out=2, products=0))
+        factory = Supplier.objects.get(level=0)
+        rollup = SupplierDebtRollup.objects.get(supplier=factory)
+        self.assertEqual(rollup.debt_total, sum(Supplier.objects.values_list("debt", flat=True)))
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command("generate_network", factories=1, depth=1, fan_out=2, products=1, stdout=out)
+        call_command("generate_network", factories=1, depth=1, fan_out=3, products=2, clear=True, stdout=out)
+        self.assertEqual((Supplier.objects.count(), Product.objects.count()), (4, 8))
+        self.assertIn("Создано поставщиков: 4, товаров: 8", out.getvalue())
+        out = io.StringIO()
+        with self.assertRaises(CommandError):
+            call_command("generate_network", fan_out=0, stdout=out)
+        self.assertEqual(out.getvalue(), "")
+        with self.assertRaisesMessage(CommandError, "COPY доступен только на PostgreSQL."):
+            call_command("generate_network", method="copy", stdout=out)
+        self.assertEqual(out.getvalue(), "Поставщиков: 11110, товаров: 33330\n")
+
+    def test_copy_timestamps_are_spread(self):
+        writer = CopyWriter(rows=5)
+        moments = writer.timestamps(Supplier, 3) + writer.timestamps(Supplier, 2)
+        self.assertEqual(len(set(moments)), 5)
+        self.assertEqual(moments, sorted(moments))
+        self.assertLess(moments[-1], timezone.now())
+        self.assertEqual(writer.timestamps(Product, 1), moments[:1])
+
+
+class BenchmarkTest(TransactionTestCase):
+    # Вне TestCase: иначе SAVEPOINT каждого запроса попадают в счётчик SQL.
+    def setUp(self):
+        cache.clear()
+        NetworkGenerator(NetworkSpec(factories=1, depth=2, fan_out=2, products=1)).run()
+
+    def test_report(self):
+        report = run_benchmarks(repeat=2, warmup=1)
+        self.assertEqual(report["meta"]["dataset"], {"suppliers": 7, "products": 7, "max_level": 2})
+        self.assertEqual(report["meta"]["vendor"], connection.vendor)
+        self.assertIn("admin_supplier_change", report["results"])
+        for name, result in report["results"].items():
+            self.assertEqual(result["status"], 200, name)
+            self.assertLessEqual(result["min_ms"], result["median_ms"])
+            self.assertLessEqual(result["median_ms"], result["max_ms"])
+        self.assertEqual(budget_failures(report), [])
+        json.dumps(report)
+
+    def test_budget_failures_and_compare(self):
+        result = {"status": 200, "queries": 3, "max_queries": 2, "median_ms": 12.0}
+        report = {"meta": {}, "results": {"list": result, "detail": {**result, "status": 500}}}
+        self.assertEqual(budget_failures(report), ["list: 3 SQL-запросов при потолке 2", "detail: ответ 500"])
+        old = {"meta": {}, "results": {"list": {**result, "median_ms": 10.0}, "detail": {**result, "queries": 4}}}
+        rows, regressions = compare_reports(old, report, max_slowdown=0.1)
+        self.assertEqual([row["change"] for row in rows], [0.2, 0.0])
+        self.assertEqual(regressions, ["list: медиана 10.0 → 12.0 мс (+20%)"])
+        self.assertEqual(compare_reports(old, report, max_slowdown=0.5)[1], [])
+        self.assertEqual(compare_reports(report, old, max_slowdown=0.5)[1], ["detail: SQL-запросов 3 → 4"])
+
+    def test_command(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        output = os.path.join(directory.name, "report.json")
+        out = io.StringIO()
+        call_command("run_benchmarks", repeat=1, warmup=1, output=output, stdout=out)
+        with open(output, encoding="utf-8") as file:
+            self.assertIn("supplier_list", json.load(file)["results"])
+        call_command("run_benchmarks", repeat=1, warmup=1, compare=output, max_slowdown=1000, stdout=out)
+        self.assertIn("Сравнение с", out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command("run_benchmarks", compare=os.path.join(directory.name, "missing.json"))
+        clear_network()
+        with self.assertRaises(CommandError):
+            call_command("run_benchmarks", repeat=1, stdout=out)
+
+
+@override_settings(REQUEST_TIMING=True, SLOW_QUERY_MS=10_000)
+class RequestTimingTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="testpass", is_active=True)
+        self.client.force_authenticate(user=self.user)
+        factory = Supplier.objects.create(
+            name="Factory",
+            email="factory@example.com",
+            country="RU",
+            city="City",
+            street="Street",
+            house_number="1",
+            supplier_type="factory",
+        )
+        Product.objects.create(name="Product", model="M-1", release_date=date(2024, 1, 1), supplier=factory)
+
+    def server_timing(self, response):
+        metrics = {}
+        for entry in response["Server-Timing"].split(", "):
+            name, *params = entry.split(";")
+            metrics[name] = dict(param.split("=", 1) for param in params)
+        return metrics
+
+    def test_server_timing_header_and_log(self):
+        with self.assertLogs("electronics_network.timing", "INFO") as logs:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse("supplier-list"), {"expand": "products"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        metrics = self.server_timing(response)
+        self.assertEqual(list(metrics), ["db", "auth", "serialize", "render", "total"])
+        self.assertEqual(metrics["db"]["desc"], f'"{len(queries)} queries"')
+        self.assertGreaterEqual(float(metrics["total"]["dur"]), float(metrics["db"]["dur"]))
+
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(record["event"], "request")
+        self.assertEqual((record["path"], record["status"], record["queries"]), ("/api/suppliers/", 200, len(queries)))
+        self.assertEqual(record["total_ms"], float(metrics["total"]["dur"]))
+
+    @override_settings(SLOW_QUERY_MS=0)
+    def test_slow_queries_logged_with_plan(self):
+        with self.assertLogs("electronics_network.timing", "WARNING") as logs:
+            response = self.client.get(reverse("supplier-list"))
+        slow = [json.loads(record.getMessage()) for record in logs.records]
+        self.assertTrue(slow)
+        self.assertEqual({record["event"] for record in slow}, {"slow_query"})
+        selects = [record for record in slow if record["sql"].startswith("SELECT")]
+        self.assertTrue(all(record["plan"] for record in selects))
+        # EXPLAIN выполняется после замеров и в счётчик запросов не попадает.
+        self.assertEqual(self.server_timing(response)["db"]["desc"], f'"{len(slow)} queries"')
+
+    def test_render_is_measured(self):
+        def slow_render(renderer, data, *args, **kwargs):
+            time.sleep(0.02)
+            return b"{}"
+
+        with patch.object(JSONRenderer, "render", autospec=True, side_effect=slow_render):
+            with self.assertLogs("electronics_network.timing", "INFO"):
+                response = self.client.get(reverse("supplier-list"))
+        self.assertGreaterEqual(float(self.server_timing(response)["render"]["dur"]), 20)
+
+    @override_settings(ROOT_URLCONF="electronics_network.tests")
+    def test_async_views_are_measured(self):
+        with self.assertLogs("electronics_network.timing", "INFO"):
+            response = self.client.get(reverse("supplier-list"))
+        self.assertIs(response.resolver_match.func.view_class, AsyncSupplierView)
+        self.assertNotEqual(self.server_timing(response)["db"]["desc"], '"0 queries"')
+
+    @override_settings(REQUEST_TIMING=False)
+    def test_disabled_by_default_setting(self):
+        response = self.client.get(reverse("supplier-list"))
+        self.assertNotIn("Server-Timing", response)
+
+
+class MetricsTest(APITestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(
+            METRICS_ENABLED=True, METRICS_FILE=os.path.join(directory.name, "metrics.sqlite3"), METRICS_TOKEN=""
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="testpass", is_active=True)
+
+    def scrape(self, **headers):
+        response = self.client.get("/metrics", **headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], PROMETHEUS_CONTENT_TYPE)
+        return response.content.decode().splitlines()
+
+    def test_request_metrics(self):
+        self.client.post(reverse("token_obtain_pair"), {"username": "testuser", "password": "wrong"})
+        access = self.client.post(reverse("token_obtain_pair"), {"username": "testuser", "password": "testpass"})
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access.data['access']}")
+        self.client.get(reverse("supplier-list"))
+        self.client.get(reverse("supplier-list"))
+        self.client.get(reverse("supplier-detail", kwargs={"pk": 0}))
+        self.client.get("/no-such-page/")
+
+        lines = self.scrape()
+        for line in (
+            'http_requests_total{method="POST",status="401",view="token_obtain_pair"} 1',
+            'http_requests_total{method="POST",status="200",view="token_obtain_pair"} 1',
+            'http_requests_total{method="GET",status="200",view="supplier-list"} 2',
+            'http_requests_total{method="GET",status="404",view="supplier-detail"} 1',
+            'http_requests_total{method="GET",status="404",view="unmatched"} 1',
+            'http_request_duration_seconds_bucket{method="GET",view="supplier-list",le="+Inf"} 2',
+            'http_request_duration_seconds_count{method="GET",view="supplier-list"} 2',
+            'http_request_db_queries_count{view="supplier-list"} 2',
+        ):
+            self.assertIn(line, lines)
+        self.assertIn("# TYPE http_request_duration_seconds histogram", lines)
+        # Сам /metrics в метрики не попадает.
+        self.assertFalse([line for line in self.scrape() if 'view="metrics"' in line])
+
+    def test_db_queries_histogram(self):
+        self.client.force_authenticate(user=self.user)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("supplier-list"))
+        count = len(queries)
+        lines = self.scrape()
+        self.assertIn(f'http_request_db_queries_sum{{view="supplier-list"}} {count}', lines)
+        self.assertIn('http_request_db_queries_bucket{view="supplier-list",le="0"} 0', lines)
+        self.assertIn('http_request_db_queries_bucket{view="supplier-list",le="+Inf"} 1', lines)
+
+    def test_counters_are_shared_between_processes(self):
+        store = get_store()
+        store.add(request_increments("supplier-list", "GET", 200, 0.02, 3))
+        worker = multiprocessing.get_context("fork").Process(
+            target=store.add, args=(request_increments("supplier-list", "GET", 500, 0.3, 1),)
+        )
+        worker.start()
+        worker.join()
+        self.assertEqual(worker.exitcode, 0)
+        lines = render_metrics(MetricsStore(store.path).samples()).splitlines()
+        self.assertIn('http_requests_total{method="GET",status="200",view="supplier-list"} 1', lines)
+        self.assertIn('http_requests_total{method="GET",status="500",view="supplier-list"} 1', lines)
+        self.assertIn('http_request_duration_seconds_bucket{method="GET",view="supplier-list",le="0.025"} 1', lines)
+        self.assertIn('http_request_duration_seconds_bucket{method="GET",view="supplier-list",le="0.5"} 2', lines)
+        self.assertIn('http_request_duration_seconds_sum{method="GET",view="supplier-list"} 0.32', lines)
+
+    def test_label_escaping(self):
+        samples = [("http_requests_total", {"view": 'a"b\\c', "method": "GET", "status": "200"}, "", 3)]
+        self.assertIn('http_requests_total{method="GET",status="200",view="a\\"b\\\\c"} 3', render_metrics(samples))
+
+    def test_metrics_token(self):
+        with override_settings(METRICS_TOKEN="secret"):
+            self.assertEqual(self.client.get("/metrics").status_code, status.HTTP_401_UNAUTHORIZED)
+            self.scrape(HTTP_AUTHORIZATION="Bearer secret")
+
+    def test_disabled(self):
+        with override_settings(METRICS_ENABLED=False):
+            self.assertEqual(self.client.get("/metrics").status_code, status.HTTP_404_NOT_FOUND)
 
 
 class APIAccessTest(APITestCase):
@@ -242,6 +2423,302 @@ class APIAccessTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
 
+class ClearDebtJobTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="admin", password="testpass", is_staff=True)
+        self.factory = Supplier.objects.create(
+            name="Factory",
+            email="factory@example.com",
+            country="Country",
+            city="City",
+            street="Street",
+            house_number="1",
+            supplier_type="factory",
+        )
+        self.retailers = [
+            Supplier.objects.create(
+                name=f"Retail {index}",
+                email=f"retail{index}@example.com",
+                country="Country",
+                city="City",
+                street="Street",
+                house_number="2",
+                supplier_type="retail",
+                supplier=self.factory,
+                debt=Decimal("10.00"),
+            )
+            for index in range(5)
+        ]
+        self.ids = [supplier.pk for supplier in self.retailers]
+        self.admin = SupplierAdmin(Supplier, AdminSite())
+
+    def admin_request(self):
+        request = RequestFactory().post("/")
+        request.user = self.user
+        request.session = {}
+        request._messages = FallbackStorage(request)
+        return request
+
+    def debts(self):
+        return list(Supplier.objects.filter(pk__in=self.ids).order_by("pk").values_list("debt", flat=True))
+
+    def test_clear_debt_in_id_ordered_chunks(self):
+        with CaptureQueriesContext(connection) as queries:
+            clear_debt(reversed(self.ids), chunk_size=2)
+        updates = [query["sql"] for query in queries.captured_queries if query["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 3)
+        self.assertEqual(self.debts(), [Decimal("0.00")] * 5)
+
+    def test_small_selection_runs_inline(self):
+        self.admin.clear_debt(self.admin_request(), Supplier.objects.filter(pk__in=self.ids[:2]))
+        self.assertEqual(self.debts(), [Decimal("0.00")] * 2 + [Decimal("10.00")] * 3)
+        self.assertFalse(DebtClearingJob.objects.exists())
+
+    @override_settings(CLEAR_DEBT_SYNC_LIMIT=3)
+    def test_large_selection_runs_in_background(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.admin.clear_debt(self.admin_request(), Supplier.objects.all())
+        # Запрос вернулся сразу: задание в очереди, данные не тронуты, поток стартует после коммита.
+        self.assertEqual(len(callbacks), 1)
+        job = DebtClearingJob.objects.get()
+        self.assertEqual((job.status, job.total, job.created_by), (DebtClearingJob.PENDING, 6, self.user))
+        self.assertEqual(self.debts(), [Decimal("10.00")] * 5)
+
+        self.assertTrue(run_debt_job(job.pk, chunk_size=2))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed, job.last_id), (DebtClearingJob.DONE, 6, self.ids[-1]))
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(self.debts(), [Decimal("0.00")] * 5)
+        self.assertEqual(DebtClearingJobAdmin(DebtClearingJob, AdminSite()).progress(job), "6 из 6 (100%)")
+        # Повторно выполненное задание не запускается.
+        self.assertFalse(run_debt_job(job.pk))
+
+    def test_interrupted_job_resumes_after_last_id(self):
+        job = DebtClearingJob.objects.create(
+            supplier_ids=self.ids, total=5, processed=2, last_id=self.ids[1], status=DebtClearingJob.RUNNING
+        )
+        fresh = DebtClearingJob.objects.create(supplier_ids=self.ids[:1], total=1, status=DebtClearingJob.RUNNING)
+        DebtClearingJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(run_pending_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed), (DebtClearingJob.DONE, 5))
+        self.assertEqual(self.debts(), [Decimal("10.00")] * 2 + [Decimal("0.00")] * 3)
+        fresh.refresh_from_db()
+        self.assertEqual(fresh.status, DebtClearingJob.RUNNING)
+
+    def test_run_debt_jobs_command(self):
+        DebtClearingJob.objects.create(supplier_ids=self.ids, total=5)
+        out = io.StringIO()
+        call_command("run_debt_jobs", stdout=out)
+        self.assertIn("Выполнено заданий: 1", out.getvalue())
+        self.assertEqual(self.debts(), [Decimal("0.00")] * 5)
+
+    def test_failed_job_records_error(self):
+        job = DebtClearingJob.objects.create(supplier_ids=self.ids, total=5)
+        with patch("electronics_network.jobs.clear_debt_chunk", side_effect=RuntimeError("boom")):
+            with self.assertLogs("electronics_network.jobs", "ERROR"):
+                run_debt_job(job.pk)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), (DebtClearingJob.FAILED, "boom"))
+
+
+class SupplierChangelistTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_superuser(username="admin", password="testpass", email="admin@example.com")
+        self.client.force_login(self.user)
+        self.factory = self.create("Factory", "Moscow", "factory")
+        self.url = reverse("admin:electronics_network_supplier_changelist")
+
+    def create(self, name, city, supplier_type="retail", supplier=None):
+        return Supplier.objects.create(
+            name=name,
+            email="supplier@example.com",
+            country="Country",
+            city=city,
+            street="Street",
+            house_number="1",
+            supplier_type=supplier_type,
+            supplier=supplier,
+        )
+
+    def count_queries(self):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        self.create("Retail", "Minsk", supplier=self.factory)
+        expected = self.count_queries()
+        for index in range(5):
+            self.create(f"Retail {index}", "Minsk", supplier=self.factory)
+        self.assertEqual(self.count_queries(), expected)
+
+    def test_single_count_query_with_filters(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url, {"city": "Moscow"})
+        self.assertEqual(len([query for query in queries.captured_queries if "COUNT(*)" in query["sql"]]), 1)
+
+    def test_paginator_uses_estimate_for_large_tables(self):
+        if connection.vendor != "postgresql":
+            self.assertIsNone(estimate_count(Supplier.objects.all()))
+        with patch("electronics_network.pagination.estimate_count", return_value=2_000_000):
+            with self.assertNumQueries(0):
+                self.assertEqual(EstimatedCountPaginator(Supplier.objects.order_by("pk"), 100).count, 2_000_000)
+        with patch("electronics_network.pagination.estimate_count", return_value=5):
+            self.assertEqual(EstimatedCountPaginator(Supplier.objects.order_by("pk"), 100).count, 1)
+
+    def test_city_filter_is_limited_and_cached(self):
+        self.create("Retail", "Minsk", supplier=self.factory)
+        self.create("Shop", "Minsk", supplier=self.factory)
+        supplier_admin = SupplierAdmin(Supplier, AdminSite())
+        request = RequestFactory().get("/", {"city": "Omsk"})
+        with patch.object(CityListFilter, "limit", 1):
+            city_filter = CityListFilter(request, {"city": ["Omsk"]}, Supplier, supplier_admin)
+            self.assertEqual(city_filter.lookup_choices, [("Omsk", "Omsk"), ("Minsk", "Minsk")])
+            with self.assertNumQueries(0):
+                CityListFilter(request, {}, Supplier, supplier_admin)
+        self.assertEqual(list(city_filter.queryset(request, Supplier.objects.all())), [])
+
+
+class SupplierAutocompleteTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_superuser(username="admin", password="testpass", email="admin@example.com")
+        self.client.force_login(self.user)
+        self.factory = self.create("Factory", "factory")
+        self.retail = self.create("Retail", supplier=self.factory)
+        self.entrepreneur = self.create("Entrepreneur", "entrepreneur", self.retail)
+        self.other = self.create("Other Retail", supplier=self.factory)
+        self.url = reverse("admin:autocomplete")
+
+    def create(self, name, supplier_type="retail", supplier=None):
+        return Supplier.objects.create(
+            name=name,
+            email="supplier@example.com",
+            country="Country",
+            city="City",
+            street="Street",
+            house_number="1",
+            supplier_type=supplier_type,
+            supplier=supplier,
+        )
+
+    def autocomplete(self, model_name, **params):
+        params = {"app_label": "electronics_network", "model_name": model_name, "field_name": "supplier", **params}
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return [result["text"] for result in response.json()["results"]]
+
+    def test_change_form_does_not_render_all_suppliers(self):
+        response = self.client.get(reverse("admin:electronics_network_supplier_change", args=[self.retail.pk]))
+        self.assertContains(response, f'data-ajax--url="{self.url}?exclude_subtree={self.retail.pk}"')
+        self.assertNotContains(response, "Other Retail")
+        response = self.client.get(reverse("admin:electronics_network_supplier_add"))
+        self.assertContains(response, f'data-ajax--url="{self.url}"')
+
+    def test_excludes_self_and_descendants(self):
+        self.assertEqual(self.autocomplete("supplier", exclude_subtree=self.retail.pk), ["Factory", "Other Retail"])
+        self.assertEqual(self.autocomplete("supplier", term="retail", exclude_subtree=self.retail.pk), ["Other Retail"])
+        self.assertEqual(len(self.autocomplete("supplier")), 4)
+
+    def test_product_supplier_autocomplete(self):
+        product_url = reverse("admin:electronics_network_product_add")
+        self.assertContains(self.client.get(product_url), "admin-autocomplete")
+        self.assertEqual(self.autocomplete("product", term="entre"), ["Entrepreneur"])
+
+
+class ProductInlinePaginationTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_superuser(username="admin", password="testpass", email="admin@example.com")
+        self.client.force_login(self.user)
+        self.supplier = Supplier.objects.create(
+            name="Factory",
+            email="factory@example.com",
+            country="Country",
+            city="City",
+            street="Street",
+            house_number="1",
+            supplier_type="factory",
+        )
+        Product.objects.bulk_create(
+            Product(name=f"Product {index}", model=f"M{index}", release_date=date(2024, 1, 1), supplier=self.supplier)
+            for index in range(25)
+        )
+        self.products = list(self.supplier.products.order_by("pk"))
+        self.url = reverse("admin:electronics_network_supplier_change", args=[self.supplier.pk])
+
+    def test_renders_one_page(self):
+        response = self.client.get(self.url)
+        formset = response.context["inline_admin_formsets"][0].formset
+        self.assertEqual([form.instance for form in formset.initial_forms], self.products[:20])
+        self.assertContains(response, "1–20 из 25")
+        self.assertContains(response, "?products_page=2")
+        self.assertContains(response, f"/admin/electronics_network/product/?supplier__id__exact={self.supplier.pk}")
+
+        response = self.client.get(self.url, {"products_page": "2"})
+        formset = response.context["inline_admin_formsets"][0].formset
+        self.assertEqual([form.instance for form in formset.initial_forms], self.products[20:])
+
+    def test_page_links_keep_query(self):
+        params = {"_changelist_filters": "city=City&q=Factory", "products_page": "2"}
+        response = self.client.get(self.url, params)
+        previous = urlencode({**params, "products_page": 1})
+        self.assertContains(response, f'href="?{previous.replace("&", "&amp;")}"')
+
+    def test_save_touches_only_changed_rows(self):
+        data = {
+            "name": "Factory",
+            "email": "factory@example.com",
+            "country": "Country",
+            "city": "City",
+            "street": "Street",
+            "house_number": "1",
+            "supplier": "",
+            "supplier_type": "factory",
+            "debt": "0.00",
+            "products-TOTAL_FORMS": "5",
+            "products-INITIAL_FORMS": "5",
+            "products-MIN_NUM_FORMS": "0",
+            "products-MAX_NUM_FORMS": "1000",
+        }
+        for index, product in enumerate(self.products[20:]):
+            data[f"products-{index}-id"] = str(product.pk)
+            data[f"products-{index}-supplier"] = str(self.supplier.pk)
+            data[f"products-{index}-name"] = product.name
+            data[f"products-{index}-model"] = product.model
+            data[f"products-{index}-release_date"] = "2024-01-01"
+        data["products-1-name"] = "Renamed"
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(f"{self.url}?products_page=2", data)
+        self.assertEqual(response.status_code, 302)
+        product_table = Product._meta.db_table
+        updates = [
+            query["sql"] for query in queries.captured_queries if query["sql"].startswith(f'UPDATE "{product_table}"')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(Product.objects.get(pk=self.products[21].pk).name, "Renamed")
+        self.assertEqual(Product.objects.filter(name="Renamed").count(), 1)
+
+    def test_filtered_product_changelist(self):
+        other = Supplier.objects.create(
+            name="Other",
+            email="other@example.com",
+            country="Country",
+            city="City",
+            street="Street",
+            house_number="2",
+            supplier_type="factory",
+        )
+        Product.objects.create(name="Other product", model="X", release_date=date(2024, 1, 1), supplier=other)
+        url = reverse("admin:electronics_network_product_changelist")
+        response = self.client.get(url, {"supplier__id__exact": self.supplier.pk})
+        self.assertEqual(response.context["cl"].result_count, 25)
+
+
 class AdminActionsTest(TestCase):
     def setUp(self):
         self.factory = RequestFactory()
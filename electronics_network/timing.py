@@ -0,0 +1,215 @@
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import (iscoroutinefunction, markcoroutinefunction,
+                          sync_to_async)
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DatabaseError, connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+# Замеры текущего запроса. ContextVar, а не атрибут запроса: так замеры доходят и до кода,
+# который выполняется через sync_to_async (ORM и рендер под ASGI).
+current_timings = ContextVar("request_timings", default=None)
+
+# Порядок метрик в Server-Timing и в логе.
+SPANS = ("auth", "serialize", "render")
+MAX_EXPLAINED_QUERIES = 5
+
+
+class RequestTimings:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = dict.fromkeys(SPANS, 0.0)
+        self.queries = 0
+        self.sql = 0.0
+        self.slow_queries = []
+
+    def add(self, name, duration):
+        self.spans[name] = self.spans.get(name, 0.0) + duration
+
+    def record_query(self, alias, sql, params, many, duration):
+        self.queries += 1
+        self.sql += duration
+        slow = duration * 1000 >= settings.SLOW_QUERY_MS
+        if slow and not many and len(self.slow_queries) < MAX_EXPLAINED_QUERIES:
+            self.slow_queries.append((alias, sql, params, duration))
+
+    def metrics(self):
+        """Миллисекунды по метрикам: db, auth, serialize, render, total."""
+        metrics = {"db": self.sql, **self.spans, "total": time.perf_counter() - self.started}
+        return {name: round(duration * 1000, 1) for name, duration in metrics.items()}
+
+
+@contextmanager
+def timed(name):
+    """Добавляет длительность блока к метрике name текущего запроса; без замеров ничего не делает."""
+    timings = current_timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+
+
+def timed_call(name, func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with timed(name):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def record_query(execute, sql, params, many, context):
+    timings = current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.record_query(context["connection"].alias, sql, params, many, time.perf_counter() - started)
+
+
+def install_query_timer(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def start_measuring():
+    """
+    Начинает замеры запроса; возвращает (timings, token). Если замеры уже начаты внешним
+    middleware, отдаёт их же, а token равен None.
+    """
+    timings = current_timings.get()
+    if timings is not None:
+        return timings, None
+    connection_created.connect(install_query_timer)
+    # Соединения, открытые до подключения сигнала, получают счётчик здесь.
+    for connection in connections.all(initialized_only=True):
+        install_query_timer(connection)
+    timings = RequestTimings()
+    return timings, current_timings.set(timings)
+
+
+def stop_measuring(token):
+    if token is not None:
+        current_timings.reset(token)
+
+
+def explain(alias, sql, params):
+    connection = connections[alias]
+    if not sql.lstrip().upper().startswith("SELECT"):
+        return None
+    token = current_timings.set(None)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}", params)
+            return "\n".join(" ".join(str(value) for value in row) for row in cursor.fetchall())
+    except DatabaseError as e:
+        return f"EXPLAIN не выполнен: {e}"
+    finally:
+        current_timings.reset(token)
+
+
+class RequestTimingMiddleware:
+    """
+    Замеры запроса: число и время SQL-запросов, аутентификация, сериализация, рендер и общее время.
+
+    Включается настройкой REQUEST_TIMING. Результат отдаётся в заголовке `Server-Timing`
+    (виден во вкладке Network браузера) и пишется в лог `electronics_network.timing` строкой
+    JSON. Запросы дольше SLOW_QUERY_MS миллисекунд логируются отдельно вместе с EXPLAIN.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_TIMING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings, token = start_measuring()
+        try:
+            response = self.get_response(request)
+        finally:
+            stop_measuring(token)
+        self.explain_slow_queries(request, timings)
+        return self.finish(request, response, timings)
+
+    async def __acall__(self, request):
+        timings, token = start_measuring()
+        try:
+            response = await self.get_response(request)
+        finally:
+            stop_measuring(token)
+        if timings.slow_queries:
+            await sync_to_async(self.explain_slow_queries)(request, timings)
+        return self.finish(request, response, timings)
+
+    def explain_slow_queries(self, request, timings):
+        for alias, sql, params, duration in timings.slow_queries:
+            logger.warning(
+                json.dumps(
+                    {
+                        "event": "slow_query",
+                        "method": request.method,
+                        "path": request.path,
+                        "duration_ms": round(duration * 1000, 1),
+                        "sql": sql,
+                        "params": [str(param) for param in params or ()],
+                        "plan": explain(alias, sql, params),
+                    },
+                    ensure_ascii=False,
+                )
+            )
+
+    def finish(self, request, response, timings):
+        metrics = timings.metrics()
+        entries = [f"{name};dur={duration}" for name, duration in metrics.items()]
+        entries[0] += f';desc="{timings.queries} queries"'
+        response.headers["Server-Timing"] = ", ".join(entries)
+        logger.info(
+            json.dumps(
+                {
+                    "event": "request",
+                    "method": request.method,
+                    "path": request.path,
+                    "status": response.status_code,
+                    "queries": timings.queries,
+                    **{f"{name}_ms": duration for name, duration in metrics.items()},
+                },
+                ensure_ascii=False,
+            )
+        )
+        return response
+
+
+class TimedViewMixin:
+    """Метрики auth и render для вьюсета; serialize отмечается в самом вьюсете через timed()."""
+
+    def perform_authentication(self, request):
+        with timed("auth"):
+            super().perform_authentication(request)
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if current_timings.get() is not None:
+            for renderer in renderers:
+                renderer.render = timed_call("render", renderer.render)
+        return renderers
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
@@ -10,3 +11,7 @@ router.register(r"suppliers", SupplierViewSet)
 urlpatterns = [
     path("", include(router.urls)),
 ]
+
+if settings.ASYNC_READ_VIEWS:
+    # Async-чтение списка, карточки, поддерева и поиска поставщиков; остальное — через router.
+    urlpatterns.insert(0, path("", include("electronics_network.async_urls")))
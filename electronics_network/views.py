@@ -1,25 +1,380 @@
-from rest_framework import viewsets
+from functools import partial
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import F, Prefetch, Value
+from django.http import Http404, StreamingHttpResponse
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
 
 from users.permissions import IsActiveEmployee
 
+from .bulk import SupplierBulkUpdate, bulk_delete
+from .bulk_import import NetworkImport, read_rows
+from .cache import (LIST_VALIDATOR_KEYS, LIST_VERSION_KEY, CachedResponseMixin,
+                    chain_ids, get_versions, object_version_key)
+from .conditional import ConditionalGetMixin
+from .debt import (DEBT_GROUPINGS, debt_groups, debt_summary, rollup_enabled,
+                   rollup_factory_groups, rollup_summary, subtree)
+from .export import EXPORT_CONTENT_TYPES, EXPORT_FORMATS, export_lines
+from .fast import get_read_plan
+from .filters import SupplierFilterBackend
 from .models import Product, Supplier
-from .serializers import ProductSerializer, SupplierSerializer
+from .pagination import IdCursorPagination
+from .search import (PRODUCT_SEARCH_FIELDS, SUPPLIER_SEARCH_FIELDS,
+                     search_queryset, search_terms)
+from .serializers import (DebtSummarySerializer, ProductSerializer,
+                          SupplierChangesSerializer, SupplierSerializer,
+                          SupplierTreeSerializer)
+from .timing import TimedViewMixin, timed
+
+EXPANDABLE_FIELDS = ("products",)
+SPARSE_ACTIONS = ("list", "retrieve", "descendants", "ancestors", "search")
+SEARCH_LIMIT = 20
 
 
-class SupplierViewSet(viewsets.ModelViewSet):
+class SupplierViewSet(TimedViewMixin, ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Supplier.objects.all()
     serializer_class = SupplierSerializer
     permission_classes = [IsActiveEmployee]
+    filter_backends = [SupplierFilterBackend]
+    # Быстрое чтение через values() и ReadPlan вместо ModelSerializer; вывод тот же.
+    fast_read = True
+
+    def get_serializer_class(self):
+        if self.action in ("descendants", "ancestors"):
+            return SupplierTreeSerializer
+        return super().get_serializer_class()
+
+    def get_sparse_fields(self):
+        """Поля из ?fields= и ?expand= для GET-запросов; None — отдавать все поля."""
+        if self.request.method != "GET":
+            return None
+        if hasattr(self, "_sparse_fields"):
+            return self._sparse_fields
+
+        available = self.get_serializer_class().Meta.fields
+        requested = [name for name in self.request.query_params.get("fields", "").split(",") if name]
+        expand = {name for name in self.request.query_params.get("expand", "").split(",") if name}
+        unknown = [name for name in requested if name not in available]
+        if unknown:
+            raise ValidationError({"fields": f"Неизвестные поля: {', '.join(unknown)}."})
+        if expand - set(EXPANDABLE_FIELDS):
+            raise ValidationError({"expand": f"Можно раскрыть только: {', '.join(EXPANDABLE_FIELDS)}."})
+
+        fields = requested or list(available)
+        # Вложенные товары отдаются только по явному запросу.
+        fields = [name for name in fields if name not in EXPANDABLE_FIELDS or name in expand or name in requested]
+        fields += [name for name in EXPANDABLE_FIELDS if name in expand and name not in fields]
+        self._sparse_fields = fields
+        return fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fields"] = self.get_sparse_fields()
+        return context
 
     def get_queryset(self):
         queryset = super().get_queryset()
-        country = self.request.query_params.get("country")
-        if country:
-            queryset = queryset.filter(country=country)
+        fields = self.get_sparse_fields()
+        if fields is None or "products" in fields:
+            queryset = queryset.prefetch_related(Prefetch("products", queryset=Product.objects.order_by("id")))
+        if fields is not None and self.action in SPARSE_ACTIONS:
+            # Курсорной пагинации нужны created_at и id, даже если клиент их не запросил.
+            columns = {name for name in fields if name not in ("products", "depth")}
+            queryset = queryset.only(*columns | {"id", "created_at"})
         return queryset
 
+    def get_read_plan(self):
+        if not self.fast_read or self.request.method != "GET":
+            return None
+        fields = self.get_sparse_fields()
+        return get_read_plan(self.get_serializer_class(), tuple(fields))
+
+    def read_queryset(self, queryset, *extra):
+        plan = self.get_read_plan()
+        return queryset if plan is None else plan.values(queryset, *extra)
+
+    def read_data(self, objects, many=True):
+        plan = self.get_read_plan()
+        if plan is None:
+            with timed("serialize"):
+                return self.get_serializer(objects, many=many).data
+        data = plan.render(objects if many else [objects])
+        return data if many else data[0]
+
+    def read_list_response(self, queryset):
+        # Позиция курсора берётся из строки, поэтому поля сортировки нужны и в values().
+        ordering = [name.lstrip("-") for name in getattr(self.paginator, "ordering", ())]
+        queryset = self.read_queryset(queryset, *ordering)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.read_data(page))
+        return Response(self.read_data(queryset))
+
+    def list_response(self, request, *args, **kwargs):
+        return self.read_list_response(self.filter_queryset(self.get_queryset()))
+
+    def retrieve_response(self, request, *args, **kwargs):
+        if self.get_read_plan() is None:
+            return super().retrieve(request, *args, **kwargs)
+        row = get_object_or_404(self.read_queryset(self.filter_queryset(self.get_queryset())), pk=kwargs["pk"])
+        self.check_object_permissions(request, row)
+        return Response(self.read_data(row, many=False))
+
+    # Сначала кэш (вместе с ETag/Last-Modified), при промахе — условный GET: список по версиям
+    # кэша, карточка по updated_at.
+    def list(self, request, *args, **kwargs):
+        build_response = partial(self.list_response, request, *args, **kwargs)
+        versions = get_versions(LIST_VALIDATOR_KEYS)
+        conditional = partial(self.versioned_response, request, versions, build_response)
+        return self.cached_response(request, [LIST_VERSION_KEY], conditional)
+
+    def object_state(self, pk):
+        """Выборка для условного GET карточки; некорректный pk — пустая выборка (дальше 404)."""
+        try:
+            return Supplier.objects.filter(pk=pk)
+        except (TypeError, ValueError, DjangoValidationError):
+            return Supplier.objects.none()
+
+    def object_version_keys(self, pk):
+        """Ключ версии звена по pk из URL: "01" и "1" — одно звено с одной версией; некорректный pk — 404."""
+        try:
+            return [object_version_key(Supplier._meta.pk.to_python(pk))]
+        except DjangoValidationError:
+            raise Http404
+
+    def retrieve(self, request, *args, **kwargs):
+        build_response = partial(self.retrieve_response, request, *args, **kwargs)
+        conditional = partial(self.conditional_response, request, self.object_state(kwargs["pk"]), build_response)
+        return self.cached_response(request, self.object_version_keys(kwargs["pk"]), conditional)
+
+    def get_max_depth(self):
+        max_depth = self.request.query_params.get("max_depth")
+        if max_depth is None:
+            return None
+        try:
+            max_depth = int(max_depth)
+        except ValueError:
+            raise ValidationError({"max_depth": "Глубина должна быть целым числом."})
+        if max_depth < 1:
+            raise ValidationError({"max_depth": "Глубина должна быть не меньше 1."})
+        return max_depth
+
+    def tree_roots(self):
+        # Корень ищем без фильтров списка: они применяются только к возвращаемым звеньям.
+        return Supplier.objects.only("path", "level")
+
+    def get_tree_root(self):
+        root = get_object_or_404(self.tree_roots(), pk=self.kwargs["pk"])
+        self.check_object_permissions(self.request, root)
+        return root
+
+    @action(detail=True, methods=["get"])
+    def descendants(self, request, pk=None):
+        # Версия звена меняется при любом изменении ниже по цепочке, поэтому её достаточно.
+        return self.cached_response(request, self.object_version_keys(pk), self.descendants_response)
+
+    def descendants_queryset(self, root):
+        queryset = self.filter_queryset(self.get_queryset()).filter(path__startswith=root.subtree_prefix)
+        max_depth = self.get_max_depth()
+        if max_depth is not None:
+            queryset = queryset.filter(level__lte=root.level + max_depth)
+        return queryset.annotate(depth=F("level") - Value(root.level))
+
+    def descendants_response(self):
+        return self.read_list_response(self.descendants_queryset(self.get_tree_root()))
+
+    @action(detail=True, methods=["get"])
+    def ancestors(self, request, pk=None):
+        root = self.get_tree_root()
+        version_keys = [object_version_key(supplier_id) for supplier_id in sorted(chain_ids(root.pk, root.path))]
+        return self.cached_response(request, version_keys, partial(self.ancestors_response, root))
+
+    def ancestors_response(self, root):
+        queryset = self.filter_queryset(self.get_queryset()).filter(pk__in=root.ancestor_ids)
+        max_depth = self.get_max_depth()
+        if max_depth is not None:
+            queryset = queryset.filter(level__gte=root.level - max_depth)
+        # Цепочка ограничена глубиной иерархии, поэтому отдаётся целиком, без пагинации.
+        queryset = queryset.annotate(depth=Value(root.level) - F("level")).order_by("-level")
+        return Response(self.read_data(self.read_queryset(queryset)))
+
+    def get_search_limit(self):
+        limit = self.request.query_params.get("limit")
+        if limit is None:
+            return SEARCH_LIMIT
+        if not limit.isdigit() or not 1 <= int(limit) <= settings.API_MAX_PAGE_SIZE:
+            raise ValidationError({"limit": f"Ожидается целое число от 1 до {settings.API_MAX_PAGE_SIZE}."})
+        return int(limit)
+
+    def get_search_query(self):
+        query = self.request.query_params.get("q", "")
+        if not search_terms(query):
+            raise ValidationError({"q": "Укажите поисковый запрос."})
+        return query
+
+    @action(detail=False, methods=["get"])
+    def search(self, request):
+        query = self.get_search_query()
+        return self.cached_response(request, [LIST_VERSION_KEY], partial(self.search_response, query))
+
+    def search_querysets(self, query):
+        # Лучшие совпадения по поставщикам (с учётом фильтров списка) и по товарам, по убыванию rank.
+        limit = self.get_search_limit()
+        queryset = search_queryset(self.filter_queryset(self.get_queryset()), query, SUPPLIER_SEARCH_FIELDS)
+        products = search_queryset(Product.objects.all(), query, PRODUCT_SEARCH_FIELDS)
+        return self.read_queryset(queryset, "search_rank")[:limit], products[:limit]
+
+    def search_data(self, rows, suppliers, products):
+        for item, row in zip(suppliers, rows):
+            item["rank"] = row["search_rank"] if isinstance(row, dict) else row.search_rank
+        with timed("serialize"):
+            product_data = ProductSerializer(products, many=True).data
+        for item, product in zip(product_data, products):
+            item["rank"] = product.search_rank
+        return {"suppliers": suppliers, "products": product_data}
+
+    def search_response(self, query):
+        rows, products = (list(queryset) for queryset in self.search_querysets(query))
+        return Response(self.search_data(rows, self.read_data(rows), products))
+
+    def get_debt_group_by(self):
+        group_by = self.request.query_params.get("group_by")
+        if group_by is not None and group_by not in DEBT_GROUPINGS:
+            raise ValidationError({"group_by": f"Допустимые значения: {', '.join(DEBT_GROUPINGS)}."})
+        return group_by
+
+    def can_use_rollups(self):
+        # Таблица итогов хранит поддеревья целиком, поэтому с фильтрами списка не годится.
+        return rollup_enabled() and not SupplierFilterBackend().is_filtering(self.request)
+
+    def debt_rows(self, queryset, group_by):
+        # Без get_queryset(): агрегатам не нужны ни товары, ни only().
+        queryset = self.filter_queryset(queryset)
+        return debt_summary(queryset) if group_by is None else debt_groups(queryset, group_by)
+
+    def debt_data(self, rows, group_by):
+        if group_by is None:
+            return DebtSummarySerializer(rows).data
+        results = [{group_by: row[group_by], **DebtSummarySerializer(row).data} for row in rows]
+        return {"group_by": group_by, "results": results}
+
+    @action(detail=False, methods=["get"])
+    def debt(self, request):
+        """Сумма, количество и максимум задолженности (`group_by=country|supplier_type|factory`)."""
+        return self.cached_response(request, [LIST_VERSION_KEY], self.debt_response)
+
+    def debt_response(self):
+        group_by = self.get_debt_group_by()
+        if group_by == "factory" and self.can_use_rollups():
+            return Response(self.debt_data(rollup_factory_groups(), group_by))
+        return Response(self.debt_data(self.debt_rows(Supplier.objects.all(), group_by), group_by))
+
+    @action(detail=True, methods=["get"], url_path="debt")
+    def subtree_debt(self, request, pk=None):
+        """Итоги задолженности по звену и всем его потомкам."""
+        return self.cached_response(request, self.object_version_keys(pk), self.subtree_debt_response)
+
+    def subtree_debt_response(self):
+        root = self.get_tree_root()
+        group_by = self.get_debt_group_by()
+        if group_by is None and self.can_use_rollups():
+            summary = rollup_summary(root.pk)
+            if summary is not None:
+                return Response(self.debt_data(summary, group_by))
+        return Response(self.debt_data(self.debt_rows(subtree(Supplier.objects.all(), root), group_by), group_by))
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        export_format = request.query_params.get("export_format", "ndjson")
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError({"export_format": f"Допустимые форматы: {', '.join(EXPORT_FORMATS)}."})
+        response = StreamingHttpResponse(
+            export_lines(self.filter_queryset(self.get_queryset()), export_format),
+            content_type=EXPORT_CONTENT_TYPES[export_format],
+        )
+        response["Content-Disposition"] = f'attachment; filename="suppliers.{export_format}"'
+        return response
+
+    def get_import_rows(self, section):
+        file = self.request.FILES.get(section)
+        if file is not None:
+            try:
+                return read_rows(file, file.name)
+            except ValueError as e:
+                raise ValidationError({section: str(e)})
+        rows = self.request.data.get(section, [])
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise ValidationError({section: "Ожидается список объектов."})
+        return rows
+
+    @action(detail=False, methods=["post"], url_path="import")
+    def import_network(self, request):
+        suppliers = self.get_import_rows("suppliers")
+        products = self.get_import_rows("products")
+        strict = str(request.data.get("strict", "")).lower() in ("1", "true")
+        # Задолженность через API только для чтения, поэтому при импорте она не принимается.
+        result = NetworkImport(suppliers, products, strict=strict, allow_debt=False).run()
+        if strict and result["errors"]:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_201_CREATED)
+
+    def get_bulk_selection(self):
+        """(queryset, ids) для массовых действий: `ids` из тела запроса и/или фильтры списка из строки запроса."""
+        ids = self.request.data.get("ids")
+        if ids is not None and (
+            not isinstance(ids, list) or not all(isinstance(pk, int) and not isinstance(pk, bool) for pk in ids)
+        ):
+            raise ValidationError({"ids": "Ожидается список id."})
+        ids = list(dict.fromkeys(ids)) if ids else None
+        # Без выбора запрос затронул бы всю сеть — так не бывает случайно.
+        if ids is None and not SupplierFilterBackend().is_filtering(self.request):
+            raise ValidationError({"ids": "Укажите id поставщиков или фильтр."})
+        queryset = self.filter_queryset(Supplier.objects.all())
+        if ids is not None:
+            queryset = queryset.filter(pk__in=ids)
+        size = len(ids) if ids is not None else queryset.count()
+        if size > settings.SUPPLIER_BULK_LIMIT:
+            raise ValidationError({"ids": f"За один запрос — не больше {settings.SUPPLIER_BULK_LIMIT} поставщиков."})
+        return queryset, ids
+
+    @action(detail=False, methods=["patch"], url_path="bulk", url_name="bulk")
+    def bulk_update(self, request):
+        """Массовое изменение: `ids` и/или фильтры списка, `changes` — новые значения, `strict` — всё или ничего."""
+        changes = request.data.get("changes")
+        if not isinstance(changes, dict) or not changes:
+            raise ValidationError({"changes": "Ожидается объект с новыми значениями полей."})
+        # Задолженность через API только для чтения, как и в одиночном PATCH.
+        readonly = set(changes) - set(SupplierChangesSerializer.Meta.fields)
+        if readonly:
+            raise ValidationError({"changes": f"Эти поля нельзя изменить: {', '.join(sorted(readonly))}."})
+        serializer = SupplierChangesSerializer(data=changes, partial=True)
+        if not serializer.is_valid():
+            raise ValidationError({"changes": serializer.errors})
+        queryset, ids = self.get_bulk_selection()
+        strict = str(request.data.get("strict", "")).lower() in ("1", "true")
+        try:
+            result = SupplierBulkUpdate(queryset, ids, serializer.validated_data, strict=strict).run()
+        except DjangoValidationError as e:
+            # Выбор изменился между проверкой и записью (например, параллельный перенос).
+            raise ValidationError({"changes": e.messages})
+        if strict and result["errors"]:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
+
+    @bulk_update.mapping.delete
+    def bulk_destroy(self, request):
+        """Массовое удаление: `ids` и/или фильтры списка; клиенты удалённых звеньев становятся корнями."""
+        queryset, ids = self.get_bulk_selection()
+        return Response(bulk_delete(queryset, ids))
+
 
 class ProductViewSet(viewsets.ModelViewSet):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
     permission_classes = [IsActiveEmployee]
+    pagination_class = IdCursorPagination
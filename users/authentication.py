@@ -0,0 +1,31 @@
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import \
+    JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+
+from .tokens import check_auth_version
+
+
+class ClaimsUser(TokenUser):
+    """Пользователь из подписанных claims access-токена, без строки из БД."""
+
+    @cached_property
+    def is_active(self):
+        return self.token.get("is_active", False)
+
+
+class ClaimsJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    JWT-аутентификация без чтения пользователя из БД на каждый запрос.
+
+    is_active и is_staff берутся из подписанных claims токена. Отзыв — через версию
+    авторизации пользователя: одно чтение из общего кэша на запрос вместо SELECT.
+    """
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        check_auth_version(validated_token)
+        if not user.is_active:
+            raise AuthenticationFailed("Пользователь неактивен.", code="user_inactive")
+        return user
@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Warning, register
+
+
+@register()
+def check_auth_version_cache(app_configs, **kwargs):
+    """Версии авторизации должны лежать в общем для воркеров кэше, иначе отзыв токенов виден с задержкой."""
+    if not settings.JWT_STATELESS_AUTH or not isinstance(caches[settings.USER_AUTH_CACHE_ALIAS], LocMemCache):
+        return []
+    return [
+        Warning(
+            "JWT_STATELESS_AUTH включён, а версии авторизации хранятся в locmem: другие воркеры увидят "
+            "отзыв токенов только через USER_AUTH_VERSION_TIMEOUT секунд.",
+            hint="Задайте CACHE_BACKEND=file или CACHE_BACKEND=db.",
+            id="users.W001",
+        )
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-17 04:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0003_alter_customuser_groups_alter_customuser_is_active"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customuser",
+            name="auth_version",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
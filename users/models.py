@@ -4,6 +4,8 @@ from django.db import models
 
 class CustomUser(AbstractUser):
     username = models.CharField(max_length=150, unique=True)
+    # Растёт при смене is_active, is_staff, is_superuser или пароля; токены со старой версией отклоняются.
+    auth_version = models.PositiveIntegerField(default=0, editable=False)
 
     USERNAME_FIELD = "username"
     REQUIRED_FIELDS = ["email"]
@@ -0,0 +1,39 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .tokens import forget_auth_versions
+
+User = get_user_model()
+
+# Поля, которые попадают в токен или делают его недействительным.
+AUTH_FIELDS = ("is_active", "is_staff", "is_superuser", "password")
+
+
+@receiver(pre_save, sender=User)
+def bump_auth_version(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._auth_version_bumped = False
+    if instance.pk is None or raw:
+        return
+    fields = [name for name in AUTH_FIELDS if update_fields is None or name in update_fields]
+    if not fields:
+        return
+    previous = User.objects.filter(pk=instance.pk).values(*fields).first()
+    if previous is not None and any(previous[name] != getattr(instance, name) for name in fields):
+        instance.auth_version += 1
+        instance._auth_version_bumped = True
+
+
+@receiver(post_save, sender=User)
+def forget_auth_version(sender, instance, update_fields=None, **kwargs):
+    # save(update_fields=[...]) без auth_version не запишет новую версию — дописываем её сами.
+    if getattr(instance, "_auth_version_bumped", False) and update_fields and "auth_version" not in update_fields:
+        User.objects.filter(pk=instance.pk).update(auth_version=F("auth_version") + 1)
+        instance.refresh_from_db(fields=["auth_version"])
+    forget_auth_versions([instance.pk])
+
+
+@receiver(post_delete, sender=User)
+def forget_deleted_auth_version(sender, instance, **kwargs):
+    forget_auth_versions([instance.pk])
@@ -1,7 +1,19 @@
+from unittest.mock import patch
+
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from .authentication import ClaimsJWTAuthentication
+from .checks import check_auth_version_cache
+from .tokens import AUTH_VERSION_CLAIM, bump_auth_versions
 
 User = get_user_model()
 
@@ -27,3 +39,116 @@ class JWTAuthTest(APITestCase):
         self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access_token}")
         response = self.client.get(reverse("supplier-list"))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_refresh_token_without_version(self):
+        # Токены, выданные до появления версии авторизации, продолжают обновляться.
+        refresh = RefreshToken.for_user(self.user)
+        response = self.client.post(reverse("token_refresh"), {"refresh": str(refresh)})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        self.assertEqual(self.client.get(reverse("supplier-list")).status_code, status.HTTP_200_OK)
+
+
+@override_settings(JWT_STATELESS_AUTH=True)
+class StatelessJWTAuthTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        # Классы аутентификации DRF читаются при импорте представлений, поэтому подменяются напрямую.
+        patcher = patch.object(APIView, "authentication_classes", [ClaimsJWTAuthentication])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = User.objects.create_user(username="testuser", password="testpass", is_active=True)
+
+    def obtain_tokens(self, password="testpass"):
+        response = self.client.post(reverse("token_obtain_pair"), {"username": "testuser", "password": password})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def get_suppliers(self, access):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        return self.client.get(reverse("supplier-list"))
+
+    def test_token_carries_claims(self):
+        token = AccessToken(self.obtain_tokens()["access"])
+        self.assertIs(token["is_active"], True)
+        self.assertIs(token["is_staff"], False)
+        self.assertEqual(token[AUTH_VERSION_CLAIM], 0)
+
+    def test_request_does_not_query_users_table(self):
+        access = self.obtain_tokens()["access"]
+        self.get_suppliers(access)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get_suppliers(access)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        users_table = User._meta.db_table
+        self.assertFalse([q["sql"] for q in queries.captured_queries if users_table in q["sql"]])
+
+    def test_deactivation_revokes_tokens_immediately(self):
+        access = self.obtain_tokens()["access"]
+        self.assertEqual(self.get_suppliers(access).status_code, status.HTTP_200_OK)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.get_suppliers(access).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_staff_change_revokes_tokens(self):
+        access = self.obtain_tokens()["access"]
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(self.get_suppliers(access).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIs(AccessToken(self.obtain_tokens()["access"])["is_staff"], True)
+
+    def test_password_change_with_update_fields_revokes_tokens(self):
+        access = self.obtain_tokens()["access"]
+        self.user.set_password("newpass")
+        self.user.save(update_fields=["password"])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.auth_version, 1)
+        self.assertEqual(self.get_suppliers(access).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.get_suppliers(self.obtain_tokens("newpass")["access"]).status_code, status.HTTP_200_OK)
+
+    def test_unrelated_change_keeps_tokens(self):
+        access = self.obtain_tokens()["access"]
+        self.user.email = "user@example.com"
+        self.user.save()
+        self.assertEqual(self.user.auth_version, 0)
+        self.assertEqual(self.get_suppliers(access).status_code, status.HTTP_200_OK)
+
+    def test_refresh_with_revoked_token_fails(self):
+        refresh = self.obtain_tokens()["refresh"]
+        response = self.client.post(reverse("token_refresh"), {"refresh": refresh})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.post(reverse("token_refresh"), {"refresh": refresh})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_bump_auth_versions(self):
+        access = self.obtain_tokens()["access"]
+        self.assertEqual(self.get_suppliers(access).status_code, status.HTTP_200_OK)
+        bump_auth_versions([self.user.pk])
+        self.assertEqual(self.get_suppliers(access).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_without_version_rejected(self):
+        token = AccessToken.for_user(self.user)
+        token["is_active"] = True
+        self.assertEqual(self.get_suppliers(str(token)).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_user_rejected(self):
+        access = self.obtain_tokens()["access"]
+        self.user.delete()
+        self.assertEqual(self.get_suppliers(access).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh_token_without_version_rejected(self):
+        refresh = RefreshToken.for_user(self.user)
+        response = self.client.post(reverse("token_refresh"), {"refresh": str(refresh)})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_locmem_cache_warning(self):
+        locmem = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        shared = {"default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "cache"}}
+        with override_settings(CACHES=locmem):
+            self.assertEqual([warning.id for warning in check_auth_version_cache(None)], ["users.W001"])
+        with override_settings(CACHES=shared):
+            self.assertEqual(check_auth_version_cache(None), [])
+        with override_settings(CACHES=locmem, JWT_STATELESS_AUTH=False):
+            self.assertEqual(check_auth_version_cache(None), [])
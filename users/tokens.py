@@ -0,0 +1,78 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import (TokenObtainPairSerializer,
+                                                  TokenRefreshSerializer)
+from rest_framework_simplejwt.settings import api_settings
+
+AUTH_VERSION_CLAIM = "ver"
+
+
+def get_cache():
+    return caches[settings.USER_AUTH_CACHE_ALIAS]
+
+
+def auth_version_key(user_id):
+    return f"users:auth_version:{user_id}"
+
+
+def get_auth_version(user_id):
+    """Текущая версия авторизации: из общего кэша, при промахе — из БД. None, если пользователя нет."""
+    cache = get_cache()
+    version = cache.get(auth_version_key(user_id))
+    if version is None:
+        version = get_user_model().objects.filter(pk=user_id).values_list("auth_version", flat=True).first()
+        if version is not None:
+            cache.set(auth_version_key(user_id), version, settings.USER_AUTH_VERSION_TIMEOUT)
+    return version
+
+
+def forget_auth_versions(user_ids):
+    # Как и с кэшем ответов: сразу и ещё раз после коммита, чтобы не закэшировать старую версию.
+    keys = [auth_version_key(user_id) for user_id in user_ids]
+
+    def forget():
+        get_cache().delete_many(keys)
+
+    forget()
+    transaction.on_commit(forget)
+
+
+def bump_auth_versions(user_ids):
+    """Отзывает все выданные токены пользователей; для массовых изменений в обход save()."""
+    get_user_model().objects.filter(pk__in=user_ids).update(auth_version=F("auth_version") + 1)
+    forget_auth_versions(user_ids)
+
+
+def check_auth_version(token):
+    version = get_auth_version(token[api_settings.USER_ID_CLAIM])
+    if version is None:
+        raise AuthenticationFailed("Пользователь не найден.", code="user_not_found")
+    if token.get(AUTH_VERSION_CLAIM) != version:
+        raise AuthenticationFailed("Токен отозван.", code="token_revoked")
+    return version
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Кладёт в токен is_active, is_staff и версию авторизации пользователя."""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token["is_active"] = user.is_active
+        token["is_staff"] = user.is_staff
+        token[AUTH_VERSION_CLAIM] = user.auth_version
+        return token
+
+
+class VersionedTokenRefreshSerializer(TokenRefreshSerializer):
+    def validate(self, attrs):
+        token = self.token_class(attrs["refresh"])
+        # Токены, выданные до появления версии, продолжают обновляться, пока JWT_STATELESS_AUTH
+        # выключен: пользователь тогда проверяется по БД на каждый запрос.
+        if AUTH_VERSION_CLAIM in token or settings.JWT_STATELESS_AUTH:
+            check_auth_version(token)
+        return super().validate(attrs)